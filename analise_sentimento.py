@@ -4,10 +4,488 @@ Suporta TextBlob e VADER para análise de sentimento em português
 """
 
 import re
+import os
+import json
+import time
+import hashlib
+import queue
+import threading
+import tracemalloc
+from importlib import metadata
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple, Optional, Iterable, Iterator, Union
+from itertools import chain
+from scipy import sparse
+
+from lexicos import padrao_trie
+from normalizacao import VERSAO_NORMALIZACAO, normalizar, normalizar_lote
+from estatisticas_incrementais import AcumuladorEstatisticas
+
+
+# Palavras-chave que indicam urgência/emergência
+PALAVRAS_URGENCIA = [
+    'socorro', 'ajuda', 'emergência', 'urgente', 'perigo', 'risco',
+    'desespero', 'preso', 'presa', 'ilhado', 'ilhada', 'não consigo',
+    'criança', 'idoso', 'ferido', 'ferida', 'machucado', 'sangue',
+    'morrer', 'morrendo', 'afogando', 'sufocando', 'desabou',
+    'desmoronou', 'incêndio', 'fogo', 'queimando', 'fumaça'
+]
+
+# Palavras que intensificam o sentimento negativo
+INTENSIFICADORES = [
+    'muito', 'extremamente', 'totalmente', 'completamente',
+    'desesperadamente', 'urgentemente', 'rapidamente'
+]
+
+# Níveis de urgência em ordem crescente e limites mínimos de score de cada um
+NIVEIS_URGENCIA = ['baixa', 'média', 'alta', 'crítica']
+_LIMITES_NIVEIS = np.array([2, 4, 7])
+
+SENTIMENTOS = ['negativo', 'neutro', 'positivo']
+
+# Léxico de valência em português (escala -4 a +4, como a do VADER)
+LEXICO_SENTIMENTO = {
+    # Negativas
+    'morte': -3.2, 'mortes': -3.2, 'morto': -3.2, 'mortos': -3.2, 'morreu': -3.0,
+    'morreram': -3.0, 'morrer': -3.0, 'morrendo': -3.2, 'ferido': -2.4, 'ferida': -2.4,
+    'feridos': -2.4, 'feridas': -2.4, 'vítima': -2.5, 'vítimas': -2.5, 'desespero': -3.0,
+    'desesperado': -2.9, 'desesperada': -2.9, 'medo': -2.2, 'pânico': -2.8,
+    'perigo': -2.4, 'perigoso': -2.2, 'perigosa': -2.2, 'risco': -1.6,
+    'tragédia': -3.2, 'catástrofe': -3.1, 'desastre': -2.8, 'destruição': -2.8,
+    'destruído': -2.6, 'destruída': -2.6, 'destruídas': -2.6, 'perdido': -1.8,
+    'perdida': -1.8, 'perdemos': -2.0, 'perdeu': -1.8, 'perderam': -2.0,
+    'preso': -1.9, 'presa': -1.9, 'presos': -1.9, 'ilhado': -2.0, 'ilhada': -2.0,
+    'ilhados': -2.0, 'soterrado': -2.8, 'soterrada': -2.8, 'soterrados': -2.8,
+    'desaparecido': -2.2, 'desaparecida': -2.2, 'desaparecidos': -2.2,
+    'desabrigados': -2.3, 'desalojados': -2.0, 'grave': -2.2, 'gravemente': -2.2,
+    'crítico': -1.9, 'crítica': -1.9, 'terrível': -2.9, 'horrível': -2.9,
+    'triste': -2.1, 'tristeza': -2.2, 'sofrimento': -2.7, 'dor': -2.1,
+    'chorando': -2.0, 'socorro': -1.8, 'urgente': -1.0, 'emergência': -1.6,
+    'caos': -2.4, 'ruim': -2.0, 'pior': -2.3, 'péssimo': -2.9, 'péssima': -2.9,
+    'difícil': -1.5, 'problema': -1.5, 'problemas': -1.5, 'falta': -1.2,
+    'fome': -2.3, 'sede': -1.5, 'doente': -1.9, 'machucado': -2.0, 'machucada': -2.0,
+    'sangue': -1.9, 'afogando': -3.0, 'sufocando': -2.9, 'desabou': -2.2,
+    'desmoronou': -2.2, 'alagado': -1.6, 'alagada': -1.6, 'inundado': -1.6,
+    'inundada': -1.6, 'estragos': -2.0, 'prejuízo': -1.9, 'abandonados': -2.2,
+    'angústia': -2.6, 'assustado': -2.0, 'assustada': -2.0, 'preocupado': -1.5,
+    'preocupada': -1.5, 'preocupação': -1.5, 'raiva': -2.5, 'revolta': -2.1,
+    'descaso': -2.3,
+    # Positivas
+    'ajuda': 1.0, 'ajudaram': 1.8, 'ajudando': 1.6, 'obrigado': 2.0, 'obrigada': 2.0,
+    'agradeço': 2.1, 'agradecemos': 2.1, 'graças': 1.9, 'salvo': 2.0, 'salva': 2.0,
+    'salvos': 2.0, 'resgatado': 1.7, 'resgatada': 1.7, 'resgatados': 1.7,
+    'seguro': 1.8, 'segura': 1.8, 'seguros': 1.8, 'bem': 1.6, 'bom': 1.9, 'boa': 1.9,
+    'ótimo': 2.9, 'ótima': 2.9, 'excelente': 3.0, 'feliz': 2.6, 'alívio': 2.1,
+    'aliviado': 2.0, 'aliviada': 2.0, 'esperança': 1.9, 'controlada': 1.2,
+    'controlado': 1.2, 'solidariedade': 2.2, 'apoio': 1.7, 'melhorando': 1.7,
+    'recuperação': 1.5, 'sobreviveu': 1.9, 'sobreviventes': 1.2, 'heróis': 2.4,
+    'parabéns': 2.4, 'tranquilo': 1.6, 'tranquila': 1.6, 'calma': 1.3,
+    'normalizado': 1.4, 'normalizada': 1.4, 'restabelecida': 1.3, 'amor': 3.2,
+    'força': 1.4, 'fé': 1.5, 'conseguiu': 1.6, 'conseguimos': 1.8, 'sucesso': 2.7,
+    'protegidos': 1.7, 'acolhidos': 1.6, 'doações': 1.5, 'voluntários': 1.5
+}
+
+# Palavras que invertem a valência das até JANELA_NEGACAO palavras seguintes
+NEGADORES = ['não', 'nunca', 'jamais', 'nem', 'nenhum', 'nenhuma', 'nada', 'sem', 'ninguém']
+JANELA_NEGACAO = 3
+FATOR_NEGACAO = -0.74
+
+# Multiplicadores aplicados à palavra imediatamente seguinte
+MODIFICADORES_INTENSIDADE = {
+    'muito': 1.3, 'muita': 1.3, 'muitos': 1.2, 'muitas': 1.2, 'extremamente': 1.5,
+    'totalmente': 1.4, 'completamente': 1.4, 'absolutamente': 1.4, 'super': 1.3,
+    'bastante': 1.25, 'tão': 1.25, 'realmente': 1.2, 'pouco': 0.7, 'meio': 0.8,
+    'levemente': 0.7, 'quase': 0.8
+}
+
+# Métodos cujo resultado tem as colunas do VADER (pos/neg/neu/composto)
+METODOS_ESTILO_VADER = ('vader', 'lexico')
+
+
+def _versao_biblioteca(distribuicao: str) -> str:
+    """Versão instalada de uma biblioteca ('desconhecida' se não for encontrada)"""
+    try:
+        return metadata.version(distribuicao)
+    except metadata.PackageNotFoundError:
+        return 'desconhecida'
+
+
+class LexicoSentimento:
+    """Léxico de valência compilado em arrays, pontuado em lote com álgebra esparsa"""
+    
+    def __init__(self, lexico: Optional[Dict[str, float]] = None,
+                 negadores: Optional[List[str]] = None,
+                 modificadores: Optional[Dict[str, float]] = None,
+                 janela_negacao: int = JANELA_NEGACAO, alfa: float = 15.0):
+        """
+        Compila o léxico em arrays indexados por id de token
+        
+        Args:
+            lexico (Dict[str, float], optional): Palavra -> valência
+            negadores (List[str], optional): Palavras de negação
+            modificadores (Dict[str, float], optional): Palavra -> multiplicador
+            janela_negacao (int): Quantas palavras anteriores uma negação alcança
+            alfa (float): Constante de normalização do score composto (a do VADER)
+        """
+        lexico = LEXICO_SENTIMENTO if lexico is None else lexico
+        negadores = NEGADORES if negadores is None else negadores
+        modificadores = MODIFICADORES_INTENSIDADE if modificadores is None else modificadores
+        
+        self.vocabulario = {palavra: i for i, palavra in
+                            enumerate(dict.fromkeys(chain(lexico, negadores, modificadores)))}
+        tamanho = len(self.vocabulario)
+        
+        self.valencias = np.zeros(tamanho)
+        self.eh_negador = np.zeros(tamanho, dtype=bool)
+        self.multiplicadores = np.ones(tamanho)
+        for palavra, valencia in lexico.items():
+            self.valencias[self.vocabulario[palavra]] = valencia
+        for palavra in negadores:
+            self.eh_negador[self.vocabulario[palavra]] = True
+        for palavra, multiplicador in modificadores.items():
+            self.multiplicadores[self.vocabulario[palavra]] = multiplicador
+        
+        self.janela_negacao = janela_negacao
+        self.alfa = alfa
+        
+        # Identifica os arrays e parâmetros compilados (endereça resultados em cache)
+        h = hashlib.sha256(json.dumps(list(self.vocabulario), ensure_ascii=False).encode('utf-8'))
+        for array in (self.valencias, self.eh_negador, self.multiplicadores):
+            h.update(array.tobytes())
+        h.update(json.dumps([janela_negacao, alfa, FATOR_NEGACAO]).encode('utf-8'))
+        self.versao = h.hexdigest()[:16]
+    
+    def pontuar_lote(self, textos: List[str]) -> np.ndarray:
+        """
+        Pontua um lote de textos preprocessados (minúsculos, sem pontuação)
+        
+        Os tokens do lote inteiro viram um único array de ids. Negações e
+        intensificadores são resolvidos deslocando esse array (um deslocamento
+        por posição da janela), e a soma das valências de cada mensagem é um
+        produto matriz esparsa (mensagens x vocabulário) por vetor.
+        
+        Args:
+            textos (List[str]): Textos preprocessados
+            
+        Returns:
+            np.ndarray: Matriz mensagens x 4 com score_positivo, score_negativo,
+                score_neutro e score_composto (mesma semântica do VADER)
+        """
+        n = len(textos)
+        tokens_por_texto = [texto.split() for texto in textos]
+        tamanhos = np.fromiter((len(tokens) for tokens in tokens_por_texto), dtype=np.int64, count=n)
+        total = int(tamanhos.sum())
+        
+        ids = np.fromiter((self.vocabulario.get(token, -1)
+                           for token in chain.from_iterable(tokens_por_texto)),
+                          dtype=np.int64, count=total)
+        mensagem = np.repeat(np.arange(n), tamanhos)
+        
+        conhecido = ids >= 0
+        ids_seguros = np.where(conhecido, ids, 0)
+        valencia = np.where(conhecido, self.valencias[ids_seguros], 0.0)
+        negador = conhecido & self.eh_negador[ids_seguros]
+        multiplicador = np.where(conhecido, self.multiplicadores[ids_seguros], 1.0)
+        
+        # Janelas: uma palavra é negada se algum dos k tokens anteriores da mesma
+        # mensagem é negador; é intensificada pelo token imediatamente anterior
+        fator = np.ones(total)
+        negada = np.zeros(total, dtype=bool)
+        for k in range(1, self.janela_negacao + 1):
+            if k >= total:
+                break
+            mesma_mensagem = mensagem[k:] == mensagem[:-k]
+            negada[k:] |= negador[:-k] & mesma_mensagem
+            if k == 1:
+                fator[1:] = np.where(mesma_mensagem, multiplicador[:-1], 1.0)
+        fator = np.where(negada, fator * FATOR_NEGACAO, fator)
+        
+        tem_valencia = valencia != 0
+        linhas, colunas = mensagem[tem_valencia], ids[tem_valencia]
+        por_mensagem = np.bincount(linhas, minlength=n)
+        
+        # Soma ponderada por mensagem: matriz (mensagens x vocabulário) @ valências.
+        # Os tokens já estão em ordem de mensagem, então a CSR é montada direto
+        pesos = sparse.csr_matrix(
+            (fator[tem_valencia], colunas, np.concatenate(([0], np.cumsum(por_mensagem)))),
+            shape=(n, len(self.vocabulario))
+        )
+        soma = pesos @ self.valencias
+        
+        # Proporções positivo/negativo/neutro, como no VADER
+        pontos = valencia[tem_valencia] * fator[tem_valencia]
+        soma_positiva = np.bincount(linhas, weights=np.maximum(pontos, 0), minlength=n)
+        soma_negativa = np.bincount(linhas, weights=np.maximum(-pontos, 0), minlength=n)
+        neutros = tamanhos - por_mensagem
+        
+        total_proporcoes = soma_positiva + soma_negativa + neutros
+        divisor = np.where(total_proporcoes > 0, total_proporcoes, 1.0)
+        composto = soma / np.sqrt(soma * soma + self.alfa)
+        
+        return np.column_stack([
+            np.round(soma_positiva / divisor, 3),
+            np.round(soma_negativa / divisor, 3),
+            np.where(total_proporcoes > 0, np.round(neutros / divisor, 3), 1.0),
+            np.round(composto, 4)
+        ])
+
+
+# Arquivo opcional que estende o léxico de urgência (recarregado a quente)
+ARQUIVO_LEXICO_URGENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       'config', 'lexico_urgencia.json')
+
+
+class MotorUrgencia:
+    """Léxico de urgência compilado em um único padrão, com recarga a quente"""
+    
+    def __init__(self, palavras_urgencia: List[str], intensificadores: List[str],
+                 arquivo_lexico: Optional[str] = None, intervalo_verificacao: float = 5.0):
+        """
+        Compila o léxico de urgência
+        
+        Args:
+            palavras_urgencia (List[str]): Palavras de urgência base
+            intensificadores (List[str]): Intensificadores base
+            arquivo_lexico (str, optional): JSON com listas 'palavras_urgencia' e
+                'intensificadores' que estendem o léxico base
+            intervalo_verificacao (float): Segundos entre verificações do arquivo
+        """
+        self.palavras_base = list(palavras_urgencia)
+        self.intensificadores_base = list(intensificadores)
+        self.arquivo_lexico = arquivo_lexico
+        self.intervalo_verificacao = intervalo_verificacao
+        
+        self._lock = threading.Lock()
+        self._mtime_arquivo = None
+        self._ultima_verificacao = 0.0
+        self._estado = self._compilar(self.palavras_base, self.intensificadores_base)
+        self.recarregar_se_necessario(forcar=True)
+    
+    @staticmethod
+    def _compilar(palavras: List[str], intensificadores: List[str]) -> Dict:
+        """
+        Compila as listas em um padrão com fronteira de palavra
+        
+        Args:
+            palavras (List[str]): Palavras de urgência
+            intensificadores (List[str]): Intensificadores
+            
+        Returns:
+            Dict: Padrão compilado, listas e mapa palavra -> (tipo, ordem)
+        """
+        mapa = {}
+        for ordem, palavra in enumerate(palavras):
+            mapa.setdefault(palavra.lower(), []).append(('urgencia', ordem, palavra))
+        for ordem, palavra in enumerate(intensificadores):
+            mapa.setdefault(palavra.lower(), []).append(('intensificador', ordem, palavra))
+        
+        alternativas = padrao_trie(mapa)
+        padrao = re.compile(rf'\b(?:{alternativas})\b', re.IGNORECASE) if alternativas else None
+        
+        versao = hashlib.sha256(json.dumps([palavras, intensificadores]).encode('utf-8')).hexdigest()
+        
+        return {
+            'padrao': padrao,
+            'mapa': mapa,
+            'palavras_urgencia': list(palavras),
+            'intensificadores': list(intensificadores),
+            'versao': versao[:16]
+        }
+    
+    def recarregar_se_necessario(self, forcar: bool = False) -> bool:
+        """
+        Recompila o léxico se o arquivo de extensão mudou
+        
+        Args:
+            forcar (bool): Ignora o intervalo entre verificações
+            
+        Returns:
+            bool: True se o léxico foi recarregado
+        """
+        if not self.arquivo_lexico:
+            return False
+        
+        agora = time.monotonic()
+        if not forcar and agora - self._ultima_verificacao < self.intervalo_verificacao:
+            return False
+        
+        with self._lock:
+            self._ultima_verificacao = agora
+            try:
+                mtime = os.path.getmtime(self.arquivo_lexico)
+            except OSError:
+                mtime = None
+            
+            if mtime == self._mtime_arquivo:
+                return False
+            
+            palavras = list(self.palavras_base)
+            intensificadores = list(self.intensificadores_base)
+            if mtime is not None:
+                try:
+                    with open(self.arquivo_lexico, 'r', encoding='utf-8') as f:
+                        extensao = json.load(f)
+                    palavras += [p for p in extensao.get('palavras_urgencia', []) if p not in palavras]
+                    intensificadores += [p for p in extensao.get('intensificadores', [])
+                                         if p not in intensificadores]
+                except Exception as e:
+                    print(f"Erro ao carregar léxico de urgência: {e}")
+                    return False
+            
+            # Troca atômica: leituras concorrentes veem o estado antigo ou o novo
+            self._estado = self._compilar(palavras, intensificadores)
+            self._mtime_arquivo = mtime
+            return True
+    
+    @property
+    def palavras_urgencia(self) -> List[str]:
+        """Palavras de urgência atualmente em uso"""
+        return self._estado['palavras_urgencia']
+    
+    @property
+    def intensificadores(self) -> List[str]:
+        """Intensificadores atualmente em uso"""
+        return self._estado['intensificadores']
+    
+    @property
+    def versao(self) -> str:
+        """Hash do léxico atualmente em uso"""
+        return self._estado['versao']
+    
+    def analisar(self, texto: str) -> Dict:
+        """
+        Encontra palavras de urgência e intensificadores numa única varredura
+        
+        Args:
+            texto (str): Texto para análise
+            
+        Returns:
+            Dict: Nível, score e palavras encontradas
+        """
+        self.recarregar_se_necessario()
+        estado = self._estado
+        
+        encontrados = {}
+        if estado['padrao'] is not None:
+            for match in estado['padrao'].finditer(texto):
+                for tipo, ordem, palavra in estado['mapa'].get(match.group().lower(), ()):
+                    encontrados[(tipo, ordem)] = palavra
+        
+        palavras_encontradas = [p for (tipo, _), p in sorted(encontrados.items()) if tipo == 'urgencia']
+        intensificadores_encontrados = [p for (tipo, _), p in sorted(encontrados.items())
+                                        if tipo == 'intensificador']
+        
+        # Calcula score de urgência (0-10)
+        score_urgencia = len(palavras_encontradas) * 2 + len(intensificadores_encontrados)
+        score_urgencia = min(score_urgencia, 10)  # Máximo 10
+        
+        return {
+            'nivel_urgencia': nivel_por_score_urgencia(score_urgencia),
+            'score_urgencia': score_urgencia,
+            'palavras_urgencia': palavras_encontradas,
+            'intensificadores': intensificadores_encontrados
+        }
+    
+    def analisar_lote(self, textos: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Varre um lote inteiro de textos numa única passada do padrão
+        
+        As palavras encontradas são devolvidas em formato achatado: os índices
+        (no vocabulário) das palavras da mensagem i estão em
+        indices[offsets[i]:offsets[i + 1]], na ordem do léxico.
+        
+        Args:
+            textos (List[str]): Textos para análise
+            
+        Returns:
+            Dict[str, np.ndarray]: 'score_urgencia' (int8), 'nivel_urgencia'
+                (categórico), 'indices_urgencia'/'offsets_urgencia',
+                'indices_intensificadores'/'offsets_intensificadores' e os
+                vocabulários 'vocabulario_urgencia'/'vocabulario_intensificadores'
+        """
+        self.recarregar_se_necessario()
+        estado = self._estado
+        n = len(textos)
+        n_urgencia = len(estado['palavras_urgencia'])
+        
+        mensagens, codigos = [], []
+        if n and estado['padrao'] is not None:
+            # Nenhuma palavra do léxico contém '\n', logo nenhuma ocorrência
+            # atravessa a fronteira entre duas mensagens
+            inicios = np.cumsum([0] + [len(t) + 1 for t in textos[:-1]])
+            posicoes = []
+            for match in estado['padrao'].finditer('\n'.join(textos)):
+                for tipo, ordem, _ in estado['mapa'].get(match.group().lower(), ()):
+                    posicoes.append(match.start())
+                    codigos.append(ordem if tipo == 'urgencia' else n_urgencia + ordem)
+            mensagens = np.searchsorted(inicios, posicoes, side='right') - 1
+        
+        # Código único por (mensagem, palavra): np.unique remove repetições e
+        # ordena por mensagem e, dentro dela, pela ordem do léxico
+        n_codigos = n_urgencia + len(estado['intensificadores'])
+        chaves = np.unique(np.asarray(mensagens, dtype=np.int64) * n_codigos
+                           + np.asarray(codigos, dtype=np.int64))
+        mensagens, codigos = np.divmod(chaves, max(n_codigos, 1))
+        eh_urgencia = codigos < n_urgencia
+        
+        contagem_urgencia = np.bincount(mensagens[eh_urgencia], minlength=n)
+        contagem_intensificadores = np.bincount(mensagens[~eh_urgencia], minlength=n)
+        
+        score_urgencia = np.minimum(contagem_urgencia * 2 + contagem_intensificadores, 10)
+        niveis = np.searchsorted(_LIMITES_NIVEIS, score_urgencia, side='right')
+        
+        return {
+            'score_urgencia': score_urgencia.astype(np.int8),
+            'nivel_urgencia': pd.Categorical.from_codes(niveis, NIVEIS_URGENCIA, ordered=True),
+            'indices_urgencia': codigos[eh_urgencia].astype(np.int32),
+            'offsets_urgencia': np.concatenate(([0], np.cumsum(contagem_urgencia))),
+            'indices_intensificadores': (codigos[~eh_urgencia] - n_urgencia).astype(np.int32),
+            'offsets_intensificadores': np.concatenate(([0], np.cumsum(contagem_intensificadores))),
+            'vocabulario_urgencia': np.array(estado['palavras_urgencia'], dtype=object),
+            'vocabulario_intensificadores': np.array(estado['intensificadores'], dtype=object)
+        }
+
+
+def nivel_por_score_urgencia(score_urgencia: float) -> str:
+    """
+    Converte o score de urgência (0-10) em nível
+    
+    Args:
+        score_urgencia (float): Score de urgência
+        
+    Returns:
+        str: 'crítica', 'alta', 'média' ou 'baixa'
+    """
+    if score_urgencia >= 7:
+        return 'crítica'
+    elif score_urgencia >= 4:
+        return 'alta'
+    elif score_urgencia >= 2:
+        return 'média'
+    return 'baixa'
+
+
+_motor_urgencia: Optional[MotorUrgencia] = None
+_lock_motor = threading.Lock()
+
+
+def obter_motor_urgencia() -> MotorUrgencia:
+    """
+    Retorna o motor de urgência do processo, compilando-o na primeira chamada
+    
+    Returns:
+        MotorUrgencia: Motor compartilhado (léxico base + config/lexico_urgencia.json)
+    """
+    global _motor_urgencia
+    if _motor_urgencia is None:
+        with _lock_motor:
+            if _motor_urgencia is None:
+                _motor_urgencia = MotorUrgencia(PALAVRAS_URGENCIA, INTENSIFICADORES,
+                                                arquivo_lexico=ARQUIVO_LEXICO_URGENCIA)
+    return _motor_urgencia
 
 
 class AnalisadorSentimento:
@@ -18,26 +496,46 @@ class AnalisadorSentimento:
         Inicializa o analisador de sentimento
         
         Args:
-            metodo (str): 'vader' ou 'textblob'
+            metodo (str): 'vader', 'textblob' ou 'lexico' (léxico em português,
+                pontuado em lote)
         """
         self.metodo = metodo
         if metodo == 'vader':
             self.analyzer = SentimentIntensityAnalyzer()
+            self._versao_metodo = f"vader-{_versao_biblioteca('vaderSentiment')}"
+        elif metodo == 'lexico':
+            self.lexico = LexicoSentimento()
+            self._versao_metodo = f"lexico-{self.lexico.versao}"
+        else:
+            self._versao_metodo = f"{metodo}-{_versao_biblioteca('textblob')}"
         
-        # Palavras-chave que indicam urgência/emergência
-        self.palavras_urgencia = [
-            'socorro', 'ajuda', 'emergência', 'urgente', 'perigo', 'risco',
-            'desespero', 'preso', 'presa', 'ilhado', 'ilhada', 'não consigo',
-            'criança', 'idoso', 'ferido', 'ferida', 'machucado', 'sangue',
-            'morrer', 'morrendo', 'afogando', 'sufocando', 'desabou',
-            'desmoronou', 'incêndio', 'fogo', 'queimando', 'fumaça'
-        ]
-        
-        # Palavras que intensificam o sentimento negativo
-        self.intensificadores = [
-            'muito', 'extremamente', 'totalmente', 'completamente',
-            'desesperadamente', 'urgentemente', 'rapidamente'
-        ]
+        # Léxico de urgência compilado, compartilhado pelo processo
+        self.motor_urgencia = obter_motor_urgencia()
+    
+    @property
+    def palavras_urgencia(self) -> List[str]:
+        """Palavras-chave que indicam urgência/emergência"""
+        return self.motor_urgencia.palavras_urgencia
+    
+    @property
+    def intensificadores(self) -> List[str]:
+        """Palavras que intensificam o sentimento negativo"""
+        return self.motor_urgencia.intensificadores
+    
+    def obter_versao(self) -> str:
+        """
+        Identifica método, léxico de urgência e normalização para endereçar
+        resultados em cache
+        
+        O método entra com a versão da biblioteca (VADER, TextBlob) ou o hash
+        do LexicoSentimento compilado, para que o cache persistente não
+        devolva scores de um léxico ou de uma biblioteca anteriores.
+        
+        Returns:
+            str: Versão do analisador
+        """
+        self.motor_urgencia.recarregar_se_necessario()
+        return f"{self._versao_metodo}:n{VERSAO_NORMALIZACAO}:{self.motor_urgencia.versao}"
     
     def preprocessar_texto(self, texto: str) -> str:
         """
@@ -49,19 +547,19 @@ class AnalisadorSentimento:
         Returns:
             str: Texto preprocessado
         """
-        # Remove URLs
-        texto = re.sub(r'http\S+|www\S+|https\S+', '', texto, flags=re.MULTILINE)
-        
-        # Remove menções e hashtags para análise de sentimento
-        texto = re.sub(r'@\w+|#\w+', '', texto)
-        
-        # Remove caracteres especiais excessivos
-        texto = re.sub(r'[^\w\s]', ' ', texto)
-        
-        # Remove espaços múltiplos
-        texto = re.sub(r'\s+', ' ', texto).strip()
+        return normalizar(texto, 'sentimento')
+    
+    def preprocessar_lote(self, textos: List[str]) -> List[str]:
+        """
+        Preprocessa um lote de textos
         
-        return texto.lower()
+        Args:
+            textos (List[str]): Textos originais
+            
+        Returns:
+            List[str]: Textos preprocessados
+        """
+        return normalizar_lote(textos, 'sentimento')
     
     def analisar_com_vader(self, texto: str) -> Dict:
         """
@@ -122,51 +620,50 @@ class AnalisadorSentimento:
             'metodo': 'textblob'
         }
     
-    def calcular_urgencia(self, texto: str) -> Dict:
+    def analisar_com_lexico(self, texto: str) -> Dict:
         """
-        Calcula nível de urgência baseado em palavras-chave
+        Analisa sentimento usando o léxico em português
         
         Args:
-            texto (str): Texto para análise
+            texto (str): Texto preprocessado
             
         Returns:
-            Dict: Informações de urgência
+            Dict: Scores de sentimento
         """
-        texto_lower = texto.lower()
-        
-        # Conta palavras de urgência
-        palavras_encontradas = []
-        for palavra in self.palavras_urgencia:
-            if palavra in texto_lower:
-                palavras_encontradas.append(palavra)
-        
-        # Conta intensificadores
-        intensificadores_encontrados = []
-        for intensificador in self.intensificadores:
-            if intensificador in texto_lower:
-                intensificadores_encontrados.append(intensificador)
-        
-        # Calcula score de urgência (0-10)
-        score_urgencia = len(palavras_encontradas) * 2 + len(intensificadores_encontrados)
-        score_urgencia = min(score_urgencia, 10)  # Máximo 10
+        positivo, negativo, neutro, composto = self.lexico.pontuar_lote([texto])[0]
         
-        # Determina nível de urgência
-        if score_urgencia >= 7:
-            nivel = 'crítica'
-        elif score_urgencia >= 4:
-            nivel = 'alta'
-        elif score_urgencia >= 2:
-            nivel = 'média'
+        # Mesmos limiares do VADER
+        if composto >= 0.05:
+            sentimento = 'positivo'
+        elif composto <= -0.05:
+            sentimento = 'negativo'
         else:
-            nivel = 'baixa'
+            sentimento = 'neutro'
         
         return {
-            'nivel_urgencia': nivel,
-            'score_urgencia': score_urgencia,
-            'palavras_urgencia': palavras_encontradas,
-            'intensificadores': intensificadores_encontrados
+            'sentimento': sentimento,
+            'score_positivo': float(positivo),
+            'score_negativo': float(negativo),
+            'score_neutro': float(neutro),
+            'score_composto': float(composto),
+            'metodo': 'lexico'
         }
     
+    def calcular_urgencia(self, texto: str) -> Dict:
+        """
+        Calcula nível de urgência baseado em palavras-chave
+        
+        Palavras são casadas inteiras ("fogo" não casa com "fogão") numa única
+        varredura do texto.
+        
+        Args:
+            texto (str): Texto para análise
+            
+        Returns:
+            Dict: Informações de urgência
+        """
+        return self.motor_urgencia.analisar(texto)
+    
     def analisar_mensagem(self, texto: str) -> Dict:
         """
         Análise completa de uma mensagem
@@ -182,6 +679,8 @@ class AnalisadorSentimento:
         # Análise de sentimento
         if self.metodo == 'vader':
             resultado_sentimento = self.analisar_com_vader(texto_processado)
+        elif self.metodo == 'lexico':
+            resultado_sentimento = self.analisar_com_lexico(texto_processado)
         else:
             resultado_sentimento = self.analisar_com_textblob(texto_processado)
         
@@ -198,6 +697,70 @@ class AnalisadorSentimento:
         
         return resultado_completo
     
+    def analisar_lote_colunar(self, mensagens: Iterable, dtype_scores=np.float32) -> Dict:
+        """
+        Analisa um lote de mensagens em modo colunar
+        
+        Preprocessamento e urgência são feitos em uma passada sobre o lote
+        inteiro; o VADER/TextBlob roda uma vez por texto preprocessado distinto
+        (repostagens e mensagens repetidas são pontuadas uma única vez) e o
+        método 'lexico' pontua todos os textos distintos de uma vez. Não há
+        dicionário por mensagem nem cópia dos textos no resultado.
+        
+        Args:
+            mensagens (Iterable): pd.Series, array do Arrow ou lista de textos;
+                valores que não são texto são tratados como texto vazio
+            dtype_scores: Tipo das colunas de score (float32 por padrão)
+            
+        Returns:
+            Dict: Colunas com uma posição por mensagem - 'sentimento' (categórico),
+                scores em dtype_scores ('score_composto' e 'score_positivo',
+                'score_negativo', 'score_neutro' no VADER/léxico ou 'polaridade',
+                'subjetividade' no TextBlob), 'score_urgencia' (int8),
+                'nivel_urgencia' (categórico) - mais 'metodo' e as palavras
+                encontradas em formato achatado (ver MotorUrgencia.analisar_lote)
+        """
+        if hasattr(mensagens, 'to_pylist'):
+            mensagens = mensagens.to_pylist()
+        textos = [m if isinstance(m, str) else '' for m in mensagens]
+        
+        textos_processados = self.preprocessar_lote(textos)
+        codigos, unicos = pd.factorize(pd.Series(textos_processados, dtype=object))
+        
+        if self.metodo == 'vader':
+            colunas_scores = ['score_positivo', 'score_negativo', 'score_neutro', 'score_composto']
+            valores = np.array([[scores['pos'], scores['neg'], scores['neu'], scores['compound']]
+                                for scores in map(self.analyzer.polarity_scores, unicos)],
+                               dtype=np.float64).reshape(len(unicos), len(colunas_scores))
+            composto = valores[:, 3]
+            positivo, negativo = composto >= 0.05, composto <= -0.05
+        elif self.metodo == 'lexico':
+            colunas_scores = ['score_positivo', 'score_negativo', 'score_neutro', 'score_composto']
+            valores = self.lexico.pontuar_lote(list(unicos))
+            composto = valores[:, 3]
+            positivo, negativo = composto >= 0.05, composto <= -0.05
+        else:
+            colunas_scores = ['polaridade', 'subjetividade']
+            valores = np.array([[blob.sentiment.polarity, blob.sentiment.subjectivity]
+                                for blob in map(TextBlob, unicos)],
+                               dtype=np.float64).reshape(len(unicos), len(colunas_scores))
+            composto = valores[:, 0]
+            positivo, negativo = composto > 0.1, composto < -0.1
+        
+        # Mesmos limiares de analisar_com_vader/analisar_com_textblob, aplicados
+        # antes da conversão para dtype_scores
+        sentimento_unicos = np.where(positivo, 2, np.where(negativo, 0, 1))
+        valores = valores.astype(dtype_scores, copy=False)
+        
+        resultado = {nome: valores[codigos, j] for j, nome in enumerate(colunas_scores)}
+        resultado['score_composto'] = valores[codigos, colunas_scores.index(
+            'score_composto' if self.metodo in METODOS_ESTILO_VADER else 'polaridade')]
+        resultado['sentimento'] = pd.Categorical.from_codes(sentimento_unicos[codigos], SENTIMENTOS)
+        resultado['metodo'] = self.metodo
+        
+        resultado.update(self.motor_urgencia.analisar_lote(textos))
+        return resultado
+    
     def analisar_lote(self, mensagens: List[str]) -> pd.DataFrame:
         """
         Analisa um lote de mensagens
@@ -208,62 +771,366 @@ class AnalisadorSentimento:
         Returns:
             pd.DataFrame: DataFrame com análises
         """
-        resultados = []
-        
+        ids, textos = [], []
         for i, mensagem in enumerate(mensagens):
+            if isinstance(mensagem, str):
+                ids.append(i)
+                textos.append(mensagem)
+            else:
+                print(f"Erro ao analisar mensagem {i}: texto inválido ({type(mensagem).__name__})")
+        
+        if not textos:
+            return pd.DataFrame()
+        
+        colunas = self.analisar_lote_colunar(textos, dtype_scores=np.float64)
+        colunas_scores = self._colunas_scores()
+        
+        df = pd.DataFrame({
+            'texto_original': textos,
+            'texto_processado': self.preprocessar_lote(textos),
+            'sentimento': np.asarray(colunas['sentimento'], dtype=object),
+            **{nome: colunas[nome] for nome in colunas_scores},
+            'metodo': self.metodo,
+            'nivel_urgencia': np.asarray(colunas['nivel_urgencia'], dtype=object),
+            'score_urgencia': colunas['score_urgencia'].astype(np.int64),
+            'palavras_urgencia': self._listas_achatadas(colunas, 'urgencia'),
+            'intensificadores': self._listas_achatadas(colunas, 'intensificadores'),
+            'id_mensagem': ids
+        })
+        
+        return df
+    
+    def analisar_stream(self, mensagens: Union[Iterable, queue.Queue], tamanho_lote: int = 64,
+                        intervalo_max: float = 1.0, campo_texto: str = 'texto') -> Iterator[Dict]:
+        """
+        Analisa um fluxo de mensagens em micro-lotes, entregando resultados à medida que ficam prontos
+        
+        Só o micro-lote corrente fica em memória, então o consumo é constante
+        qualquer que seja o tamanho do fluxo. Aceita qualquer iterável (lista,
+        gerador, linhas de um JSONL já decodificadas) ou uma queue.Queue, que é
+        lida até receber None; com fila, um micro-lote incompleto é liberado
+        após intervalo_max segundos sem novas mensagens.
+        
+        Args:
+            mensagens (Iterable | queue.Queue): Textos ou dicionários com o texto
+                em campo_texto (ex.: tweets do coletor)
+            tamanho_lote (int): Mensagens por micro-lote
+            intervalo_max (float): Espera máxima (em segundos) por um lote cheio
+                quando a entrada é uma fila
+            campo_texto (str): Chave do texto quando as mensagens são dicionários
+            
+        Yields:
+            Dict: Análise de cada mensagem, na ordem de chegada; para dicionários,
+                os campos originais mais os da análise, para textos 'id_mensagem'
+                (posição no fluxo) mais os da análise
+        """
+        lote = []
+        posicao = 0
+        
+        for mensagem in self._iterar_entrada(mensagens, intervalo_max):
+            if mensagem is not None:
+                lote.append(mensagem)
+            
+            # None sinaliza que a fila ficou ociosa por intervalo_max segundos
+            if lote and (mensagem is None or len(lote) >= tamanho_lote):
+                yield from self._analisar_micro_lote(lote, posicao, campo_texto)
+                posicao += len(lote)
+                lote = []
+        
+        if lote:
+            yield from self._analisar_micro_lote(lote, posicao, campo_texto)
+    
+    @staticmethod
+    def _iterar_entrada(mensagens: Union[Iterable, queue.Queue], intervalo_max: float) -> Iterator[Any]:
+        """
+        Normaliza a entrada do stream em um iterador
+        
+        Para filas, gera None quando não chega mensagem em intervalo_max
+        segundos (marca de liberação do micro-lote) e termina ao receber None.
+        """
+        if not isinstance(mensagens, queue.Queue):
+            yield from mensagens
+            return
+        
+        while True:
             try:
-                resultado = self.analisar_mensagem(mensagem)
-                resultado['id_mensagem'] = i
-                resultados.append(resultado)
-            except Exception as e:
-                print(f"Erro ao analisar mensagem {i}: {e}")
+                mensagem = mensagens.get(timeout=intervalo_max)
+            except queue.Empty:
+                yield None
                 continue
+            if mensagem is None:
+                return
+            yield mensagem
+    
+    def _analisar_micro_lote(self, lote: List, posicao: int, campo_texto: str) -> Iterator[Dict]:
+        """
+        Analisa um micro-lote e gera um dicionário de resultado por mensagem
+        
+        Args:
+            lote (List): Textos ou dicionários
+            posicao (int): Posição da primeira mensagem do lote no fluxo
+            campo_texto (str): Chave do texto nos dicionários
+            
+        Yields:
+            Dict: Resultado da mensagem
+        """
+        textos = [m.get(campo_texto, '') if isinstance(m, dict) else m for m in lote]
+        colunas = self.analisar_lote_colunar(textos, dtype_scores=np.float64)
+        
+        colunas_scores = self._colunas_scores()
+        palavras_urgencia = self._listas_achatadas(colunas, 'urgencia')
+        intensificadores = self._listas_achatadas(colunas, 'intensificadores')
+        
+        for j, mensagem in enumerate(lote):
+            resultado = dict(mensagem) if isinstance(mensagem, dict) else {'id_mensagem': posicao + j}
+            resultado.update({
+                'sentimento': colunas['sentimento'][j],
+                **{nome: float(colunas[nome][j]) for nome in colunas_scores},
+                'metodo': self.metodo,
+                'nivel_urgencia': colunas['nivel_urgencia'][j],
+                'score_urgencia': int(colunas['score_urgencia'][j]),
+                'palavras_urgencia': palavras_urgencia[j],
+                'intensificadores': intensificadores[j]
+            })
+            yield resultado
+    
+    def criar_fluxo(self, ao_resultado: Optional[Callable[[Dict], None]] = None,
+                    tamanho_lote: int = 64, intervalo_max: float = 1.0,
+                    tamanho_fila: int = 10000) -> 'FluxoSentimento':
+        """
+        Cria um fluxo de análise que pode ser passado como callback de coleta
+        
+        Exemplo:
+            fluxo = analisador.criar_fluxo(ao_resultado=salvar)
+            coletor.coletar_stream_tempo_real(fluxo)
+        
+        Args:
+            ao_resultado (Callable, optional): Chamado com cada resultado numa
+                thread própria; se omitido, os resultados são lidos iterando o fluxo
+            tamanho_lote (int): Mensagens por micro-lote
+            intervalo_max (float): Espera máxima por um lote cheio, em segundos
+            tamanho_fila (int): Mensagens pendentes antes de o callback bloquear
+            
+        Returns:
+            FluxoSentimento: Fluxo pronto para receber mensagens
+        """
+        return FluxoSentimento(self, ao_resultado=ao_resultado, tamanho_lote=tamanho_lote,
+                               intervalo_max=intervalo_max, tamanho_fila=tamanho_fila)
+    
+    def _colunas_scores(self) -> List[str]:
+        """Colunas de score produzidas pelo método de análise atual"""
+        if self.metodo in METODOS_ESTILO_VADER:
+            return ['score_positivo', 'score_negativo', 'score_neutro', 'score_composto']
+        return ['polaridade', 'subjetividade', 'score_composto']
+    
+    @staticmethod
+    def _listas_achatadas(colunas: Dict, nome: str) -> List[List[str]]:
+        """
+        Reconstrói as listas de palavras por mensagem a partir do formato achatado
+        
+        Args:
+            colunas (Dict): Resultado de analisar_lote_colunar
+            nome (str): 'urgencia' ou 'intensificadores'
+            
+        Returns:
+            List[List[str]]: Palavras encontradas em cada mensagem
+        """
+        palavras = colunas[f'vocabulario_{nome}'][colunas[f'indices_{nome}']].tolist()
+        offsets = colunas[f'offsets_{nome}']
+        return [palavras[inicio:fim] for inicio, fim in zip(offsets[:-1], offsets[1:])]
+    
+    @staticmethod
+    def acumular_estatisticas(df_analises: pd.DataFrame,
+                              acumulador: Optional[AcumuladorEstatisticas] = None) -> AcumuladorEstatisticas:
+        """
+        Atualiza estatísticas acumuladas com um lote de análises, em O(tamanho do lote)
+        
+        Args:
+            df_analises (pd.DataFrame): Análises novas (ex.: saída de analisar_lote)
+            acumulador (AcumuladorEstatisticas, optional): Acumulador a atualizar;
+                um novo se omitido
+            
+        Returns:
+            AcumuladorEstatisticas: Acumulador atualizado
+        """
+        if acumulador is None:
+            acumulador = AcumuladorEstatisticas()
+        if df_analises.empty:
+            return acumulador
         
-        return pd.DataFrame(resultados)
+        acumulador.adicionar_total(len(df_analises))
+        acumulador.contar('sentimento', df_analises['sentimento'])
+        acumulador.contar('nivel_urgencia', df_analises['nivel_urgencia'])
+        acumulador.somar('score_composto', df_analises['score_composto'])
+        acumulador.somar('score_urgencia', df_analises['score_urgencia'])
+        acumulador.observar_topk('palavras_urgencia', chain.from_iterable(
+            palavras for palavras in df_analises['palavras_urgencia'] if isinstance(palavras, list)
+        ))
+        
+        return acumulador
     
-    def obter_estatisticas(self, df_analises: pd.DataFrame) -> Dict:
+    @staticmethod
+    def obter_estatisticas(df_analises: Optional[pd.DataFrame] = None,
+                           acumulador: Optional[AcumuladorEstatisticas] = None) -> Dict:
         """
         Calcula estatísticas das análises
         
+        Com um acumulador (ver acumular_estatisticas) a leitura é O(1),
+        independente do tamanho do histórico, e não exige um analisador.
+        
         Args:
-            df_analises (pd.DataFrame): DataFrame com análises
+            df_analises (pd.DataFrame, optional): DataFrame com análises
+            acumulador (AcumuladorEstatisticas, optional): Estatísticas acumuladas
             
         Returns:
             Dict: Estatísticas
         """
-        if df_analises.empty:
+        if acumulador is None:
+            if df_analises is None or df_analises.empty:
+                return {}
+            acumulador = AnalisadorSentimento.acumular_estatisticas(df_analises)
+        
+        if not acumulador.total:
             return {}
         
         stats = {
-            'total_mensagens': len(df_analises),
-            'distribuicao_sentimento': df_analises['sentimento'].value_counts().to_dict(),
-            'distribuicao_urgencia': df_analises['nivel_urgencia'].value_counts().to_dict(),
-            'score_sentimento_medio': df_analises['score_composto'].mean(),
-            'score_urgencia_medio': df_analises['score_urgencia'].mean(),
-            'mensagens_criticas': len(df_analises[df_analises['nivel_urgencia'] == 'crítica']),
-            'palavras_urgencia_mais_comuns': self._palavras_mais_comuns(df_analises, 'palavras_urgencia')
+            'total_mensagens': acumulador.total,
+            'distribuicao_sentimento': acumulador.distribuicao('sentimento'),
+            'distribuicao_urgencia': acumulador.distribuicao('nivel_urgencia'),
+            'score_sentimento_medio': acumulador.media('score_composto'),
+            'score_urgencia_medio': acumulador.media('score_urgencia'),
+            'mensagens_criticas': acumulador.contagem('nivel_urgencia', 'crítica'),
+            'palavras_urgencia_mais_comuns': acumulador.mais_comuns('palavras_urgencia', 10)
         }
         
         return stats
+
+
+class FluxoSentimento:
+    """Fluxo de análise alimentado por callback (ex.: ColetorTwitter.coletar_stream_tempo_real)"""
     
-    def _palavras_mais_comuns(self, df: pd.DataFrame, coluna: str) -> Dict:
+    def __init__(self, analisador: AnalisadorSentimento,
+                 ao_resultado: Optional[Callable[[Dict], None]] = None,
+                 tamanho_lote: int = 64, intervalo_max: float = 1.0, tamanho_fila: int = 10000):
         """
-        Encontra palavras mais comuns em uma coluna de listas
+        Inicializa o fluxo
         
         Args:
-            df (pd.DataFrame): DataFrame
-            coluna (str): Nome da coluna
-            
-        Returns:
-            Dict: Contagem de palavras
+            analisador (AnalisadorSentimento): Analisador usado nos micro-lotes
+            ao_resultado (Callable, optional): Consumidor de cada resultado; com ele,
+                uma thread de análise é iniciada imediatamente
+            tamanho_lote (int): Mensagens por micro-lote
+            intervalo_max (float): Espera máxima por um lote cheio, em segundos
+            tamanho_fila (int): Mensagens pendentes antes de o callback bloquear
+        """
+        self.analisador = analisador
+        self.ao_resultado = ao_resultado
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_max = intervalo_max
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        # Contadores atualizados pelos produtores (callbacks de várias threads)
+        # e pelo consumidor
+        self._lock = threading.Lock()
+        self.recebidas = 0
+        self.analisadas = 0
+        self._thread = None
+        
+        if ao_resultado is not None:
+            self._thread = threading.Thread(target=self._consumir, daemon=True)
+            self._thread.start()
+    
+    def __call__(self, mensagem: Union[str, Dict]):
+        """
+        Recebe uma mensagem (assinatura de callback do coletor)
+        
+        Args:
+            mensagem (str | Dict): Texto ou dicionário com 'texto'
+        """
+        self.fila.put(mensagem)
+        with self._lock:
+            self.recebidas += 1
+    
+    def __iter__(self) -> Iterator[Dict]:
+        """Resultados na ordem de chegada, até o fluxo ser fechado"""
+        for resultado in self.analisador.analisar_stream(self.fila, self.tamanho_lote,
+                                                         self.intervalo_max):
+            with self._lock:
+                self.analisadas += 1
+            yield resultado
+    
+    def _consumir(self):
+        """Entrega cada resultado ao consumidor configurado"""
+        for resultado in self:
+            try:
+                self.ao_resultado(resultado)
+            except Exception as e:
+                print(f"Erro ao entregar resultado do fluxo: {e}")
+    
+    def fechar(self, aguardar: bool = True):
+        """
+        Encerra o fluxo, analisando o que ainda está pendente
+        
+        Args:
+            aguardar (bool): Se deve esperar a thread de análise terminar
         """
-        todas_palavras = []
-        for lista_palavras in df[coluna]:
-            if isinstance(lista_palavras, list):
-                todas_palavras.extend(lista_palavras)
+        self.fila.put(None)
+        if aguardar and self._thread is not None:
+            self._thread.join()
+
+
+def comparar_lote(mensagens: List[str], metodo: str = 'vader') -> pd.DataFrame:
+    """
+    Compara o caminho por mensagem com o modo colunar em tempo e memória
+    
+    Args:
+        mensagens (List[str]): Mensagens de amostra
+        metodo (str): Método de análise ('vader', 'textblob' ou 'lexico')
+        
+    Returns:
+        pd.DataFrame: Uma linha por modo com segundos, mensagens_por_segundo e memoria_mb
+    """
+    analisador = AnalisadorSentimento(metodo=metodo)
+    modos = {
+        'por_mensagem': lambda: pd.DataFrame([analisador.analisar_mensagem(m) for m in mensagens]),
+        'colunar': lambda: analisador.analisar_lote_colunar(mensagens)
+    }
+    
+    medicoes = []
+    for modo, executar in modos.items():
+        tracemalloc.start()
+        try:
+            inicio = time.perf_counter()
+            executar()
+            duracao = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        medicoes.append({
+            'modo': modo,
+            'segundos': duracao,
+            'mensagens_por_segundo': len(mensagens) / duracao if duracao > 0 else 0.0,
+            'memoria_mb': pico / (1024 * 1024)
+        })
+    
+    return pd.DataFrame(medicoes)
+
+
+def comparar_metodos(mensagens: List[str],
+                     metodos: Tuple[str, ...] = ('vader', 'textblob', 'lexico')) -> pd.DataFrame:
+    """
+    Compara o throughput dos métodos de sentimento, por mensagem e em lote
+    
+    Args:
+        mensagens (List[str]): Mensagens de amostra
+        metodos (Tuple[str, ...]): Métodos a comparar
         
-        from collections import Counter
-        return dict(Counter(todas_palavras).most_common(10))
+    Returns:
+        pd.DataFrame: Uma linha por método e modo (ver comparar_lote)
+    """
+    medicoes = [comparar_lote(mensagens, metodo=metodo).assign(metodo=metodo) for metodo in metodos]
+    colunas = ['metodo', 'modo', 'segundos', 'mensagens_por_segundo', 'memoria_mb']
+    return pd.concat(medicoes, ignore_index=True)[colunas]
 
 
 # Função de conveniência para uso direto
@@ -273,7 +1140,7 @@ def analisar_sentimento_rapido(texto: str, metodo: str = 'vader') -> Dict:
     
     Args:
         texto (str): Texto para análise
-        metodo (str): Método de análise ('vader' ou 'textblob')
+        metodo (str): Método de análise ('vader', 'textblob' ou 'lexico')
         
     Returns:
         Dict: Resultado da análise
@@ -315,4 +1182,12 @@ if __name__ == "__main__":
     print(f"Distribuição de urgência: {stats['distribuicao_urgencia']}")
     print(f"Score médio de sentimento: {stats['score_sentimento_medio']:.3f}")
     print(f"Score médio de urgência: {stats['score_urgencia_medio']:.3f}")
-
+    
+    # Modo colunar x por mensagem em 100 mil mensagens
+    print("\n--- Desempenho do modo colunar ---")
+    mensagens_bench = [f"{mensagens_teste[i % len(mensagens_teste)]} ({i % 5000})" for i in range(100000)]
+    print(comparar_lote(mensagens_bench).to_string(index=False))
+    
+    # Throughput dos três métodos (o léxico em português pontua o lote de uma vez)
+    print("\n--- Comparação de métodos ---")
+    print(comparar_metodos(mensagens_bench[:20000]).to_string(index=False))
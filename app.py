@@ -126,6 +126,13 @@ try:
     from nlp_relatorios import ProcessadorNLTK, GeradorRelatorios, plotly_para_streamlit
     # Importação do módulo de persistência
     from persistencia import GerenciadorPersistencia
+    # Registro de modelos compartilhado pelo processo
+    from registro_modelos import obter_registro
+    from pipeline_nlp import acumular_estatisticas, ler_estatisticas
+    from cache_resultados import obter_cache_resultados
+    from filtro_relevancia import obter_filtro_relevancia
+    from escalonador_nlp import CLASSES_PRIORIDADE
+    from controle_api_twitter import ControladorAPI
 except Exception as e:
     logger.error(f"Erro ao importar módulos: {str(e)}\n{traceback.format_exc()}")
 
@@ -133,6 +140,15 @@ except Exception as e:
 if 'processador_nltk' not in st.session_state:
     st.session_state.processador_nltk = ProcessadorNLTK()
 
+@st.cache_resource(show_spinner="Carregando modelos de NLP...")
+def aquecer_modelos():
+    """Carrega os modelos de NLP uma única vez por processo (warm-up)"""
+    registro = obter_registro()
+    tempos = registro.aquecer()
+    for nome, segundos in tempos.items():
+        logger.info(f"Modelo '{nome}' pronto em {segundos:.3f}s")
+    return registro
+
 # Função global de debug
 def debug_info(mensagem, nivel='info', exception=None):
     """Registra informações de debug com vários níveis"""
@@ -266,6 +282,9 @@ class MonitorEmergencias:
         # Inicializa variáveis de sessão
         self.inicializar_sessao()
 
+        # Cache, limite de requisições e modo simulado escolhidos pelo usuário
+        self.controlador = ControladorAPI()
+
         # Carrega dados com persistência
         self.carregar_dados_persistentes()
 
@@ -296,6 +315,14 @@ class MonitorEmergencias:
         if 'ultima_coleta' not in st.session_state:
             st.session_state.ultima_coleta = None
 
+        if 'modo_simulado' not in st.session_state:
+            # Com a API configurada, a coleta é real até o usuário escolher o modo simulado
+            st.session_state.modo_simulado = False
+
+        if 'estatisticas_acumuladas' not in st.session_state:
+            # Nome -> AcumuladorEstatisticas de todo o histórico (ver pipeline_nlp.acumular_estatisticas)
+            st.session_state.estatisticas_acumuladas = {}
+
     @monitorar_funcao
     def carregar_dados(self):
         """Carrega dados do arquivo JSON"""
@@ -316,6 +343,8 @@ class MonitorEmergencias:
                     df = pd.DataFrame(dados_json['mensagens'])
                     st.session_state.dados_processados = df
                     st.session_state.ultima_atualizacao = dados_json.get('ultima_atualizacao')
+                    st.session_state.estatisticas_acumuladas = {}
+                    self.acumular_estatisticas(df)
                     debug_info(f"Dados carregados com sucesso: {len(df)} mensagens")
                 else:
                     debug_info("Nenhuma mensagem encontrada no arquivo", nivel='warning')
@@ -377,60 +406,109 @@ class MonitorEmergencias:
             st.error(f"Erro ao salvar dados: {e}")
 
     @monitorar_funcao
-    def processar_dados_nlp(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Processa dados com NLP"""
+    def acumular_estatisticas(self, df_novos: pd.DataFrame):
+        """Atualiza as estatísticas acumuladas só com as mensagens novas (não relê o histórico)"""
+        if df_novos.empty:
+            return
+
+        try:
+            acumular_estatisticas(df_novos, st.session_state.estatisticas_acumuladas)
+        except Exception as e:
+            debug_info("Erro ao acumular estatísticas", nivel='error', exception=e)
+
+    @monitorar_funcao
+    def filtrar_relevancia(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Descarta itens coletados fora do idioma ou sem relação com emergências"""
+        if df.empty:
+            return df
+        
+        filtro = obter_filtro_relevancia()
+        df_aceito = filtro.filtrar_df(df)
+        
+        descartados = len(df) - len(df_aceito)
+        if descartados:
+            st.info(f"🔎 {descartados} de {len(df)} itens descartados pelo filtro de idioma/relevância")
+        debug_info(f"Filtro de relevância: {filtro.obter_estatisticas()}")
+        
+        return df_aceito
+    
+    @monitorar_funcao
+    def incorporar_criticas(self, df_criticas: pd.DataFrame) -> int:
+        """Incorpora e persiste mensagens críticas já analisadas, sem esperar o resto da coleta"""
+        # Sem id não há como evitar que voltem duplicadas com o resto da coleta
+        if df_criticas.empty or 'id' not in df_criticas.columns:
+            return 0
+
+        existentes = st.session_state.dados_processados
+        if not existentes.empty and 'id' in existentes.columns:
+            df_criticas = df_criticas[~df_criticas['id'].astype(str).isin(set(existentes['id'].astype(str)))]
+        if df_criticas.empty:
+            return 0
+
+        st.session_state.dados_processados = pd.concat([existentes, df_criticas], ignore_index=True)
+        self.acumular_estatisticas(df_criticas)
+        self.salvar_dados_persistentes(st.session_state.dados_processados)
+        return len(df_criticas)
+
+    @monitorar_funcao
+    def processar_dados_nlp(self, df: pd.DataFrame, persistir_criticas: bool = False) -> pd.DataFrame:
+        """
+        Processa dados com NLP
+
+        Com persistir_criticas, as mensagens da classe de prioridade mais alta
+        entram nos dados da sessão e são salvas assim que o seu micro-lote é
+        analisado; quem chama descarta essas mensagens (já existentes pelo id)
+        ao incorporar o resultado completo.
+        """
         if df.empty:
             return df
         
         try:
-            # Análise de sentimento
-            analisador_sentimento = AnalisadorSentimento()
-            
-            # Classificação de desastres
-            classificador = ClassificadorDesastre()
-            
-            # Extração de entidades
-            extrator = ExtratorEntidades()
+            # Pipeline compartilhado pelo processo (modelos carregados uma única vez)
+            pipeline = obter_registro().obter('pipeline')
             
             dados_processados = []
             
             progress_bar = st.progress(0)
             status_text = st.empty()
+            alerta_criticas = st.empty()
+            criticas_salvas = 0
             
-            for i, row in df.iterrows():
-                status_text.text(f'Processando mensagem {i+1}/{len(df)}...')
-                progress_bar.progress((i + 1) / len(df))
-                
-                texto = row.get('texto', '')
-                
-                # Análise de sentimento
-                resultado_sentimento = analisador_sentimento.analisar_mensagem(texto)
-                
-                # Classificação de tipo
-                resultado_classificacao = classificador.classificar_mensagem(texto)
-                
-                # Extração de entidades
-                resultado_entidades = extrator.extrair_todas_entidades(texto)
+            textos = df['texto'].fillna('').tolist() if 'texto' in df.columns else [''] * len(df)
+            fontes = df['fonte'].tolist() if 'fonte' in df.columns else None
+            linhas = df.to_dict('records')
+            
+            def ao_lote(posicoes, resultados):
+                nonlocal criticas_salvas
+                # Micro-lotes chegam em ordem de prioridade: mensagens críticas
+                # entram primeiro no DataFrame persistido e exibido
+                lote = []
+                for posicao, resultado in zip(posicoes, resultados):
+                    dados_linha = dict(linhas[posicao])
+                    dados_linha.update(resultado)
+                    lote.append(dados_linha)
+                dados_processados.extend(lote)
                 
-                # Combina resultados
-                dados_linha = row.to_dict()
-                dados_linha.update({
-                    'sentimento': resultado_sentimento['sentimento'],
-                    'score_sentimento': resultado_sentimento['score_composto'],
-                    'nivel_urgencia': resultado_sentimento['nivel_urgencia'],
-                    'score_urgencia': resultado_sentimento['score_urgencia'],
-                    'tipo_desastre': resultado_classificacao['tipo_predito'],
-                    'confianca_classificacao': resultado_classificacao['confianca'],
-                    'telefones': resultado_entidades['telefones'],
-                    'localizacoes': resultado_entidades['localizacoes'],
-                    'pessoas': resultado_entidades['pessoas'],
-                    'score_completude': resultado_entidades['score_completude']
-                })
+                criticas = [linha for linha in lote if linha['classe_prioridade'] == CLASSES_PRIORIDADE[-1]]
+                if persistir_criticas and criticas:
+                    criticas_salvas += self.incorporar_criticas(pd.DataFrame(criticas))
+                    if criticas_salvas:
+                        alerta_criticas.error(f"🚨 {criticas_salvas} mensagens críticas já disponíveis "
+                                              f"no painel; analisando as demais...")
                 
-                dados_processados.append(dados_linha)
+                status_text.text(f'Processando mensagem {len(dados_processados)}/{len(df)}...')
+                progress_bar.progress(len(dados_processados) / len(df))
+            
+            pipeline.processar_priorizado(textos, fontes, ao_lote=ao_lote)
+            debug_info(f"Cache de resultados NLP: {obter_cache_resultados().estatisticas()}")
+            debug_info(f"Espera na fila de prioridade: {pipeline.obter_estatisticas_fila()}")
+            debug_info(f"Fidelidade do NLP: {pipeline.obter_estatisticas_degradacao()}")
+            if pipeline.config_cascata['ativa']:
+                debug_info(f"Triagem em cascata: {pipeline.obter_estatisticas_cascata()}")
             
             progress_bar.empty()
             status_text.empty()
+            alerta_criticas.empty()
             
             return pd.DataFrame(dados_processados)
             
@@ -454,8 +532,9 @@ class MonitorEmergencias:
             else:
                 config = st.session_state.config_twitter
 
-                # Criando o coletor
+                # Criando o coletor (com cache e modo simulado da configuração)
                 coletor = ColetorTwitter(config)
+                config_coleta = self.controlador.configurar_coletor_twitter(coletor)
 
                 # Definindo termos de busca relevantes para desastres naturais
                 termos_busca = [
@@ -473,7 +552,10 @@ class MonitorEmergencias:
 
                 with st.spinner("Aguarde, buscando mensagens..."):
                     try:
-                        resultados = coletor.buscar_mensagens(termos_busca, max_resultados=100)
+                        # Os termos são divididos em queries que cabem no limite da API
+                        resultados = coletor.buscar_planejado(termos_busca, max_resultados_por_query=100,
+                                                              usar_cache=config_coleta['usar_cache'])
+                        debug_info(f"Coleta incremental do Twitter: {coletor.estatisticas_coleta}")
 
                         if not resultados or len(resultados) == 0:
                             status_msg.warning("⚠️ Nenhuma mensagem encontrada.")
@@ -489,8 +571,11 @@ class MonitorEmergencias:
                             if 'data_criacao' in df_novos.columns:
                                 df_novos['data_criacao'] = pd.to_datetime(df_novos['data_criacao'])
 
+                            # Descartar itens fora do idioma ou do tema antes do NLP
+                            df_novos = self.filtrar_relevancia(df_novos)
+
                             # Processar os novos dados com NLP
-                            df_processados = self.processar_dados_nlp(df_novos)
+                            df_processados = self.processar_dados_nlp(df_novos, persistir_criticas=True)
 
                             # Atualizar os dados existentes
                             if not st.session_state.dados_processados.empty:
@@ -506,6 +591,7 @@ class MonitorEmergencias:
                             else:
                                 st.session_state.dados_processados = df_processados
                                 status_msg.success(f"✅ {len(df_processados)} mensagens adicionadas!")
+                            self.acumular_estatisticas(df_processados)
 
                             # Atualizar data da última coleta
                             st.session_state.ultima_coleta = datetime.now()
@@ -564,8 +650,10 @@ class MonitorEmergencias:
                         else:
                             status_msg.info("ℹ️ Nenhuma nova mensagem simulada adicionada.")
                     else:
+                        df_novos_simulados = df_simulados
                         st.session_state.dados_processados = df_simulados
                         status_msg.info(f"ℹ️ {len(df_simulados)} mensagens simuladas adicionadas para teste.")
+                    self.acumular_estatisticas(df_novos_simulados)
 
                     # Atualizar data da última coleta
                     st.session_state.ultima_coleta = datetime.now()
@@ -596,7 +684,11 @@ class MonitorEmergencias:
 
             with st.spinner("Aguarde, buscando notícias sobre desastres..."):
                 # Buscar notícias
-                resultados = coletor.buscar_noticias(max_resultados=50)
+                config_cache = st.session_state.config_cache
+                resultados = coletor.buscar_noticias(max_resultados=50,
+                                                     usar_cache=config_cache['usar_cache'],
+                                                     validade_cache_minutos=config_cache['validade_cache'])
+                debug_info(f"Cache de respostas: {coletor.cache.estatisticas()}")
 
                 if not resultados or len(resultados) == 0:
                     status_msg.warning("⚠️ Nenhuma notícia encontrada via Serper.")
@@ -611,9 +703,12 @@ class MonitorEmergencias:
                 if 'data_criacao' in df_novos.columns:
                     df_novos['data_criacao'] = pd.to_datetime(df_novos['data_criacao'])
 
+                # Descartar itens fora do idioma ou do tema antes do NLP
+                df_novos = self.filtrar_relevancia(df_novos)
+
                 # Processar os novos dados com NLP
                 status_msg.info("🧠 Processando notícias com análise de linguagem natural...")
-                df_processados = self.processar_dados_nlp(df_novos)
+                df_processados = self.processar_dados_nlp(df_novos, persistir_criticas=True)
 
                 # Atualizar os dados existentes
                 if not st.session_state.dados_processados.empty:
@@ -629,6 +724,7 @@ class MonitorEmergencias:
                 else:
                     st.session_state.dados_processados = df_processados
                     status_msg.success(f"✅ {len(df_processados)} notícias adicionadas!")
+                self.acumular_estatisticas(df_processados)
 
                 # Atualizar data da última coleta
                 st.session_state.ultima_coleta = datetime.now()
@@ -748,6 +844,17 @@ class MonitorEmergencias:
                         st.success("✅ Configurações salvas com sucesso!")
                     else:
                         st.error("❌ O Bearer Token é obrigatório.")
+                
+                # A coleta pede só tweets mais novos que a última; o reset refaz
+                # a busca da janela inteira na próxima coleta (backfill)
+                if st.button("Reiniciar coleta incremental", help="Esquece os últimos tweets coletados por busca"):
+                    from coleta_twitter_api import ARQUIVO_MARCAS_COLETA
+                    from marcas_coleta import MarcasColeta
+                    MarcasColeta(ARQUIVO_MARCAS_COLETA).resetar()
+                    st.success("✅ Próxima coleta buscará a janela completa")
+
+            with st.expander("🛡️ Proteção contra Rate Limit"):
+                self.controlador.mostrar_configuracoes_api()
             st.subheader("🔍 Filtros")
             st.session_state.filtro_tipo = st.selectbox(
                 "Tipo de desastre",
@@ -938,6 +1045,26 @@ class MonitorEmergencias:
             else:
                 st.metric("Média de Urgência", "N/A")
 
+        # Histórico completo, lido das estatísticas acumuladas (sem reagregar os dados)
+        estatisticas = ler_estatisticas(st.session_state.estatisticas_acumuladas)
+        if estatisticas['sentimento']:
+            with st.expander("🗂️ Histórico acumulado (todas as coletas)"):
+                sentimento = estatisticas['sentimento']
+                classificacao = estatisticas['classificacao']
+                entidades = estatisticas['entidades']
+
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Mensagens Analisadas", sentimento['total_mensagens'])
+                col2.metric("Urgência Crítica", sentimento['mensagens_criticas'])
+                col3.metric("Média de Urgência", f"{sentimento['score_urgencia_medio']:.2f}")
+                if entidades:
+                    col4.metric("Com Localização", entidades['mensagens_com_localizacao'])
+
+                if classificacao:
+                    st.write("**Tipos de desastre:**", classificacao['distribuicao_tipos'])
+                st.write("**Níveis de urgência:**", sentimento['distribuicao_urgencia'])
+                st.write("**Sentimento:**", sentimento['distribuicao_sentimento'])
+
         # Gráficos e visualizações
         st.subheader("📈 Visualizações")
         tab1, tab2, tab3, tab4, tab5 = st.tabs(["Mensagens", "Gráficos", "Mapa", "Nuvem de Palavras", "Análise de Texto"])
@@ -945,7 +1072,11 @@ class MonitorEmergencias:
         with tab1:
             # Lista de mensagens
             st.subheader("📝 Mensagens Recentes")
-            for i, row in df_filtrado.sort_values('data_criacao', ascending=False).head(10).iterrows():
+            ordenacao = ['data_criacao']
+            if 'score_prioridade' in df_filtrado.columns:
+                # Mensagens de maior prioridade aparecem primeiro
+                ordenacao = ['score_prioridade', 'data_criacao']
+            for i, row in df_filtrado.sort_values(ordenacao, ascending=False).head(10).iterrows():
                 urgencia_class = ""
                 if row['nivel_urgencia'] == 'Alto':
                     urgencia_class = "high-urgency"
@@ -1225,6 +1356,12 @@ class MonitorEmergencias:
                     if 'ultima_coleta' in metadata:
                         st.session_state.ultima_coleta = metadata.get('ultima_coleta')
 
+                # Estatísticas acumuladas gravadas com os dados; um cache anterior
+                # aos acumuladores é lido uma única vez para reconstruí-las
+                st.session_state.estatisticas_acumuladas = self.persistencia.extrair_estatisticas(metadata)
+                if not st.session_state.estatisticas_acumuladas:
+                    self.acumular_estatisticas(df)
+
                 debug_info(f"Dados carregados do cache com sucesso: {len(df)} registros")
                 return True
             else:
@@ -1262,7 +1399,9 @@ class MonitorEmergencias:
             }
 
             # Salva usando o gerenciador de persistência
-            resultado = self.persistencia.salvar_dados(df, metadata)
+            resultado = self.persistencia.salvar_dados(
+                df, metadata, estatisticas=st.session_state.estatisticas_acumuladas
+            )
 
             if resultado:
                 # Atualiza informações da sessão
@@ -1284,6 +1423,7 @@ class MonitorEmergencias:
 # Inicialização da aplicação
 if __name__ == "__main__":
     try:
+        aquecer_modelos()
         monitor = MonitorEmergencias()
         monitor.construir_interface()
     except Exception as e:
@@ -0,0 +1,310 @@
+"""
+Cache de Respostas das APIs de Coleta
+Guarda respostas do Twitter e do Serper em disco, comprimidas, com validade por
+entrada e limite de tamanho (descarte das menos usadas), para que atualizações
+repetidas do painel dentro da validade não consumam requisições à API
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional
+
+# Validade das entradas quando o chamador não informa outra (30 minutos, o
+# padrão de ControladorAPI)
+VALIDADE_PADRAO_S = 30 * 60
+
+
+class CacheRespostas:
+    """Respostas comprimidas em arquivos, com índice SQLite (validade e uso de cada entrada)"""
+
+    def __init__(self, diretorio: str = 'data/cache/respostas', tamanho_maximo_mb: float = 50,
+                 validade_padrao_s: float = VALIDADE_PADRAO_S):
+        """
+        Inicializa o cache
+
+        Args:
+            diretorio (str): Diretório das entradas e do índice
+            tamanho_maximo_mb (float): Espaço máximo das entradas comprimidas
+            validade_padrao_s (float): Validade de uma entrada sem validade explícita
+        """
+        self.diretorio = diretorio
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+        self.validade_padrao_s = validade_padrao_s
+        self.caminho_indice = os.path.join(self.diretorio, 'indice.sqlite')
+
+        self._lock = threading.Lock()
+        self._contadores: Dict[str, Dict[str, int]] = {}
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                " namespace TEXT, chave TEXT, arquivo TEXT, tamanho INTEGER,"
+                " criado_em REAL, expira_em REAL, acessado_em REAL,"
+                " PRIMARY KEY (namespace, chave))"
+            )
+            conexao.execute("CREATE INDEX IF NOT EXISTS idx_acesso ON entradas (acessado_em)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre uma conexão com o índice (uma por operação, segura entre threads e processos)"""
+        conexao = sqlite3.connect(self.caminho_indice, timeout=30)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return conexao
+
+    @staticmethod
+    def calcular_chave(*partes: Any) -> str:
+        """
+        Calcula a chave de uma requisição a partir dos seus parâmetros
+
+        Args:
+            *partes: Parâmetros que identificam a requisição (query, limites, ...)
+
+        Returns:
+            str: Hash SHA-256 dos parâmetros
+        """
+        texto = json.dumps(partes, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _contar(self, namespace: str, tipo: str, quantidade: int = 1):
+        """Atualiza os contadores de acerto/falha/descarte de um namespace"""
+        with self._lock:
+            contadores = self._contadores.setdefault(
+                namespace, {'acertos': 0, 'falhas': 0, 'expirados': 0, 'descartes': 0}
+            )
+            contadores[tipo] += quantidade
+
+    def _remover_arquivos(self, arquivos):
+        """Apaga arquivos de entradas já retiradas do índice"""
+        for arquivo in arquivos:
+            try:
+                os.remove(os.path.join(self.diretorio, arquivo))
+            except FileNotFoundError:
+                pass
+
+    def obter(self, namespace: str, chave: str, validade_s: Optional[float] = None) -> Optional[Any]:
+        """
+        Retorna uma resposta em cache, se existir e estiver válida
+
+        A validade é conferida pelo índice, antes de ler o arquivo: entradas
+        vencidas nunca são descomprimidas.
+
+        Args:
+            namespace (str): Origem da resposta (ex.: 'twitter', 'serper')
+            chave (str): Chave da requisição (ver calcular_chave)
+            validade_s (float, optional): Idade máxima aceita; encurta a validade
+                gravada na entrada (útil quando o usuário reduz a validade)
+
+        Returns:
+            Optional[Any]: Resposta guardada ou None
+        """
+        agora = time.time()
+        try:
+            with closing(self._conectar()) as conexao, conexao:
+                linha = conexao.execute(
+                    "SELECT arquivo, criado_em, expira_em FROM entradas WHERE namespace = ? AND chave = ?",
+                    (namespace, chave)
+                ).fetchone()
+                if linha is None:
+                    self._contar(namespace, 'falhas')
+                    return None
+
+                arquivo, criado_em, expira_em = linha
+                if agora >= expira_em or (validade_s is not None and agora - criado_em > validade_s):
+                    conexao.execute("DELETE FROM entradas WHERE namespace = ? AND chave = ?",
+                                    (namespace, chave))
+                    self._remover_arquivos([arquivo])
+                    self._contar(namespace, 'expirados')
+                    self._contar(namespace, 'falhas')
+                    return None
+
+                with open(os.path.join(self.diretorio, arquivo), 'rb') as f:
+                    valor = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+                conexao.execute(
+                    "UPDATE entradas SET acessado_em = ? WHERE namespace = ? AND chave = ?",
+                    (agora, namespace, chave)
+                )
+        except Exception as e:
+            print(f"Erro ao ler cache de respostas: {e}")
+            self._contar(namespace, 'falhas')
+            return None
+
+        self._contar(namespace, 'acertos')
+        return valor
+
+    def guardar(self, namespace: str, chave: str, valor: Any, validade_s: Optional[float] = None):
+        """
+        Grava uma resposta e descarta as menos usadas se o limite de tamanho for excedido
+
+        Args:
+            namespace (str): Origem da resposta
+            chave (str): Chave da requisição
+            valor (Any): Resposta serializável em JSON
+            validade_s (float, optional): Validade desta entrada (padrão do cache se omitida)
+        """
+        validade_s = self.validade_padrao_s if validade_s is None else validade_s
+        arquivo = f"{namespace}_{chave}.json.z"
+        caminho = os.path.join(self.diretorio, arquivo)
+
+        try:
+            dados = zlib.compress(json.dumps(valor, ensure_ascii=False).encode('utf-8'))
+
+            # Arquivo temporário + substituição: leitores nunca veem entrada incompleta
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(dados)
+            os.replace(temporario, caminho)
+
+            agora = time.time()
+            with closing(self._conectar()) as conexao, conexao:
+                conexao.execute(
+                    "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, chave, arquivo, len(dados), agora, agora + validade_s, agora)
+                )
+            self._descartar_excedente()
+        except Exception as e:
+            print(f"Erro ao gravar cache de respostas: {e}")
+
+    def _descartar_excedente(self):
+        """Remove as entradas vencidas e, se ainda exceder o limite, as menos usadas"""
+        with closing(self._conectar()) as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                agora = time.time()
+                vencidas = conexao.execute(
+                    "SELECT namespace, chave, arquivo FROM entradas WHERE expira_em <= ?", (agora,)
+                ).fetchall()
+                conexao.execute("DELETE FROM entradas WHERE expira_em <= ?", (agora,))
+
+                descartadas = []
+                total = conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM entradas").fetchone()[0]
+                if total > self.tamanho_maximo:
+                    for namespace, chave, arquivo, tamanho in conexao.execute(
+                        "SELECT namespace, chave, arquivo, tamanho FROM entradas ORDER BY acessado_em"
+                    ).fetchall():
+                        if total <= self.tamanho_maximo:
+                            break
+                        descartadas.append((namespace, chave, arquivo))
+                        total -= tamanho
+                    conexao.executemany("DELETE FROM entradas WHERE namespace = ? AND chave = ?",
+                                        [(namespace, chave) for namespace, chave, _ in descartadas])
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+
+        self._remover_arquivos([arquivo for _, _, arquivo in vencidas + descartadas])
+        for namespace, _, _ in vencidas:
+            self._contar(namespace, 'expirados')
+        for namespace, _, _ in descartadas:
+            self._contar(namespace, 'descartes')
+
+    def obter_ou_buscar(self, namespace: str, chave: str, buscar: Callable[[], Any],
+                        validade_s: Optional[float] = None) -> Any:
+        """
+        Retorna a resposta em cache ou a busca na API e a guarda
+
+        Args:
+            namespace (str): Origem da resposta
+            chave (str): Chave da requisição
+            buscar (Callable): Faz a requisição; um retorno None não é guardado
+            validade_s (float, optional): Validade da entrada
+
+        Returns:
+            Any: Resposta (do cache ou da API)
+        """
+        valor = self.obter(namespace, chave, validade_s)
+        if valor is None:
+            valor = buscar()
+            if valor is not None:
+                self.guardar(namespace, chave, valor, validade_s)
+        return valor
+
+    def estatisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna acertos, falhas e descartes por namespace e a ocupação do disco
+
+        Returns:
+            Dict: Por namespace, acertos, falhas, expirados, descartes e taxa_acerto;
+                em 'disco', entradas, bytes e capacidade
+        """
+        with self._lock:
+            estatisticas = {}
+            for namespace, contadores in self._contadores.items():
+                total = contadores['acertos'] + contadores['falhas']
+                estatisticas[namespace] = {
+                    **contadores,
+                    'taxa_acerto': contadores['acertos'] / total if total else 0.0
+                }
+
+        try:
+            with closing(self._conectar()) as conexao:
+                entradas, tamanho = conexao.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas"
+                ).fetchone()
+        except Exception as e:
+            print(f"Erro ao ler cache de respostas: {e}")
+            entradas, tamanho = 0, 0
+        estatisticas['disco'] = {'entradas': entradas, 'bytes': tamanho, 'capacidade': self.tamanho_maximo}
+        return estatisticas
+
+    def limpar(self, namespace: Optional[str] = None):
+        """
+        Descarta respostas guardadas
+
+        Args:
+            namespace (str, optional): Origem a limpar; todas se omitida
+        """
+        with closing(self._conectar()) as conexao, conexao:
+            if namespace is None:
+                arquivos = [a for (a,) in conexao.execute("SELECT arquivo FROM entradas")]
+                conexao.execute("DELETE FROM entradas")
+            else:
+                arquivos = [a for (a,) in conexao.execute(
+                    "SELECT arquivo FROM entradas WHERE namespace = ?", (namespace,))]
+                conexao.execute("DELETE FROM entradas WHERE namespace = ?", (namespace,))
+        self._remover_arquivos(arquivos)
+
+
+_cache_global: Optional[CacheRespostas] = None
+_lock_global = threading.Lock()
+
+
+def obter_cache_respostas() -> CacheRespostas:
+    """
+    Retorna o cache de respostas do processo, criando-o na primeira chamada
+
+    Returns:
+        CacheRespostas: Cache compartilhado pelos coletores
+    """
+    global _cache_global
+    if _cache_global is None:
+        with _lock_global:
+            if _cache_global is None:
+                _cache_global = CacheRespostas()
+    return _cache_global
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    cache = CacheRespostas('/tmp/cache_respostas_teste', tamanho_maximo_mb=0.0005, validade_padrao_s=1)
+    cache.limpar()
+
+    buscar = lambda: [{'id': i, 'texto': f"Enchente no bairro {i}"} for i in range(20)]
+    chave = CacheRespostas.calcular_chave('enchente', 100, 24)
+    print(len(cache.obter_ou_buscar('twitter', chave, buscar)))
+    print(len(cache.obter_ou_buscar('twitter', chave, buscar)))
+
+    # Entradas além do limite de tamanho descartam as menos usadas
+    for i in range(5):
+        cache.guardar('serper', CacheRespostas.calcular_chave('termo', i), buscar())
+
+    time.sleep(1.1)
+    print(cache.obter('twitter', chave))
+    print(cache.estatisticas())
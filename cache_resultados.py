@@ -0,0 +1,260 @@
+"""
+Cache de Resultados de NLP
+Reaproveita sentimento, classificação e entidades de mensagens repetidas
+(retweets, alertas copiados, a mesma manchete vinda de vários termos de busca),
+endereçando cada resultado pelo hash do texto normalizado e pela versão do modelo
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+
+from normalizacao import VERSAO_NORMALIZACAO, normalizar
+
+# Componentes cujo resultado depende do texto exato (posições, caixa do NER)
+# são endereçados sem normalização
+COMPONENTES_TEXTO_EXATO = {'entidades'}
+
+
+class CacheResultadosNLP:
+    """Cache de dois níveis: LRU em memória e SQLite em disco"""
+
+    def __init__(self, caminho_banco: str = 'data/cache/resultados_nlp.sqlite',
+                 tamanho_memoria: int = 20000):
+        """
+        Inicializa o cache
+
+        Args:
+            caminho_banco (str): Arquivo SQLite do nível persistente (None desativa o disco)
+            tamanho_memoria (int): Máximo de resultados mantidos em memória
+        """
+        self.caminho_banco = caminho_banco
+        self.tamanho_memoria = tamanho_memoria
+
+        self._memoria: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores: Dict[str, Dict[str, int]] = {}
+
+        if self.caminho_banco:
+            diretorio = os.path.dirname(self.caminho_banco)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            with closing(self._conectar()) as conexao, conexao:
+                conexao.execute(
+                    "CREATE TABLE IF NOT EXISTS resultados ("
+                    " componente TEXT, versao TEXT, chave TEXT, valor BLOB, criado_em REAL,"
+                    " PRIMARY KEY (componente, versao, chave))"
+                )
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre uma conexão com o banco (uma por operação, segura entre threads e processos)"""
+        conexao = sqlite3.connect(self.caminho_banco, timeout=30)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return conexao
+
+    @staticmethod
+    def calcular_chave(texto: str, componente: str) -> str:
+        """
+        Calcula o endereço de um texto no cache
+
+        Args:
+            texto (str): Texto da mensagem
+            componente (str): 'sentimento', 'classificacao' ou 'entidades'
+
+        Returns:
+            str: Hash SHA-256 do texto (normalizado, exceto para entidades, e
+                prefixado pela versão da normalização)
+        """
+        if componente not in COMPONENTES_TEXTO_EXATO:
+            texto = f"{VERSAO_NORMALIZACAO}:{normalizar(texto, 'chave')}"
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _contar(self, componente: str, tipo: str, quantidade: int = 1):
+        """Atualiza os contadores de acerto/falha de um componente"""
+        contadores = self._contadores.setdefault(
+            componente, {'acertos_memoria': 0, 'acertos_disco': 0, 'falhas': 0}
+        )
+        contadores[tipo] += quantidade
+
+    def _guardar_memoria(self, chave_completa: tuple, valor: Any):
+        """Insere na LRU em memória, descartando os itens menos usados"""
+        self._memoria[chave_completa] = valor
+        self._memoria.move_to_end(chave_completa)
+        while len(self._memoria) > self.tamanho_memoria:
+            self._memoria.popitem(last=False)
+
+    def _buscar_disco(self, componente: str, versao: str, chaves: List[str]) -> Dict[str, Any]:
+        """Busca um conjunto de chaves no nível persistente"""
+        encontrados = {}
+        if not self.caminho_banco or not chaves:
+            return encontrados
+
+        try:
+            with closing(self._conectar()) as conexao, conexao:
+                # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+                for inicio in range(0, len(chaves), 500):
+                    bloco = chaves[inicio:inicio + 500]
+                    marcadores = ','.join('?' * len(bloco))
+                    linhas = conexao.execute(
+                        f"SELECT chave, valor FROM resultados WHERE componente = ? AND versao = ?"
+                        f" AND chave IN ({marcadores})",
+                        [componente, versao, *bloco]
+                    )
+                    for chave, valor in linhas:
+                        encontrados[chave] = pickle.loads(valor)
+        except Exception as e:
+            print(f"Erro ao ler cache de resultados: {e}")
+
+        return encontrados
+
+    def _salvar_disco(self, componente: str, versao: str, itens: Dict[str, Any]):
+        """Grava resultados novos no nível persistente"""
+        if not self.caminho_banco or not itens:
+            return
+
+        try:
+            agora = time.time()
+            with closing(self._conectar()) as conexao, conexao:
+                conexao.executemany(
+                    "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?)",
+                    [(componente, versao, chave, pickle.dumps(valor), agora)
+                     for chave, valor in itens.items()]
+                )
+        except Exception as e:
+            print(f"Erro ao gravar cache de resultados: {e}")
+
+    def obter_ou_calcular(self, componente: str, versao: str, textos: List[str],
+                          calcular: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """
+        Retorna o resultado de cada texto, calculando só os que não estão em cache
+
+        Cópias da mesma mensagem dentro do lote são calculadas uma única vez.
+
+        Args:
+            componente (str): Nome do componente ('sentimento', 'classificacao', 'entidades')
+            versao (str): Versão do modelo que produz os resultados
+            textos (List[str]): Textos das mensagens
+            calcular (Callable): Recebe a lista de textos faltantes e devolve um
+                resultado por texto, na mesma ordem
+
+        Returns:
+            List[Any]: Um resultado por texto de entrada
+        """
+        chaves = [self.calcular_chave(texto, componente) for texto in textos]
+        resultados: Dict[str, Any] = {}
+
+        # Nível 1: memória
+        with self._lock:
+            for chave in dict.fromkeys(chaves):
+                chave_completa = (componente, versao, chave)
+                if chave_completa in self._memoria:
+                    self._memoria.move_to_end(chave_completa)
+                    resultados[chave] = self._memoria[chave_completa]
+
+        # Nível 2: disco
+        faltantes = [chave for chave in dict.fromkeys(chaves) if chave not in resultados]
+        do_disco = self._buscar_disco(componente, versao, faltantes)
+        resultados.update(do_disco)
+
+        # Calcula o que falta, um texto representante por chave
+        representantes = {}
+        for chave, texto in zip(chaves, textos):
+            if chave not in resultados and chave not in representantes:
+                representantes[chave] = texto
+
+        calculados = {}
+        if representantes:
+            valores = calcular(list(representantes.values()))
+            calculados = dict(zip(representantes, valores))
+            resultados.update(calculados)
+            self._salvar_disco(componente, versao, calculados)
+
+        with self._lock:
+            for chave, valor in {**do_disco, **calculados}.items():
+                self._guardar_memoria((componente, versao, chave), valor)
+
+            # Cópias de uma mensagem calculada neste lote contam como acerto
+            self._contar(componente, 'acertos_disco', len(do_disco))
+            self._contar(componente, 'falhas', len(calculados))
+            self._contar(componente, 'acertos_memoria', len(chaves) - len(do_disco) - len(calculados))
+
+        return [resultados[chave] for chave in chaves]
+
+    def estatisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna acertos e falhas por componente
+
+        Returns:
+            Dict: Por componente, acertos_memoria, acertos_disco, falhas e taxa_acerto
+        """
+        with self._lock:
+            estatisticas = {}
+            for componente, contadores in self._contadores.items():
+                total = sum(contadores.values())
+                estatisticas[componente] = {
+                    **contadores,
+                    'taxa_acerto': (total - contadores['falhas']) / total if total else 0.0
+                }
+            estatisticas['memoria'] = {'itens': len(self._memoria), 'capacidade': self.tamanho_memoria}
+            return estatisticas
+
+    def limpar(self, componente: Optional[str] = None):
+        """
+        Descarta resultados em memória e em disco
+
+        Args:
+            componente (str, optional): Componente a limpar; todos se omitido
+        """
+        with self._lock:
+            if componente is None:
+                self._memoria.clear()
+            else:
+                for chave_completa in [c for c in self._memoria if c[0] == componente]:
+                    del self._memoria[chave_completa]
+
+        if self.caminho_banco:
+            with closing(self._conectar()) as conexao, conexao:
+                if componente is None:
+                    conexao.execute("DELETE FROM resultados")
+                else:
+                    conexao.execute("DELETE FROM resultados WHERE componente = ?", (componente,))
+
+
+_cache_global: Optional[CacheResultadosNLP] = None
+_lock_global = threading.Lock()
+
+
+def obter_cache_resultados() -> CacheResultadosNLP:
+    """
+    Retorna o cache de resultados do processo, criando-o na primeira chamada
+
+    Returns:
+        CacheResultadosNLP: Cache compartilhado entre sessões
+    """
+    global _cache_global
+    if _cache_global is None:
+        with _lock_global:
+            if _cache_global is None:
+                _cache_global = CacheResultadosNLP()
+    return _cache_global
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    cache = CacheResultadosNLP(caminho_banco=None)
+    mensagens = [
+        "Enchente na Rua das Flores, precisamos de ajuda",
+        "RT @defesacivil: Enchente na Rua das Flores, precisamos de ajuda https://t.co/abc",
+        "Incêndio no morro"
+    ]
+
+    calcular = lambda textos: [len(texto) for texto in textos]
+    print(cache.obter_ou_calcular('sentimento', 'v1', mensagens, calcular))
+    print(cache.obter_ou_calcular('sentimento', 'v1', mensagens, calcular))
+    print(cache.estatisticas())
@@ -7,27 +7,135 @@ import re
 import pickle
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from typing import Dict, List, Tuple, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.pipeline import Pipeline
+import sklearn
 import joblib
+import hashlib
+import json
 import os
 
+from lexicos import padrao_trie
+from normalizacao import PERFIS_NORMALIZACAO, VERSAO_NORMALIZACAO, normalizar
+from estatisticas_incrementais import AcumuladorEstatisticas
+
+
+class IndicePalavrasChave:
+    """Léxico de palavras-chave compilado em um único padrão e matrizes esparsas"""
+    
+    # Separador entre mensagens concatenadas (nenhuma palavra-chave o contém)
+    SEPARADOR = '\n'
+    
+    def __init__(self, palavras_chave: Dict[str, List[str]]):
+        """
+        Compila o léxico
+        
+        Args:
+            palavras_chave (Dict[str, List[str]]): Tipo de desastre -> palavras-chave
+        """
+        self.origem = palavras_chave
+        self.tipos = list(palavras_chave)
+        self.posicao_tipo = {tipo: j for j, tipo in enumerate(self.tipos)}
+        
+        # Mais longas primeiro: numa mesma posição o padrão casa a maior palavra
+        self.palavras = sorted({p for lista in palavras_chave.values() for p in lista},
+                               key=len, reverse=True)
+        self.indice_palavra = {p: i for i, p in enumerate(self.palavras)}
+        
+        # Lookahead para encontrar ocorrências sobrepostas numa única varredura;
+        # as alternativas são fatoradas em trie para o regex testar cada posição
+        # em poucos passos, independente do tamanho do léxico
+        alternativas = padrao_trie(self.palavras)
+        self.padrao = re.compile(f'(?=({alternativas}))') if self.palavras else None
+        
+        n_palavras = len(self.palavras)
+        
+        # Matriz palavra x tipo (listas com palavras repetidas contam em dobro,
+        # como no cálculo original)
+        linhas, colunas = [], []
+        for j, tipo in enumerate(self.tipos):
+            for palavra in palavras_chave[tipo]:
+                linhas.append(self.indice_palavra[palavra])
+                colunas.append(j)
+        self.matriz_tipos = sparse.csr_matrix(
+            (np.ones(len(linhas)), (linhas, colunas)), shape=(n_palavras, len(self.tipos))
+        )
+        self.total_por_tipo = np.array([len(palavras_chave[t]) for t in self.tipos], dtype=float)
+        
+        # Matriz de contenção: se "chuva de pedra" aparece, "chuva" também aparece
+        linhas, colunas = [], []
+        for i, maior in enumerate(self.palavras):
+            for j, menor in enumerate(self.palavras):
+                if menor in maior:
+                    linhas.append(i)
+                    colunas.append(j)
+        self.matriz_contencao = sparse.csr_matrix(
+            (np.ones(len(linhas)), (linhas, colunas)), shape=(n_palavras, n_palavras)
+        )
+    
+    def matriz_presenca(self, textos: List[str]) -> sparse.csr_matrix:
+        """
+        Indica quais palavras-chave aparecem (como substring) em cada texto
+        
+        Args:
+            textos (List[str]): Textos em minúsculas
+            
+        Returns:
+            sparse.csr_matrix: Matriz binária mensagens x palavras-chave
+        """
+        n = len(textos)
+        forma = (n, len(self.palavras))
+        if not n or self.padrao is None:
+            return sparse.csr_matrix(forma)
+        
+        # Varre o lote inteiro de uma vez e mapeia cada ocorrência à sua mensagem
+        inicios = np.cumsum([0] + [len(t) + len(self.SEPARADOR) for t in textos[:-1]])
+        texto_unico = self.SEPARADOR.join(textos)
+        
+        posicoes, ids = [], []
+        for match in self.padrao.finditer(texto_unico):
+            posicoes.append(match.start())
+            ids.append(self.indice_palavra[match.group(1)])
+        
+        linhas = np.searchsorted(inicios, posicoes, side='right') - 1
+        presenca = sparse.csr_matrix((np.ones(len(ids)), (linhas, ids)), shape=forma)
+        
+        presenca = presenca @ self.matriz_contencao
+        presenca.data[:] = 1.0
+        return presenca
+    
+    def contar_por_tipo(self, textos: List[str]) -> np.ndarray:
+        """
+        Conta as palavras-chave encontradas de cada tipo em cada texto
+        
+        Args:
+            textos (List[str]): Textos em minúsculas
+            
+        Returns:
+            np.ndarray: Matriz mensagens x tipos (na ordem de self.tipos)
+        """
+        return (self.matriz_presenca(textos) @ self.matriz_tipos).toarray()
+
 
 class ClassificadorDesastre:
     """Classe para classificação de tipos de desastre em mensagens emergenciais"""
     
-    def __init__(self, modelo_path: Optional[str] = None):
+    def __init__(self, modelo_path: Optional[str] = None,
+                 diretorio_cache: Optional[str] = 'data/modelos'):
         """
         Inicializa o classificador
         
         Args:
             modelo_path (str, optional): Caminho para modelo pré-treinado
+            diretorio_cache (str, optional): Diretório do cache de modelos treinados
+                (None desativa o cache em disco)
         """
         self.tipos_desastre = [
             'enchente', 'incendio', 'deslizamento', 'vendaval', 'granizo',
@@ -83,16 +191,65 @@ class ClassificadorDesastre:
             ]
         }
         
+        # Parâmetros do vetorizador (fazem parte da impressão digital do cache)
+        self.parametros_tfidf = {
+            'max_features': 5000,
+            'ngram_range': (1, 2),
+            'stop_words': None,  # Mantém stop words para português
+            'min_df': 2,
+            'max_df': 0.95
+        }
+        
+        # Cache em disco de modelos treinados
+        self.diretorio_cache = diretorio_cache
+        self.fingerprint = None
+        self.metricas = None
+        
         # Pipeline de processamento
         self.pipeline = None
         self.vectorizer = None
         self.modelo = None
         self.treinado = False
         
+        # Léxico compilado (construído sob demanda)
+        self._indice_palavras = None
+        
+        # Modo de aprendizado online (features com hashing + partial_fit)
+        self.modo_online = False
+        self.caminho_checkpoint = None
+        self.intervalo_checkpoint = 0
+        self.amostras_online = 0
+        self._amostras_desde_checkpoint = 0
+        
+        # Versão do modelo atual (endereça resultados em cache; calculada sob demanda)
+        self._versao = None
+        
         # Carrega modelo se fornecido
         if modelo_path and os.path.exists(modelo_path):
             self.carregar_modelo(modelo_path)
     
+    def obter_versao(self) -> str:
+        """
+        Identifica o modelo atual para endereçar resultados em cache
+        
+        Modelos treinados em lote usam o fingerprint do treinamento; modelos
+        carregados de arquivo ou em modo online usam o hash do pipeline, que
+        muda a cada atualização incremental.
+        
+        Returns:
+            str: Versão do modelo, do léxico de palavras-chave e da normalização
+        """
+        if self._versao is None:
+            h = hashlib.sha256()
+            if self.fingerprint and not self.modo_online:
+                h.update(self.fingerprint.encode('utf-8'))
+            else:
+                h.update(pickle.dumps(self.pipeline))
+            h.update(json.dumps(self.palavras_chave, sort_keys=True).encode('utf-8'))
+            h.update(str(VERSAO_NORMALIZACAO).encode('utf-8'))
+            self._versao = h.hexdigest()[:16]
+        return self._versao
+    
     def preprocessar_texto(self, texto: str) -> str:
         """
         Preprocessa texto para classificação
@@ -103,25 +260,7 @@ class ClassificadorDesastre:
         Returns:
             str: Texto preprocessado
         """
-        # Converte para minúsculas
-        texto = texto.lower()
-        
-        # Remove URLs
-        texto = re.sub(r'http\S+|www\S+|https\S+', '', texto, flags=re.MULTILINE)
-        
-        # Remove menções e hashtags
-        texto = re.sub(r'@\w+|#\w+', '', texto)
-        
-        # Remove números de telefone
-        texto = re.sub(r'\b\d{2,5}[-\s]?\d{4,5}[-\s]?\d{4}\b', '', texto)
-        
-        # Remove caracteres especiais, mantém acentos
-        texto = re.sub(r'[^\w\sáàâãéèêíìîóòôõúùûç]', ' ', texto)
-        
-        # Remove espaços múltiplos
-        texto = re.sub(r'\s+', ' ', texto).strip()
-        
-        return texto
+        return normalizar(texto, 'classificacao')
     
     def gerar_dados_sinteticos(self) -> pd.DataFrame:
         """
@@ -230,14 +369,109 @@ class ClassificadorDesastre:
         
         return pd.DataFrame(dados_sinteticos)
     
+    def calcular_fingerprint(self, dados: pd.DataFrame, algoritmo: str) -> str:
+        """
+        Calcula a impressão digital de um treinamento
+        
+        Args:
+            dados (pd.DataFrame): Dados de treinamento (colunas texto e tipo_desastre)
+            algoritmo (str): Algoritmo de classificação
+            
+        Returns:
+            str: Hash SHA-256 dos dados, algoritmo, parâmetros do vetorizador e
+                versão do preprocessamento
+        """
+        h = hashlib.sha256()
+        h.update(algoritmo.encode('utf-8'))
+        h.update(repr(sorted(self.parametros_tfidf.items())).encode('utf-8'))
+        # O pipeline é treinado sobre preprocessar_texto (perfil 'classificacao')
+        h.update(repr((VERSAO_NORMALIZACAO, PERFIS_NORMALIZACAO['classificacao'])).encode('utf-8'))
+        h.update(sklearn.__version__.encode('utf-8'))
+        for texto, tipo in zip(dados['texto'], dados['tipo_desastre']):
+            h.update(str(texto).encode('utf-8'))
+            h.update(b'\x1f')
+            h.update(str(tipo).encode('utf-8'))
+            h.update(b'\x1e')
+        return h.hexdigest()
+    
+    def _caminhos_cache(self, fingerprint: str) -> Tuple[str, str]:
+        """Retorna os caminhos do modelo e das métricas no cache"""
+        base = os.path.join(self.diretorio_cache, f"classificador_{fingerprint[:16]}")
+        return base + '.joblib', base + '.json'
+    
+    def _carregar_do_cache(self, fingerprint: str) -> bool:
+        """
+        Carrega do cache em disco um pipeline treinado com a mesma impressão digital
+        
+        Args:
+            fingerprint (str): Impressão digital do treinamento
+            
+        Returns:
+            bool: True se o modelo foi carregado do cache
+        """
+        if not self.diretorio_cache:
+            return False
+        
+        caminho_modelo, caminho_metricas = self._caminhos_cache(fingerprint)
+        if not os.path.exists(caminho_modelo):
+            return False
+        
+        try:
+            metricas = {}
+            if os.path.exists(caminho_metricas):
+                with open(caminho_metricas, 'r', encoding='utf-8') as f:
+                    metricas = json.load(f)
+            if metricas.get('fingerprint', fingerprint) != fingerprint:
+                return False
+            
+            self.carregar_modelo(caminho_modelo)
+            self.fingerprint = fingerprint
+            self.metricas = metricas
+            return True
+        except Exception as e:
+            print(f"Erro ao carregar modelo do cache: {e}")
+            return False
+    
+    def _salvar_no_cache(self, fingerprint: str, metricas: Dict):
+        """
+        Salva o pipeline treinado e suas métricas no cache em disco
+        
+        Args:
+            fingerprint (str): Impressão digital do treinamento
+            metricas (Dict): Métricas do treinamento
+        """
+        if not self.diretorio_cache:
+            return
+        
+        try:
+            os.makedirs(self.diretorio_cache, exist_ok=True)
+            caminho_modelo, caminho_metricas = self._caminhos_cache(fingerprint)
+            
+            self.salvar_modelo(caminho_modelo)
+            
+            caminho_tmp = f"{caminho_metricas}.{os.getpid()}.tmp"
+            with open(caminho_tmp, 'w', encoding='utf-8') as f:
+                json.dump({**metricas, 'fingerprint': fingerprint}, f,
+                          ensure_ascii=False, indent=2, default=float)
+            os.replace(caminho_tmp, caminho_metricas)
+        except Exception as e:
+            print(f"Erro ao salvar modelo no cache: {e}")
+    
     def treinar_modelo(self, dados: Optional[pd.DataFrame] = None, 
-                      algoritmo: str = 'naive_bayes') -> Dict:
+                      algoritmo: str = 'naive_bayes',
+                      usar_cache: bool = True,
+                      avaliar: bool = False) -> Dict:
         """
         Treina o modelo de classificação
         
+        Um pipeline já treinado com os mesmos dados, algoritmo e parâmetros do
+        vetorizador é carregado do cache em disco em vez de ser retreinado.
+        
         Args:
             dados (pd.DataFrame, optional): Dados de treinamento
             algoritmo (str): Algoritmo a usar ('naive_bayes', 'logistic', 'random_forest')
+            usar_cache (bool): Se deve consultar/gravar o cache em disco
+            avaliar (bool): Se deve calcular a validação cruzada (cv=5)
             
         Returns:
             Dict: Métricas de treinamento
@@ -246,6 +480,13 @@ class ClassificadorDesastre:
         if dados is None:
             dados = self.gerar_dados_sinteticos()
         
+        fingerprint = self.calcular_fingerprint(dados, algoritmo)
+        
+        if usar_cache and self._carregar_do_cache(fingerprint):
+            if not avaliar or 'acuracia_cv_media' in self.metricas:
+                return self.metricas
+            # Avaliação explícita pedida e ainda não calculada: retreina para medir
+        
         # Preprocessa textos
         dados['texto_processado'] = dados['texto'].apply(self.preprocessar_texto)
         
@@ -270,13 +511,7 @@ class ClassificadorDesastre:
         
         # Cria pipeline
         self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(
-                max_features=5000,
-                ngram_range=(1, 2),
-                stop_words=None,  # Mantém stop words para português
-                min_df=2,
-                max_df=0.95
-            )),
+            ('tfidf', TfidfVectorizer(**self.parametros_tfidf)),
             ('classifier', modelo)
         ])
         
@@ -286,24 +521,139 @@ class ClassificadorDesastre:
         # Avalia modelo
         y_pred = self.pipeline.predict(X_test)
         
-        # Cross-validation
-        cv_scores = cross_val_score(self.pipeline, X_train, y_train, cv=5)
-        
         # Métricas
         metricas = {
             'algoritmo': algoritmo,
-            'acuracia_teste': self.pipeline.score(X_test, y_test),
-            'acuracia_cv_media': cv_scores.mean(),
-            'acuracia_cv_std': cv_scores.std(),
+            'acuracia_teste': float(self.pipeline.score(X_test, y_test)),
             'total_amostras': len(dados),
-            'classes': list(self.pipeline.classes_),
+            'classes': [str(c) for c in self.pipeline.classes_],
             'relatorio_classificacao': classification_report(y_test, y_pred, output_dict=True)
         }
         
+        # Cross-validation (custosa, apenas sob pedido explícito)
+        if avaliar:
+            cv_scores = cross_val_score(self.pipeline, X_train, y_train, cv=5)
+            metricas['acuracia_cv_media'] = float(cv_scores.mean())
+            metricas['acuracia_cv_std'] = float(cv_scores.std())
+        
         self.treinado = True
+        self.modo_online = False
+        self.fingerprint = fingerprint
+        self.metricas = metricas
+        self._versao = None
+        
+        if usar_cache:
+            self._salvar_no_cache(fingerprint, metricas)
         
         return metricas
     
+    def ativar_modo_online(self, n_features: int = 2 ** 18,
+                           caminho_checkpoint: Optional[str] = None,
+                           intervalo_checkpoint: int = 500,
+                           dados_iniciais: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Troca o modelo por um pipeline de aprendizado online
+        
+        O vetorizador é um HashingVectorizer (sem vocabulário, memória fixa
+        independente do tamanho do corpus) e o classificador um SGDClassifier com
+        perda logística, que aceita partial_fit e fornece predict_proba.
+        
+        Args:
+            n_features (int): Dimensão do espaço de features com hashing
+            caminho_checkpoint (str, optional): Arquivo dos checkpoints periódicos
+            intervalo_checkpoint (int): Amostras entre checkpoints (0 desativa)
+            dados_iniciais (pd.DataFrame, optional): Dados do primeiro ajuste
+                (dados sintéticos se omitido)
+            
+        Returns:
+            Dict: Informações do ajuste inicial
+        """
+        self.pipeline = Pipeline([
+            ('hashing', HashingVectorizer(
+                n_features=n_features,
+                ngram_range=self.parametros_tfidf['ngram_range'],
+                alternate_sign=False,
+                norm='l2'
+            )),
+            ('classifier', SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42))
+        ])
+        self.modo_online = True
+        self.treinado = False
+        self.fingerprint = None
+        self.metricas = None
+        self._versao = None
+        self.amostras_online = 0
+        self._amostras_desde_checkpoint = 0
+        self.caminho_checkpoint = caminho_checkpoint or os.path.join(
+            self.diretorio_cache or 'data/modelos', 'classificador_online.joblib'
+        )
+        self.intervalo_checkpoint = intervalo_checkpoint
+        
+        if dados_iniciais is None:
+            dados_iniciais = self.gerar_dados_sinteticos()
+        
+        # Algumas passadas sobre os dados iniciais para estabilizar o SGD
+        for passada in range(5):
+            dados_embaralhados = dados_iniciais.sample(frac=1.0, random_state=42 + passada)
+            resultado = self.atualizar_modelo(
+                dados_embaralhados['texto'].tolist(),
+                dados_embaralhados['tipo_desastre'].tolist(),
+                checkpoint=False
+            )
+        
+        return {
+            'n_features': n_features,
+            'amostras_iniciais': len(dados_iniciais),
+            'caminho_checkpoint': self.caminho_checkpoint,
+            **resultado
+        }
+    
+    def atualizar_modelo(self, textos: List[str], rotulos: List[str],
+                         checkpoint: bool = True) -> Dict:
+        """
+        Incorpora mensagens rotuladas ao modelo online sem retreinamento completo
+        
+        Args:
+            textos (List[str]): Mensagens rotuladas
+            rotulos (List[str]): Tipo de desastre de cada mensagem
+            checkpoint (bool): Se pode salvar checkpoint ao atingir o intervalo
+            
+        Returns:
+            Dict: Total de amostras incorporadas e se houve checkpoint
+        """
+        if not self.modo_online:
+            raise ValueError("Modo online não ativado. Use ativar_modo_online() antes.")
+        
+        if len(textos) != len(rotulos):
+            raise ValueError("textos e rotulos devem ter o mesmo tamanho")
+        
+        desconhecidos = set(rotulos) - set(self.tipos_desastre)
+        if desconhecidos:
+            raise ValueError(f"Tipos de desastre desconhecidos: {sorted(desconhecidos)}")
+        
+        checkpoint_salvo = False
+        if textos:
+            textos_processados = [self.preprocessar_texto(t) for t in textos]
+            X = self.pipeline.named_steps['hashing'].transform(textos_processados)
+            self.pipeline.named_steps['classifier'].partial_fit(
+                X, list(rotulos), classes=self.tipos_desastre
+            )
+            self.treinado = True
+            self._versao = None
+            self.amostras_online += len(textos)
+            self._amostras_desde_checkpoint += len(textos)
+            
+            if (checkpoint and self.intervalo_checkpoint
+                    and self._amostras_desde_checkpoint >= self.intervalo_checkpoint):
+                self.salvar_modelo(self.caminho_checkpoint)
+                self._amostras_desde_checkpoint = 0
+                checkpoint_salvo = True
+        
+        return {
+            'amostras_online': self.amostras_online,
+            'checkpoint_salvo': checkpoint_salvo
+        }
+    
     def classificar_mensagem(self, texto: str) -> Dict:
         """
         Classifica uma mensagem individual
@@ -320,9 +670,9 @@ class ClassificadorDesastre:
         
         texto_processado = self.preprocessar_texto(texto)
         
-        # Predição
-        predicao = self.pipeline.predict([texto_processado])[0]
+        # Predição (uma única vetorização; a classe é o argmax das probabilidades)
         probabilidades = self.pipeline.predict_proba([texto_processado])[0]
+        predicao = self.pipeline.classes_[int(np.argmax(probabilidades))]
         
         # Cria dicionário de probabilidades por classe
         prob_por_classe = dict(zip(self.pipeline.classes_, probabilidades))
@@ -341,6 +691,97 @@ class ClassificadorDesastre:
             'texto_processado': texto_processado
         }
     
+    def _obter_indice_palavras(self) -> IndicePalavrasChave:
+        """Retorna o léxico compilado, recompilando se palavras_chave foi substituído"""
+        if self._indice_palavras is None or self._indice_palavras.origem is not self.palavras_chave:
+            self._indice_palavras = IndicePalavrasChave(self.palavras_chave)
+        return self._indice_palavras
+    
+    def contar_palavras_chave(self, textos: List[str]) -> pd.DataFrame:
+        """
+        Conta palavras-chave de todos os tipos para todas as mensagens numa varredura
+        
+        Args:
+            textos (List[str]): Lista de mensagens
+            
+        Returns:
+            pd.DataFrame: Contagens (mensagens x tipos de desastre)
+        """
+        indice = self._obter_indice_palavras()
+        contagens = indice.contar_por_tipo([t.lower() for t in textos])
+        return pd.DataFrame(contagens.astype(int), columns=indice.tipos)
+    
+    def classificar_por_palavras_chave(self, mensagens: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Classifica um lote apenas pelas palavras-chave, sem o modelo (não exige treino)
+
+        Args:
+            mensagens (List[str]): Lista de mensagens
+
+        Returns:
+            Dict[str, np.ndarray]: 'tipo_predito' (tipo com mais palavras-chave,
+                'outros' sem nenhuma), 'confianca' (confiança por palavras-chave),
+                'acertos' (palavras do tipo vencedor), 'margem' (diferença para o
+                segundo tipo) e 'total_acertos' (palavras de todos os tipos)
+        """
+        indice = self._obter_indice_palavras()
+        textos = [m if isinstance(m, str) else '' for m in mensagens]
+        n = len(textos)
+        if not n:
+            vazio = np.array([], dtype=int)
+            return {'tipo_predito': np.array([], dtype=object), 'confianca': np.array([], dtype=float),
+                    'acertos': vazio, 'margem': vazio, 'total_acertos': vazio}
+
+        contagens = indice.contar_por_tipo([t.lower() for t in textos])
+        ordem = np.argsort(-contagens, axis=1, kind='stable')
+        linhas = np.arange(n)
+        acertos = contagens[linhas, ordem[:, 0]]
+        segundo = contagens[linhas, ordem[:, 1]] if contagens.shape[1] > 1 else np.zeros(n)
+
+        tipos = np.array(indice.tipos, dtype=object)[ordem[:, 0]]
+        tipos[acertos == 0] = 'outros'
+
+        return {
+            'tipo_predito': tipos,
+            'confianca': self.calcular_confianca_palavras_lote(textos, tipos),
+            'acertos': acertos.astype(int),
+            'margem': (acertos - segundo).astype(int),
+            'total_acertos': contagens.sum(axis=1).astype(int)
+        }
+
+    def calcular_confianca_palavras_lote(self, textos: List[str],
+                                         tipos_preditos: List[str]) -> np.ndarray:
+        """
+        Calcula a confiança por palavras-chave de um lote de mensagens
+        
+        Args:
+            textos (List[str]): Textos originais
+            tipos_preditos (List[str]): Tipo predito para cada texto
+            
+        Returns:
+            np.ndarray: Score de confiança (0-1) por mensagem
+        """
+        indice = self._obter_indice_palavras()
+        n = len(textos)
+        if not n:
+            return np.array([], dtype=float)
+        
+        contagens = indice.contar_por_tipo([t.lower() for t in textos])
+        
+        # Coluna do tipo predito de cada mensagem (-1 para tipos sem palavras-chave)
+        tipos = np.asarray(tipos_preditos)
+        colunas = np.full(n, -1)
+        for j, tipo in enumerate(indice.tipos):
+            colunas[tipos == tipo] = j
+        conhecidos = colunas >= 0
+        
+        # Confiança neutra para tipos desconhecidos
+        scores = np.full(n, 0.5)
+        acertos = contagens[np.flatnonzero(conhecidos), colunas[conhecidos]]
+        scores[conhecidos] = np.minimum(acertos / indice.total_por_tipo[colunas[conhecidos]] * 2, 1.0)
+        
+        return scores
+    
     def _calcular_confianca_palavras(self, texto: str, tipo_predito: str) -> float:
         """
         Calcula confiança baseada em palavras-chave específicas
@@ -352,22 +793,55 @@ class ClassificadorDesastre:
         Returns:
             float: Score de confiança (0-1)
         """
-        if tipo_predito not in self.palavras_chave:
-            return 0.5  # Confiança neutra para tipos desconhecidos
+        return float(self.calcular_confianca_palavras_lote([texto], [tipo_predito])[0])
+    
+    def classificar_lote_colunar(self, mensagens: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Classifica um lote de mensagens em modo vetorizado
+        
+        O lote inteiro é vetorizado pelo TF-IDF uma única vez e os tipos são
+        derivados de uma única matriz de predict_proba.
+        
+        Args:
+            mensagens (List[str]): Lista de mensagens
+            
+        Returns:
+            Dict[str, np.ndarray]: Colunas 'tipo_predito', 'confianca',
+                'confianca_palavras', 'texto_processado' (uma posição por mensagem),
+                'probabilidades' (matriz mensagens x classes) e 'classes'
+        """
+        if not self.treinado:
+            self.treinar_modelo()
+        
+        textos = [m if isinstance(m, str) else '' for m in mensagens]
+        textos_processados = [self.preprocessar_texto(t) for t in textos]
+        classes = self.pipeline.classes_
         
-        texto_lower = texto.lower()
-        palavras_tipo = self.palavras_chave[tipo_predito]
+        if not textos:
+            return {
+                'tipo_predito': np.array([], dtype=classes.dtype),
+                'confianca': np.array([], dtype=float),
+                'confianca_palavras': np.array([], dtype=float),
+                'probabilidades': np.empty((0, len(classes))),
+                'classes': classes,
+                'texto_processado': np.array([], dtype=object)
+            }
         
-        # Conta palavras-chave encontradas
-        palavras_encontradas = 0
-        for palavra in palavras_tipo:
-            if palavra in texto_lower:
-                palavras_encontradas += 1
+        probabilidades = self.pipeline.predict_proba(textos_processados)
+        indices = probabilidades.argmax(axis=1)
+        tipos = classes[indices]
+        prob_max = probabilidades[np.arange(len(indices)), indices]
         
-        # Calcula score (máximo 1.0)
-        score = min(palavras_encontradas / len(palavras_tipo) * 2, 1.0)
+        confianca_palavras = self.calcular_confianca_palavras_lote(textos, tipos)
         
-        return score
+        return {
+            'tipo_predito': tipos,
+            'confianca': (prob_max + confianca_palavras) / 2,
+            'confianca_palavras': confianca_palavras,
+            'probabilidades': probabilidades,
+            'classes': classes,
+            'texto_processado': np.array(textos_processados, dtype=object)
+        }
     
     def classificar_lote(self, mensagens: List[str]) -> pd.DataFrame:
         """
@@ -379,64 +853,140 @@ class ClassificadorDesastre:
         Returns:
             pd.DataFrame: DataFrame com classificações
         """
-        resultados = []
+        colunas = self.classificar_lote_colunar(mensagens)
+        classes = colunas['classes']
         
-        for i, mensagem in enumerate(mensagens):
-            try:
-                resultado = self.classificar_mensagem(mensagem)
-                resultado['id_mensagem'] = i
-                resultado['texto_original'] = mensagem
-                resultados.append(resultado)
-            except Exception as e:
-                print(f"Erro ao classificar mensagem {i}: {e}")
-                continue
-        
-        return pd.DataFrame(resultados)
+        return pd.DataFrame({
+            'tipo_predito': colunas['tipo_predito'],
+            'confianca': colunas['confianca'],
+            'probabilidades': [dict(zip(classes, linha)) for linha in colunas['probabilidades']],
+            'confianca_palavras': colunas['confianca_palavras'],
+            'texto_processado': colunas['texto_processado'],
+            'id_mensagem': np.arange(len(mensagens)),
+            'texto_original': list(mensagens)
+        })
     
     def salvar_modelo(self, caminho: str):
         """
         Salva o modelo treinado
         
+        No modo online, o arquivo guarda também o destino e o intervalo dos
+        checkpoints e as amostras já incorporadas, para que o aprendizado
+        continue de onde parou depois de carregar_modelo.
+        
         Args:
             caminho (str): Caminho para salvar o modelo
         """
         if not self.treinado:
             raise ValueError("Modelo não foi treinado ainda")
         
-        joblib.dump(self.pipeline, caminho)
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        
+        # Grava em arquivo temporário e renomeia, para que outro processo
+        # nunca carregue um modelo salvo pela metade
+        caminho_tmp = f"{caminho}.{os.getpid()}.tmp"
+        joblib.dump({
+            'pipeline': self.pipeline,
+            'caminho_checkpoint': self.caminho_checkpoint,
+            'intervalo_checkpoint': self.intervalo_checkpoint,
+            'amostras_online': self.amostras_online
+        }, caminho_tmp)
+        os.replace(caminho_tmp, caminho)
         print(f"Modelo salvo em: {caminho}")
     
     def carregar_modelo(self, caminho: str):
         """
         Carrega modelo pré-treinado
         
+        Aceita também arquivos antigos, só com o pipeline: um checkpoint online
+        nesse formato volta a ser gravado no próprio arquivo, com o intervalo
+        padrão de ativar_modo_online.
+        
         Args:
             caminho (str): Caminho do modelo
         """
-        self.pipeline = joblib.load(caminho)
+        dados = joblib.load(caminho)
+        if not isinstance(dados, dict):
+            dados = {'pipeline': dados}
+        self.pipeline = dados['pipeline']
         self.treinado = True
+        self.modo_online = 'hashing' in self.pipeline.named_steps
+        if self.modo_online:
+            self.caminho_checkpoint = dados.get('caminho_checkpoint') or caminho
+            self.intervalo_checkpoint = dados.get('intervalo_checkpoint', 500)
+        else:
+            self.caminho_checkpoint = dados.get('caminho_checkpoint')
+            self.intervalo_checkpoint = dados.get('intervalo_checkpoint', 0)
+        self.amostras_online = dados.get('amostras_online', 0)
+        self._amostras_desde_checkpoint = 0
+        self.fingerprint = None
+        self._versao = None
         print(f"Modelo carregado de: {caminho}")
     
-    def obter_estatisticas_classificacao(self, df_classificacoes: pd.DataFrame) -> Dict:
+    @staticmethod
+    def acumular_estatisticas_classificacao(
+            df_classificacoes: pd.DataFrame,
+            acumulador: Optional[AcumuladorEstatisticas] = None) -> AcumuladorEstatisticas:
+        """
+        Atualiza estatísticas acumuladas com um lote de classificações, em O(tamanho do lote)
+        
+        Args:
+            df_classificacoes (pd.DataFrame): Classificações novas
+            acumulador (AcumuladorEstatisticas, optional): Acumulador a atualizar;
+                um novo se omitido
+            
+        Returns:
+            AcumuladorEstatisticas: Acumulador atualizado
+        """
+        if acumulador is None:
+            acumulador = AcumuladorEstatisticas()
+        if df_classificacoes.empty:
+            return acumulador
+        
+        confianca = df_classificacoes['confianca']
+        faixas = np.where(confianca >= 0.8, 'alta', np.where(confianca < 0.5, 'baixa', 'media'))
+        
+        acumulador.adicionar_total(len(df_classificacoes))
+        acumulador.contar('tipo_predito', df_classificacoes['tipo_predito'])
+        acumulador.contar('faixa_confianca', faixas)
+        acumulador.somar('confianca', confianca)
+        acumulador.somar('confianca_por_tipo', confianca, grupos=df_classificacoes['tipo_predito'])
+        
+        return acumulador
+    
+    @staticmethod
+    def obter_estatisticas_classificacao(df_classificacoes: Optional[pd.DataFrame] = None,
+                                         acumulador: Optional[AcumuladorEstatisticas] = None) -> Dict:
         """
         Calcula estatísticas das classificações
         
+        Com um acumulador (ver acumular_estatisticas_classificacao) a leitura é
+        O(1), independente do tamanho do histórico, e não exige um modelo treinado.
+        
         Args:
-            df_classificacoes (pd.DataFrame): DataFrame com classificações
+            df_classificacoes (pd.DataFrame, optional): DataFrame com classificações
+            acumulador (AcumuladorEstatisticas, optional): Estatísticas acumuladas
             
         Returns:
             Dict: Estatísticas
         """
-        if df_classificacoes.empty:
+        if acumulador is None:
+            if df_classificacoes is None or df_classificacoes.empty:
+                return {}
+            acumulador = ClassificadorDesastre.acumular_estatisticas_classificacao(df_classificacoes)
+        
+        if not acumulador.total:
             return {}
         
         stats = {
-            'total_mensagens': len(df_classificacoes),
-            'distribuicao_tipos': df_classificacoes['tipo_predito'].value_counts().to_dict(),
-            'confianca_media': df_classificacoes['confianca'].mean(),
-            'confianca_por_tipo': df_classificacoes.groupby('tipo_predito')['confianca'].mean().to_dict(),
-            'mensagens_alta_confianca': len(df_classificacoes[df_classificacoes['confianca'] >= 0.8]),
-            'mensagens_baixa_confianca': len(df_classificacoes[df_classificacoes['confianca'] < 0.5])
+            'total_mensagens': acumulador.total,
+            'distribuicao_tipos': acumulador.distribuicao('tipo_predito'),
+            'confianca_media': acumulador.media('confianca'),
+            'confianca_por_tipo': acumulador.medias_por_grupo('confianca_por_tipo'),
+            'mensagens_alta_confianca': acumulador.contagem('faixa_confianca', 'alta'),
+            'mensagens_baixa_confianca': acumulador.contagem('faixa_confianca', 'baixa')
         }
         
         return stats
@@ -475,7 +1025,7 @@ if __name__ == "__main__":
     
     # Treina modelo
     print("Treinando modelo...")
-    metricas = classificador.treinar_modelo()
+    metricas = classificador.treinar_modelo(avaliar=True)
     print(f"Modelo treinado com acurácia: {metricas['acuracia_teste']:.3f}")
     print(f"Cross-validation: {metricas['acuracia_cv_media']:.3f} ± {metricas['acuracia_cv_std']:.3f}")
     
@@ -12,6 +12,8 @@ import pandas as pd
 import logging
 from typing import Dict, List, Optional, Any
 
+from cache_respostas import CacheRespostas, obter_cache_respostas
+
 # Configuração de logging
 logger = logging.getLogger("serper_noticias")
 
@@ -24,6 +26,8 @@ class ColetorSerper:
         self.api_key = api_key or '54842e1a8120d7a6760405cd4dd92a6b2abc6924'
         # Tempo da última atualização
         self.ultima_atualizacao = None
+        # Respostas recentes por termo (compartilhado com o coletor do Twitter)
+        self.cache = obter_cache_respostas()
 
         # Mapeamento por categoria com termos separados para buscas individuais
         self.consultas = {
@@ -35,7 +39,8 @@ class ColetorSerper:
             "Outro": ["queda de ponte", "desabamento", "colapso de estrutura", "queda de marquise"]
         }
 
-    def buscar_noticias(self, max_resultados: int = 50, timeout: int = 10) -> List[Dict[str, Any]]:
+    def buscar_noticias(self, max_resultados: int = 50, timeout: int = 10,
+                        usar_cache: bool = True, validade_cache_minutos: int = 30) -> List[Dict[str, Any]]:
         """
         Busca notícias para todos os termos de busca e retorna resultados formatados
         para serem compatíveis com o formato de dados do Twitter
@@ -43,6 +48,8 @@ class ColetorSerper:
         Args:
             max_resultados (int): Número máximo de resultados a retornar
             timeout (int): Tempo limite em segundos para cada requisição
+            usar_cache (bool): Se deve reaproveitar respostas recentes de cada termo
+            validade_cache_minutos (int): Idade máxima de uma resposta reaproveitada
 
         Returns:
             List[Dict[str, Any]]: Lista de notícias no formato padronizado
@@ -80,16 +87,24 @@ class ColetorSerper:
                     })
 
                     try:
-                        conn.request("POST", "/news", payload, headers)
-                        res = conn.getresponse()
-                        data = res.read()
-
-                        if res.status != 200:
-                            logger.error(f"Erro na API Serper: Status {res.status} - {data.decode('utf-8')}")
-                            continue
-
-                        resultado = json.loads(data.decode("utf-8"))
-                        noticias = resultado.get("news", [])
+                        chave_cache = CacheRespostas.calcular_chave(payload)
+                        noticias = None
+                        if usar_cache:
+                            noticias = self.cache.obter('serper', chave_cache, validade_cache_minutos * 60)
+
+                        if noticias is None:
+                            conn.request("POST", "/news", payload, headers)
+                            res = conn.getresponse()
+                            data = res.read()
+
+                            if res.status != 200:
+                                logger.error(f"Erro na API Serper: Status {res.status} - {data.decode('utf-8')}")
+                                continue
+
+                            resultado = json.loads(data.decode("utf-8"))
+                            noticias = resultado.get("news", [])
+                            if usar_cache:
+                                self.cache.guardar('serper', chave_cache, noticias, validade_cache_minutos * 60)
 
                         for noticia in noticias:
                             if total_resultados >= max_resultados:
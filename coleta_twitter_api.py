@@ -12,11 +12,27 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from dataclasses import dataclass
 import logging
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-import hashlib
-import pickle
+from urllib.parse import urlparse
+
+from marcas_coleta import MarcasColeta
+from limitador_taxa import obter_limitador_taxa
+from cache_respostas import CacheRespostas, obter_cache_respostas
+from ingestao_stream import IngestaoStream
+from planejador_consultas import PlanejadorConsultas
+
+# Recurso da busca recente no limitador de taxa (cota própria do endpoint)
+RECURSO_BUSCA_RECENTE = 'twitter:/2/tweets/search/recent'
+
+# Marcas d'água (since_id) por query, persistidas entre execuções
+ARQUIVO_MARCAS_COLETA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'marcas_coleta.json')
+
+# Rendimento (tweets novos por coleta) de cada termo, usado pelo planejador de queries
+ARQUIVO_RENDIMENTO_TERMOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'rendimento_termos.json')
 
 
 @dataclass
@@ -56,23 +72,31 @@ class ColetorTwitter:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
+        # Cota compartilhada por todas as sessões e processos, sincronizada com
+        # os cabeçalhos x-rate-limit-* das respostas
+        self.limitador = obter_limitador_taxa()
+        
         # Inicializa conexão
         self._inicializar_conexao()
 
-        # Configuração de cache
-        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
-        os.makedirs(self.cache_dir, exist_ok=True)
-
-        # Controle de taxa
-        self.last_request_time = datetime.now()
-        self.request_count = 0
-        self.max_requests_per_window = 300  # Máximo de requisições por janela de 15 minutos
-        self.request_window = 15 * 60  # 15 minutos em segundos
+        # Configuração de cache (compartilhado com os demais coletores; a
+        # validade vem de ControladorAPI.configurar_coletor_twitter)
+        self.cache = obter_cache_respostas()
+        self.validade_cache_minutos = 30
 
         # Configurações de modo simulado
         self.modo_simulado = False
         self.arquivo_dados_simulados = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'mensagens_coletadas.json')
 
+        # Marcas d'água (since_id) por query
+        self.marcas = MarcasColeta(ARQUIVO_MARCAS_COLETA)
+        # Resultado da última busca (tweets novos por requisição), também por query
+        self.estatisticas_coleta = {}
+        self.estatisticas_por_query = {}
+
+        # Divisão de listas longas de termos em várias queries
+        self.planejador = PlanejadorConsultas(ARQUIVO_RENDIMENTO_TERMOS)
+
     def ativar_modo_simulado(self, ativar: bool = True):
         """
         Ativa ou desativa o modo simulado que usa dados locais em vez da API
@@ -99,6 +123,7 @@ class ColetorTwitter:
                 access_token_secret=self.config.access_token_secret,
                 wait_on_rate_limit=True
             )
+            self.client.session.hooks['response'].append(self._registrar_limite_resposta)
             
             # Testa conexão com um endpoint que requer apenas Bearer Token
             # O método get_me() requer OAuth 1.0a, não funciona apenas com Bearer Token
@@ -113,29 +138,22 @@ class ColetorTwitter:
             self.logger.error(f"Erro ao inicializar Twitter API: {e}")
             self.client = None
     
-    def _verificar_limite_taxa(self) -> bool:
+    def _registrar_limite_resposta(self, resposta, *args, **kwargs):
         """
-        Verifica se o limite de taxa foi atingido
+        Hook das respostas HTTP: repassa os cabeçalhos de limite ao limitador de taxa
 
-        Returns:
-            bool: True se está ok para fazer requisição, False se deve esperar
+        Args:
+            resposta (requests.Response): Resposta da API
         """
-        agora = datetime.now()
-        tempo_decorrido = (agora - self.last_request_time).total_seconds()
-
-        # Reinicia contador se passou a janela de tempo
-        if tempo_decorrido > self.request_window:
-            self.request_count = 0
-            self.last_request_time = agora
-            return True
-
-        # Verifica se atingiu o limite
-        if self.request_count >= self.max_requests_per_window:
-            tempo_espera = self.request_window - tempo_decorrido
-            self.logger.warning(f"Limite de taxa atingido. Espere {int(tempo_espera)} segundos.")
-            return False
-
-        return True
+        recurso = f"twitter:{urlparse(resposta.url).path}"
+        try:
+            if resposta.status_code == 429:
+                reset = resposta.headers.get('x-rate-limit-reset')
+                self.limitador.registrar_limite_excedido(recurso, float(reset) if reset else None)
+            else:
+                self.limitador.atualizar_por_cabecalhos(recurso, resposta.headers)
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar limite de taxa: {e}")
 
     def _gerar_chave_cache(self, query: str, max_resultados: int, horas_atras: int) -> str:
         """
@@ -147,64 +165,34 @@ class ColetorTwitter:
             horas_atras (int): Período de busca em horas
 
         Returns:
-            str: Chave de cache MD5
+            str: Chave de cache
         """
-        # Combina parâmetros em uma string
-        params_str = f"{query}_{max_resultados}_{horas_atras}"
-
-        # Gera hash MD5
-        return hashlib.md5(params_str.encode()).hexdigest()
+        return CacheRespostas.calcular_chave(query, max_resultados, horas_atras)
 
     def _salvar_cache(self, chave: str, dados: List[Dict]):
         """
-        Salva dados no cache
+        Salva dados no cache, válidos pela validade configurada
 
         Args:
             chave (str): Chave do cache
             dados (List[Dict]): Dados a serem armazenados
         """
-        caminho_arquivo = os.path.join(self.cache_dir, f"{chave}.pkl")
-
-        try:
-            with open(caminho_arquivo, 'wb') as f:
-                pickle.dump({
-                    'timestamp': datetime.now(),
-                    'dados': dados
-                }, f)
-            self.logger.info(f"Dados salvos em cache: {caminho_arquivo}")
-        except Exception as e:
-            self.logger.error(f"Erro ao salvar cache: {e}")
+        self.cache.guardar('twitter', chave, dados, validade_s=self.validade_cache_minutos * 60)
 
-    def _carregar_cache(self, chave: str, validade_minutos: int = 30) -> Optional[List[Dict]]:
+    def _carregar_cache(self, chave: str) -> Optional[List[Dict]]:
         """
         Carrega dados do cache se existirem e forem válidos
 
         Args:
             chave (str): Chave do cache
-            validade_minutos (int): Tempo em minutos para considerar o cache válido
 
         Returns:
             Optional[List[Dict]]: Dados do cache ou None se inválido/inexistente
         """
-        caminho_arquivo = os.path.join(self.cache_dir, f"{chave}.pkl")
-
-        if not os.path.exists(caminho_arquivo):
-            return None
-
-        try:
-            with open(caminho_arquivo, 'rb') as f:
-                cache = pickle.load(f)
-
-            # Verifica validade do cache
-            if (datetime.now() - cache['timestamp']).total_seconds() > (validade_minutos * 60):
-                self.logger.info(f"Cache expirado: {caminho_arquivo}")
-                return None
-
-            self.logger.info(f"Usando dados do cache: {caminho_arquivo}")
-            return cache['dados']
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar cache: {e}")
-            return None
+        dados = self.cache.obter('twitter', chave, validade_s=self.validade_cache_minutos * 60)
+        if dados is not None:
+            self.logger.info(f"Usando dados do cache: {len(dados)} tweets")
+        return dados
 
     def _carregar_dados_simulados(self, max_resultados: int = 100) -> List[Dict]:
         """
@@ -249,6 +237,26 @@ class ColetorTwitter:
         # Constrói query com OR entre termos
         query_termos = " OR ".join(f'"{termo}"' for termo in termos)
         
+        filtros = self._filtros_query(incluir_retweets, apenas_portugues)
+        
+        # Combina query
+        query_final = f"({query_termos})"
+        if filtros:
+            query_final += " " + " ".join(filtros)
+        
+        return query_final
+    
+    def _filtros_query(self, incluir_retweets: bool = False, apenas_portugues: bool = True) -> List[str]:
+        """
+        Operadores de filtro acrescentados aos termos de uma query
+        
+        Args:
+            incluir_retweets (bool): Se deve incluir retweets
+            apenas_portugues (bool): Se deve filtrar apenas português
+            
+        Returns:
+            List[str]: Operadores da API
+        """
         # Adiciona filtros
         filtros = []
         
@@ -262,26 +270,42 @@ class ColetorTwitter:
         # Removendo filtros que não são mais suportados pela API
         # filtros.append("has:geo OR place_country:BR")
         filtros.append("place:BR")  # Tentativa de usar um operador válido para Brasil
-
-        # Combina query
-        query_final = f"({query_termos})"
-        if filtros:
-            query_final += " " + " ".join(filtros)
         
-        return query_final
+        return filtros
     
+    def resetar_marcas_dagua(self, query: Optional[str] = None):
+        """
+        Descarta as marcas d'água para que a próxima busca cubra toda a janela (backfill)
+
+        Args:
+            query (str, optional): Query a resetar; todas se omitida
+        """
+        self.marcas.resetar(query)
+        self.logger.info(f"Marcas d'água resetadas: {query or 'todas as queries'}")
+
     def buscar_tweets_recentes(self, query: Optional[str] = None,
                               max_resultados: int = 100,
                               horas_atras: int = 24,
-                              usar_cache: bool = True) -> List[Dict]:
+                              usar_cache: bool = True,
+                              usar_marca_dagua: bool = True) -> List[Dict]:
         """
         Busca tweets recentes sobre emergências
         
+        Com a marca d'água, a busca pede só tweets mais novos que o último já
+        coletado para a query (since_id); a janela de horas_atras vale apenas
+        para a primeira coleta ou para marcas mais antigas que a janela. Uma
+        coleta interrompida pelo limite de requisições registra a faixa que
+        ficou sem buscar (lacuna, com until_id), e as coletas seguintes a
+        completam com parte da cota.
+        
         Args:
             query (str, optional): Query customizada
             max_resultados (int): Máximo de tweets a retornar
             horas_atras (int): Quantas horas atrás buscar
-            usar_cache (bool): Se deve usar cache para requisições recentes
+            usar_cache (bool): Se deve devolver a resposta da última coleta da query
+                enquanto ela estiver na validade (validade_cache_minutos), sem
+                consultar a API
+            usar_marca_dagua (bool): Se deve buscar só tweets novos desde a última coleta
 
         Returns:
             List[Dict]: Lista de tweets processados
@@ -295,92 +319,225 @@ class ColetorTwitter:
             self.logger.error("Cliente Twitter não inicializado")
             return []
         
-        if not query:
-            query = self.construir_query_busca()
+        try:
+            return self._buscar_query(query or self.construir_query_busca(), max_resultados,
+                                      horas_atras, usar_cache, usar_marca_dagua)
+        except tweepy.TooManyRequests:
+            self.logger.warning("Rate limit atingido. Ativando modo simulado automaticamente.")
+            # Ativa o modo simulado automaticamente
+            self.ativar_modo_simulado(True)
+            # Retorna dados simulados em vez de esperar
+            return self._carregar_dados_simulados(max_resultados)
+        except Exception as e:
+            self.logger.error(f"Erro ao buscar tweets: {e}")
+            # Se houver qualquer erro na API, ativamos o modo simulado como fallback
+            self.logger.warning("Ativando modo simulado devido a erro na API.")
+            self.ativar_modo_simulado(True)
+            return self._carregar_dados_simulados(max_resultados)
+    
+    def _buscar_query(self, query: str, max_resultados: int, horas_atras: int,
+                      usar_cache: bool, usar_marca_dagua: bool) -> List[Dict]:
+        """
+        Coleta uma query na API (ver buscar_tweets_recentes), sem fallback
+        
+        Erros da API são propagados, sem tocar no modo simulado: cada chamador
+        decide o que fazer com a falha.
         
-        # Verifica cache se habilitado
+        Args:
+            query (str): Query de busca
+            max_resultados (int): Máximo de tweets a retornar
+            horas_atras (int): Quantas horas atrás buscar
+            usar_cache (bool): Se deve devolver a resposta ainda na validade do cache
+            usar_marca_dagua (bool): Se deve buscar só tweets novos desde a última coleta
+            
+        Returns:
+            List[Dict]: Lista de tweets processados
+        """
+        # Dentro da validade, a query não é consultada de novo: o cache devolve a
+        # resposta da última coleta e a marca d'água fica onde estava, então a
+        # próxima coleta depois da validade busca tudo o que chegou desde ela
         if usar_cache:
             chave_cache = self._gerar_chave_cache(query, max_resultados, horas_atras)
             dados_cache = self._carregar_cache(chave_cache)
-            if dados_cache:
+            if dados_cache is not None:
+                self.estatisticas_coleta = self.estatisticas_por_query[query] = {
+                    'query': query,
+                    'requisicoes': 0,
+                    'novos': 0,
+                    'novos_por_requisicao': 0.0,
+                    'truncada': False,
+                    'cache': True
+                }
                 return dados_cache
 
         # Calcula data de início
         data_inicio = datetime.utcnow() - timedelta(hours=horas_atras)
         
-        tweets_coletados = []
+        def dentro_da_janela(data_iso: Optional[str]) -> bool:
+            return bool(data_iso) and datetime.fromisoformat(data_iso).replace(tzinfo=None) >= data_inicio
+        
+        # Marca d'água da query: só vale se estiver dentro da janela de busca.
+        # Lacunas de coletas interrompidas cujo tweet mais novo já saiu da
+        # janela não têm mais o que buscar
+        since_id = None
+        lacunas = []
+        if usar_marca_dagua:
+            marca = self.marcas.obter(query)
+            if marca and marca.get('since_id') and dentro_da_janela(marca.get('data_tweet')):
+                since_id = marca['since_id']
+            if marca:
+                lacunas = [lacuna for lacuna in marca.get('lacunas', [])
+                           if dentro_da_janela(lacuna['data_until'])]
         
         # Impõe limite de solicitações mais conservador
         # Twitter limita a 450 solicitações por 15 minutos para a pesquisa
         # Vamos ser mais conservadores e limitar a 100 solicitações por execução
         max_requests = 10
-        requests_count = 0
         max_per_request = min(max_resultados, 10)  # Limitamos a 10 por requisição
 
-        try:
-            self.logger.info(f"Buscando tweets com limite conservador de {max_requests} requisições")
-
-            # Busca tweets com limite
-            tweets = tweepy.Paginator(
-                self.client.search_recent_tweets,
-                query=query,
-                tweet_fields=['created_at', 'author_id', 'public_metrics', 
-                             'context_annotations', 'geo', 'lang'],
-                user_fields=['name', 'username', 'location', 'verified'],
-                place_fields=['full_name', 'country', 'place_type'],
-                expansions=['author_id', 'geo.place_id'],
-                start_time=data_inicio,
-                max_results=max_per_request  # Limitado a 10 por requisição
+        self.logger.info(f"Buscando tweets com limite conservador de {max_requests} requisições")
+
+        # Tweets novos primeiro; com lacunas abertas eles usam no máximo metade
+        # da cota desta coleta, para que as lacunas também avancem
+        reserva = 2 if lacunas else 1
+        # Com since_id a API ignora start_time; sem ele, busca a janela inteira
+        limite_inicio = {'since_id': since_id} if since_id else {'start_time': data_inicio}
+        tweets_coletados, requests_count, truncada = self._paginar_busca(
+            query, max_per_request, max(1, max_requests // reserva),
+            max(1, max_resultados // reserva), **limite_inicio
+        )
+        
+        # Interrompida antes do fim, a busca deixa uma lacuna entre a marca
+        # anterior e o tweet mais antigo recebido: a marca avança para o mais
+        # novo (a API entrega do mais novo para o mais antigo), e a lacuna
+        # fica registrada para as próximas coletas
+        mais_novo = max(tweets_coletados, key=lambda t: int(t['id']), default=None)
+        mais_antigo = min(tweets_coletados, key=lambda t: int(t['id']), default=None)
+        if truncada and mais_antigo:
+            lacunas.insert(0, {
+                'since_id': since_id,
+                'data_since': marca['data_tweet'] if since_id else None,
+                'until_id': str(mais_antigo['id']),
+                'data_until': mais_antigo['data_criacao']
+            })
+        
+        # Lacunas, da mais recente para a mais antiga, com a cota que sobrou
+        recuperados = 0
+        for lacuna in list(lacunas[1 if truncada and mais_antigo else 0:]):
+            restantes = max_requests - requests_count
+            if restantes <= 0 or len(tweets_coletados) >= max_resultados:
+                break
+            
+            limite_inicio = ({'since_id': lacuna['since_id']} if lacuna['since_id'] and
+                             dentro_da_janela(lacuna['data_since']) else {'start_time': data_inicio})
+            tweets_lacuna, requisicoes, incompleta = self._paginar_busca(
+                query, max_per_request, restantes, max_resultados - len(tweets_coletados),
+                until_id=lacuna['until_id'], **limite_inicio
             )
+            requests_count += requisicoes
+            tweets_coletados.extend(tweets_lacuna)
+            recuperados += len(tweets_lacuna)
+            
+            if not incompleta:
+                lacunas.remove(lacuna)
+            elif tweets_lacuna:
+                # Continua do tweet mais antigo recebido na próxima coleta
+                mais_antigo_lacuna = min(tweets_lacuna, key=lambda t: int(t['id']))
+                lacuna['until_id'] = str(mais_antigo_lacuna['id'])
+                lacuna['data_until'] = mais_antigo_lacuna['data_criacao']
 
-            # Controla o número de requisições
-            for page in tweets:
-                # Verifica limite de taxa antes de cada requisição
-                if not self._verificar_limite_taxa():
-                    tempo_espera = self.request_window - (datetime.now() - self.last_request_time).total_seconds()
-                    self.logger.warning(f"Aguardando {int(tempo_espera)} segundos antes da próxima requisição")
-                    time.sleep(min(60, max(1, tempo_espera)))  # Espera no máximo 60 segundos
+        self.logger.info(f"Coletados {len(tweets_coletados)} tweets em {requests_count} requisições")
+        
+        if usar_marca_dagua:
+            self.marcas.registrar_coleta(
+                query, novos=len(tweets_coletados), requisicoes=requests_count,
+                since_id=str(mais_novo['id']) if mais_novo else None,
+                data_tweet=mais_novo['data_criacao'] if mais_novo else None,
+                lacunas=lacunas
+            )
+            if lacunas:
+                self.logger.warning(f"{len(lacunas)} lacuna(s) de coleta pendente(s) para a query; "
+                                    f"serão completadas nas próximas coletas")
+        
+        self.estatisticas_coleta = self.estatisticas_por_query[query] = {
+            'query': query,
+            'since_id': since_id,
+            'requisicoes': requests_count,
+            'novos': len(tweets_coletados),
+            'novos_por_requisicao': len(tweets_coletados) / requests_count if requests_count else 0.0,
+            'truncada': truncada,
+            'recuperados_lacunas': recuperados,
+            'lacunas_pendentes': len(lacunas),
+            'cache': False
+        }
+        self.logger.info(f"Tweets novos por requisição: {self.estatisticas_coleta['novos_por_requisicao']:.1f} "
+                         f"(since_id: {since_id or 'nenhum'})")
 
-                requests_count += 1
-                self.request_count += 1
-                self.last_request_time = datetime.now()
+        # Salva em cache se habilitado
+        if usar_cache:
+            chave_cache = self._gerar_chave_cache(query, max_resultados, horas_atras)
+            self._salvar_cache(chave_cache, tweets_coletados)
 
-                if page.data:
-                    for tweet in page.data:
-                        tweet_processado = self._processar_tweet(tweet)
-                        if tweet_processado:
-                            tweets_coletados.append(tweet_processado)
+        return tweets_coletados
+    
+    def _paginar_busca(self, query: str, max_por_requisicao: int, max_requisicoes: int,
+                       max_resultados: int, **limites) -> Tuple[List[Dict], int, bool]:
+        """
+        Percorre as páginas de uma busca recente dentro de uma cota de requisições
+        
+        Args:
+            query (str): Query de busca
+            max_por_requisicao (int): Tweets por página
+            max_requisicoes (int): Páginas que podem ser pedidas
+            max_resultados (int): Tweets a partir dos quais a busca para
+            **limites: since_id, start_time e/ou until_id da busca
+            
+        Returns:
+            Tuple[List[Dict], int, bool]: Tweets processados, requisições feitas e
+                se a busca parou com páginas por buscar (truncada)
+        """
+        tweets = tweepy.Paginator(
+            self.client.search_recent_tweets,
+            query=query,
+            tweet_fields=['created_at', 'author_id', 'public_metrics', 
+                         'context_annotations', 'geo', 'lang'],
+            user_fields=['name', 'username', 'location', 'verified'],
+            place_fields=['full_name', 'country', 'place_type'],
+            expansions=['author_id', 'geo.place_id'],
+            max_results=max_por_requisicao,
+            **limites
+        )
 
-                # Verifica se atingiu limite de tweets ou requisições
-                if len(tweets_coletados) >= max_resultados or requests_count >= max_requests:
-                    self.logger.info(f"Limite atingido: {requests_count} requisições, {len(tweets_coletados)} tweets")
-                    break
+        tweets_coletados = []
+        requisicoes = 0
+        # Controla o número de requisições (cada página é uma requisição,
+        # feita só quando o iterador avança)
+        paginas = iter(tweets)
+        while True:
+            # Reserva uma ficha da cota compartilhada, esperando só o necessário
+            self.limitador.adquirir(RECURSO_BUSCA_RECENTE)
+            page = next(paginas, None)
+            if page is None:
+                return tweets_coletados, requisicoes, False
 
-                # Pausa entre requisições para evitar rate limit
-                time.sleep(2)  # Pausa de 2 segundos entre requisições
+            requisicoes += 1
 
-            self.logger.info(f"Coletados {len(tweets_coletados)} tweets em {requests_count} requisições")
+            if page.data:
+                for tweet in page.data:
+                    tweet_processado = self._processar_tweet(tweet)
+                    if tweet_processado:
+                        tweets_coletados.append(tweet_processado)
 
-            # Salva em cache se habilitado
-            if usar_cache:
-                chave_cache = self._gerar_chave_cache(query, max_resultados, horas_atras)
-                self._salvar_cache(chave_cache, tweets_coletados)
+            # Sem next_token o paginador termina sem nova requisição: não
+            # reserva ficha à toa
+            if not (page.meta and page.meta.get('next_token')):
+                return tweets_coletados, requisicoes, False
 
-        except tweepy.TooManyRequests:
-            self.logger.warning("Rate limit atingido. Ativando modo simulado automaticamente.")
-            # Ativa o modo simulado automaticamente
-            self.ativar_modo_simulado(True)
-            # Retorna dados simulados em vez de esperar
-            return self._carregar_dados_simulados(max_resultados)
-        except Exception as e:
-            self.logger.error(f"Erro ao buscar tweets: {e}")
-            # Se houver qualquer erro na API, ativamos o modo simulado como fallback
-            self.logger.warning("Ativando modo simulado devido a erro na API.")
-            self.ativar_modo_simulado(True)
-            return self._carregar_dados_simulados(max_resultados)
+            # Verifica se atingiu limite de tweets ou requisições
+            if len(tweets_coletados) >= max_resultados or requisicoes >= max_requisicoes:
+                self.logger.info(f"Limite atingido: {requisicoes} requisições, {len(tweets_coletados)} tweets")
+                return tweets_coletados, requisicoes, True
 
-        return tweets_coletados
-    
     def _processar_tweet(self, tweet) -> Optional[Dict]:
         """
         Processa um tweet individual
@@ -434,27 +591,34 @@ class ColetorTwitter:
             self.logger.error(f"Erro ao processar tweet {tweet.id}: {e}")
             return None
     
-    def coletar_stream_tempo_real(self, callback_funcao, 
-                                 termos_customizados: Optional[List[str]] = None,
-                                 duracao_minutos: int = 60):
+    def iniciar_stream(self, ingestao: IngestaoStream,
+                       termos_customizados: Optional[List[str]] = None,
+                       duracao_minutos: Optional[float] = None) -> Optional['ControleStream']:
         """
-        Coleta tweets em tempo real via streaming
+        Inicia o stream em tempo real sem bloquear, alimentando uma IngestaoStream
+        
+        O stream só enfileira: NLP e persistência rodam nos workers da ingestão,
+        e a política de fila cheia dela define o que acontece sob sobrecarga.
         
         Args:
-            callback_funcao: Função para processar cada tweet
+            ingestao (IngestaoStream): Fila e workers que processam os tweets
             termos_customizados (List[str], optional): Termos específicos
-            duracao_minutos (int): Duração da coleta em minutos
+            duracao_minutos (float, optional): Encerra sozinho após este tempo
+            
+        Returns:
+            Optional[ControleStream]: Controle do stream (parar, aguardar, métricas)
+                ou None se não foi possível iniciar
         """
         if not self.client:
             self.logger.error("Cliente Twitter não inicializado")
-            return
+            return None
         
         termos = termos_customizados or self.termos_emergencia
         
         class StreamListener(tweepy.StreamingClient):
-            def __init__(self, bearer_token, callback, logger):
+            def __init__(self, bearer_token, ingestao, logger):
                 super().__init__(bearer_token, wait_on_rate_limit=True)
-                self.callback = callback
+                self.ingestao = ingestao
                 self.logger = logger
                 self.contador = 0
             
@@ -462,10 +626,10 @@ class ColetorTwitter:
                 try:
                     tweet_processado = self._processar_tweet_stream(tweet)
                     if tweet_processado:
-                        self.callback(tweet_processado)
+                        self.ingestao.oferecer(tweet_processado)
                         self.contador += 1
                         if self.contador % 10 == 0:
-                            self.logger.info(f"Processados {self.contador} tweets via stream")
+                            self.logger.info(f"Recebidos {self.contador} tweets via stream")
                 except Exception as e:
                     self.logger.error(f"Erro no stream: {e}")
             
@@ -481,21 +645,58 @@ class ColetorTwitter:
         
         try:
             # Cria stream
-            stream = StreamListener(self.config.bearer_token, callback_funcao, self.logger)
+            stream = StreamListener(self.config.bearer_token, ingestao, self.logger)
             
             # Adiciona regras de filtro
             for termo in termos:
                 stream.add_rules(tweepy.StreamRule(f'"{termo}" lang:pt -is:retweet'))
             
-            self.logger.info(f"Iniciando stream por {duracao_minutos} minutos...")
-            
-            # Inicia stream com timeout
+            # Workers antes da conexão, para a fila já estar sendo drenada
+            ingestao.iniciar()
             stream.filter(threaded=True)
-            time.sleep(duracao_minutos * 60)
-            stream.disconnect()
+            self.logger.info("Stream iniciado" + (f" por {duracao_minutos} minutos" if duracao_minutos else ""))
+            return ControleStream(stream, ingestao, self.logger, duracao_minutos)
             
         except Exception as e:
             self.logger.error(f"Erro no streaming: {e}")
+            ingestao.parar(aguardar=False)
+            return None
+    
+    def coletar_stream_tempo_real(self, callback_funcao, 
+                                 termos_customizados: Optional[List[str]] = None,
+                                 duracao_minutos: int = 60):
+        """
+        Coleta tweets em tempo real via streaming, bloqueando pela duração
+        
+        O callback roda numa thread de ingestão, fora da thread do stream: um
+        callback lento acumula tweets na fila em vez de travar a conexão. Para
+        não bloquear, use iniciar_stream.
+        
+        Args:
+            callback_funcao: Função para processar cada tweet (ou um
+                FluxoSentimento, de AnalisadorSentimento.criar_fluxo)
+            termos_customizados (List[str], optional): Termos específicos
+            duracao_minutos (int): Duração da coleta em minutos (com 0 ou None o
+                stream é encerrado logo após conectar, entregando o que já chegou)
+        """
+        def entregar(lote):
+            for tweet in lote:
+                callback_funcao(tweet)
+        
+        # Um único worker mantém a ordem de chegada e não chama o callback em paralelo
+        ingestao = IngestaoStream(persistir=entregar, processar_lote=lambda lote: lote, num_workers=1)
+        try:
+            controle = self.iniciar_stream(ingestao, termos_customizados, duracao_minutos)
+            if controle:
+                # Sem duração não há encerramento agendado para esperar
+                if duracao_minutos:
+                    controle.aguardar()
+                else:
+                    controle.parar()
+        finally:
+            # Callbacks com estado (ex.: FluxoSentimento) liberam o que está pendente
+            if hasattr(callback_funcao, 'fechar'):
+                callback_funcao.fechar()
     
     def salvar_dados(self, tweets: List[Dict], arquivo: str):
         """
@@ -598,6 +799,182 @@ class ColetorTwitter:
         else:
             return self.buscar_tweets_recentes(max_resultados=max_resultados, horas_atras=horas_atras)
 
+    def buscar_planejado(self, termos_customizados: Optional[List[str]] = None,
+                         max_resultados_por_query: int = 100,
+                         horas_atras: int = 24,
+                         max_paralelas: int = 4,
+                         usar_cache: bool = True) -> List[Dict]:
+        """
+        Busca uma lista longa de termos dividida em várias queries simultâneas
+        
+        O PlanejadorConsultas empacota os termos no menor número de queries
+        dentro do limite de tamanho e deixa de fora, na maior parte das coletas,
+        os termos rebaixados por baixo rendimento. Cada query tem sua própria
+        marca d'água; as requisições de todas dividem a cota do limitador de taxa.
+        Uma query com erro (inclusive limite de requisições) é descartada nesta
+        coleta sem afetar as demais; só se todas falharem a coleta recorre aos
+        dados simulados.
+        
+        Args:
+            termos_customizados (List[str], optional): Termos específicos de busca
+            max_resultados_por_query (int): Máximo de tweets por query
+            horas_atras (int): Quantas horas atrás buscar
+            max_paralelas (int): Queries executadas ao mesmo tempo
+            usar_cache (bool): Se as queries ainda na validade do cache são
+                atendidas por ele, sem requisição (ver buscar_tweets_recentes)
+            
+        Returns:
+            List[Dict]: Tweets de todas as queries, sem duplicatas (por id)
+        """
+        if self.modo_simulado:
+            self.logger.info("Usando dados simulados em vez da API do Twitter")
+            return self._carregar_dados_simulados(max_resultados_por_query)
+
+        if not self.client:
+            self.logger.error("Cliente Twitter não inicializado")
+            return []
+        
+        termos = termos_customizados or self.termos_emergencia
+        filtros = self._filtros_query()
+        comprimento_fixo = len("()") + sum(len(filtro) + 1 for filtro in filtros)
+        plano = self.planejador.planejar(termos, comprimento_fixo)
+        queries = [self.construir_query_busca(grupo) for grupo in plano['grupos']]
+        
+        self.logger.info(f"{len(termos)} termos em {len(queries)} queries "
+                         f"({len(plano['adiados'])} termos rebaixados adiados)")
+        
+        def buscar_query(query: str) -> Optional[List[Dict]]:
+            # None marca a query que falhou; o modo simulado não é ativado aqui
+            # porque as outras queries ainda estão em andamento
+            try:
+                return self._buscar_query(query, max_resultados_por_query, horas_atras,
+                                          usar_cache, usar_marca_dagua=True)
+            except tweepy.TooManyRequests:
+                self.logger.warning(f"Rate limit atingido na query {query[:60]!r}; descartada nesta coleta")
+            except Exception as e:
+                self.logger.error(f"Erro ao buscar a query {query[:60]!r}: {e}; descartada nesta coleta")
+            return None
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_paralelas, len(queries)))) as executor:
+            resultados_por_query = list(executor.map(buscar_query, queries))
+        
+        concluidas = [i for i, tweets in enumerate(resultados_por_query) if tweets is not None]
+        if queries and not concluidas:
+            self.logger.warning("Todas as queries falharam. Ativando modo simulado devido a erro na API.")
+            self.ativar_modo_simulado(True)
+            return self._carregar_dados_simulados(max_resultados_por_query)
+        
+        # Um tweet que casa com termos de mais de uma query vem repetido
+        tweets_unicos = {}
+        for i in concluidas:
+            for tweet in resultados_por_query[i]:
+                tweets_unicos.setdefault(tweet['id'], tweet)
+        tweets_coletados = list(tweets_unicos.values())
+        
+        estatisticas = {i: self.estatisticas_por_query.get(queries[i], {}) for i in concluidas}
+        
+        # Só as queries consultadas na API contam para o rendimento: respostas do
+        # cache repetiriam a coleta anterior, e as que falharam não dizem nada
+        # sobre os termos
+        consultadas = [i for i in concluidas if not estatisticas[i].get('cache')]
+        if consultadas:
+            tweets_consultados = {tweet['id']: tweet for i in consultadas for tweet in resultados_por_query[i]}
+            rendimento = self.planejador.registrar_coleta(
+                [termo for i in consultadas for termo in plano['grupos'][i]],
+                list(tweets_consultados.values())
+            )
+        else:
+            rendimento = {}
+        
+        requisicoes = sum(e.get('requisicoes', 0) for e in estatisticas.values())
+        self.estatisticas_coleta = {
+            'queries': len(queries),
+            'queries_do_cache': len(concluidas) - len(consultadas),
+            'queries_com_erro': len(queries) - len(concluidas),
+            'requisicoes': requisicoes,
+            'novos': len(tweets_coletados),
+            'duplicados': sum(len(resultados_por_query[i]) for i in concluidas) - len(tweets_coletados),
+            'novos_por_requisicao': len(tweets_coletados) / requisicoes if requisicoes else 0.0,
+            'truncadas': sum(1 for e in estatisticas.values() if e.get('truncada')),
+            'termos_adiados': plano['adiados'],
+            'rendimento_por_termo': rendimento
+        }
+        
+        return tweets_coletados
+
+
+class ControleStream:
+    """Controle de um stream em execução (ver ColetorTwitter.iniciar_stream)"""
+
+    def __init__(self, stream, ingestao: IngestaoStream, logger: logging.Logger,
+                 duracao_minutos: Optional[float] = None):
+        """
+        Inicializa o controle, agendando o encerramento se houver duração
+
+        Args:
+            stream (tweepy.StreamingClient): Stream conectado
+            ingestao (IngestaoStream): Ingestão alimentada pelo stream
+            logger (logging.Logger): Logger do coletor
+            duracao_minutos (float, optional): Tempo até o encerramento automático
+        """
+        self.stream = stream
+        self.ingestao = ingestao
+        self.logger = logger
+        self._encerrado = threading.Event()
+        self._temporizador = None
+        if duracao_minutos:
+            self._temporizador = threading.Timer(duracao_minutos * 60, self.parar)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    @property
+    def ativo(self) -> bool:
+        """Se o stream ainda não foi encerrado"""
+        return not self._encerrado.is_set()
+
+    def parar(self, aguardar: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Desconecta o stream e encerra a ingestão (que drena a fila antes de sair)
+
+        Args:
+            aguardar (bool): Se deve esperar a fila ser drenada
+            timeout (float, optional): Espera máxima, em segundos
+
+        Returns:
+            bool: True se a ingestão terminou
+        """
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+        try:
+            self.stream.disconnect()
+        except Exception as e:
+            self.logger.error(f"Erro ao desconectar stream: {e}")
+        terminou = self.ingestao.parar(aguardar, timeout)
+        self._encerrado.set()
+        return terminou
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até o stream ser encerrado (por parar ou pela duração; sem
+        duração e sem timeout, só retorna depois de parar)
+
+        Args:
+            timeout (float, optional): Espera máxima, em segundos
+
+        Returns:
+            bool: True se o stream foi encerrado
+        """
+        return self._encerrado.wait(timeout)
+
+    def obter_metricas(self) -> Dict:
+        """
+        Retorna as métricas da ingestão e os tweets recebidos pelo stream
+
+        Returns:
+            Dict: Métricas de IngestaoStream.obter_metricas mais 'recebidos_stream'
+        """
+        return {**self.ingestao.obter_metricas(), 'recebidos_stream': self.stream.contador}
+
 
 class ColetorAlternativo:
     """Coletor alternativo para quando Twitter API não está disponível"""
@@ -676,6 +1053,7 @@ class ColetorAlternativo:
 
 
 # Funções de conveniência
+
 def criar_coletor_twitter(bearer_token: str, **kwargs) -> ColetorTwitter:
     """
     Cria coletor Twitter com configuração mínima
@@ -3,6 +3,7 @@ Módulo para salvar e carregar configurações da API do Twitter
 """
 
 import os
+import copy
 import json
 import logging
 
@@ -54,3 +55,94 @@ def carregar_config_twitter():
     except Exception as e:
         print(f"Erro ao carregar configurações: {str(e)}")
         return None
+
+# Configuração padrão do processamento de linguagem natural
+CONFIG_NLP_PADRAO = {
+    'perfil_entidades': 'completo',
+    # Triagem em cascata (ver pipeline_nlp.PipelineNLP)
+    'cascata': {
+        'ativa': False,
+        # Níveis de urgência que sempre passam pelos modelos completos
+        'niveis_escalonamento': ['alta', 'crítica'],
+        # Palavras-chave mínimas do tipo vencedor para a triagem decidir sozinha
+        'min_palavras_chave': 2,
+        # Vantagem mínima do tipo vencedor sobre o segundo colocado
+        'margem_minima': 2
+    },
+    # Degradação sob acúmulo de mensagens (ver pipeline_nlp.PoliticaDegradacao):
+    # o i-ésimo limite leva ao nível de fidelidade i + 1. Vale só para filas
+    # contínuas (ingestao_stream.IngestaoStream); chamadas síncronas não degradam
+    'degradacao': {
+        'ativa': False,
+        'limites_profundidade': [500, 1000, 2000, 4000],
+        'limites_atraso_s': [10, 30, 60, 120],
+        # Volta a um nível melhor só abaixo desta fração dos limites (evita oscilação)
+        'histerese': 0.5,
+        # Classes de prioridade sempre analisadas com fidelidade completa
+        'classes_protegidas': ['crítica']
+    }
+}
+
+def salvar_config_nlp(config):
+    """
+    Salva configurações de NLP em um arquivo local
+    
+    Args:
+        config (dict): Dicionário com as configurações
+        
+    Returns:
+        bool: True se sucesso, False se falha
+    """
+    try:
+        config_dir = os.path.join(os.path.dirname(__file__), 'config')
+        os.makedirs(config_dir, exist_ok=True)
+        
+        config_path = os.path.join(config_dir, 'nlp.json')
+        
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+            
+        return True
+    except Exception as e:
+        print(f"Erro ao salvar configurações de NLP: {str(e)}")
+        return False
+
+def _mesclar_config(base, valores):
+    """
+    Sobrepõe valores a uma configuração, seção por seção
+    
+    Args:
+        base (dict): Configuração a completar (alterada no lugar)
+        valores (dict): Valores lidos do arquivo
+        
+    Returns:
+        dict: A própria base, com os valores aplicados
+    """
+    for chave, valor in valores.items():
+        if isinstance(valor, dict) and isinstance(base.get(chave), dict):
+            _mesclar_config(base[chave], valor)
+        else:
+            base[chave] = valor
+    return base
+
+def carregar_config_nlp():
+    """
+    Carrega configurações de NLP do arquivo local, completando com os padrões
+    
+    Seções aninhadas (ex.: 'cascata') são mescladas chave a chave: um arquivo
+    que altera só um parâmetro mantém os padrões dos demais.
+    
+    Returns:
+        dict: Configurações de NLP
+    """
+    config = copy.deepcopy(CONFIG_NLP_PADRAO)
+    try:
+        config_path = os.path.join(os.path.dirname(__file__), 'config', 'nlp.json')
+        
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                _mesclar_config(config, json.load(f))
+    except Exception as e:
+        print(f"Erro ao carregar configurações de NLP: {str(e)}")
+    
+    return config
@@ -12,9 +12,14 @@ import time
 from typing import Dict, List, Optional, Any
 import pandas as pd
 
+from limitador_taxa import obter_limitador_taxa
+
 # Configura logger
 logger = logging.getLogger(__name__)
 
+# Recurso da busca recente no limitador de taxa (o mesmo usado pelo coletor)
+RECURSO_BUSCA_RECENTE = 'twitter:/2/tweets/search/recent'
+
 class ControladorAPI:
     """Classe para controle de acesso à API do Twitter"""
 
@@ -37,6 +42,9 @@ class ControladorAPI:
         if 'contador_requisicoes' not in st.session_state:
             st.session_state.contador_requisicoes = 0
 
+        # Cota da API compartilhada entre sessões e processos
+        self.limitador = obter_limitador_taxa()
+
         # Diretório para cache
         self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
         os.makedirs(self.cache_dir, exist_ok=True)
@@ -99,16 +107,16 @@ class ControladorAPI:
             )
 
         with col2:
-            # Calcula tempo desde a última requisição
-            tempo_decorrido = (datetime.now() - st.session_state.ultima_requisicao).total_seconds() / 60
+            # Saldo da cota compartilhada (sincronizado com os cabeçalhos da API)
+            estado = self.limitador.estado(RECURSO_BUSCA_RECENTE)
             st.metric(
-                "Requisições recentes",
-                f"{st.session_state.contador_requisicoes}/450",
-                delta=f"há {tempo_decorrido:.1f} min"
+                "Requisições disponíveis",
+                f"{int(estado['fichas'])}/{int(estado['capacidade'])}",
+                delta=f"aguardar {estado['espera_s'] / 60:.1f} min" if estado['espera_s'] > 0 else None
             )
 
         # Mostra alerta se estiver próximo do limite
-        if st.session_state.contador_requisicoes > 300 and not st.session_state.modo_simulado:
+        if estado['fichas'] < estado['capacidade'] / 3 and not st.session_state.modo_simulado:
             st.warning("⚠️ Você está se aproximando do limite de requisições da API do Twitter. Considere ativar o modo simulado.")
 
     def verificar_limite_requisicoes(self) -> bool:
@@ -130,7 +138,7 @@ class ControladorAPI:
         if tempo_decorrido > (15 * 60):  # 15 minutos em segundos
             st.session_state.contador_requisicoes = 0
             st.session_state.ultima_requisicao = agora
-            return True
+            tempo_decorrido = 0
 
         # Verifica se já atingiu o limite configurado
         if st.session_state.contador_requisicoes >= st.session_state.config_cache["max_requisicoes"]:
@@ -138,6 +146,12 @@ class ControladorAPI:
             logger.warning(f"Limite de requisições atingido. Aguarde {tempo_espera/60:.1f} minutos.")
             return False
 
+        # Verifica a cota compartilhada com as demais sessões
+        estado = self.limitador.estado(RECURSO_BUSCA_RECENTE)
+        if estado['fichas'] < 1:
+            logger.warning(f"Cota da API esgotada. Aguarde {estado['espera_s']/60:.1f} minutos.")
+            return False
+
         return True
 
     def registrar_requisicao(self):
@@ -155,6 +169,9 @@ class ControladorAPI:
         # Configura modo simulado
         coletor.ativar_modo_simulado(st.session_state.modo_simulado)
 
+        # Entradas novas do cache de respostas valem pela validade configurada
+        coletor.validade_cache_minutos = st.session_state.config_cache["validade_cache"]
+
         # Passa configurações de cache e limite de requisições
         return {
             "usar_cache": st.session_state.config_cache["usar_cache"],
@@ -0,0 +1,203 @@
+"""
+Escalonador de NLP por Prioridade
+Fila de prioridade à frente dos estágios de NLP: uma pré-pontuação barata
+(léxico de urgência, pessoas vulneráveis e fonte) ordena o trabalho para que
+mensagens críticas sejam analisadas, persistidas e exibidas antes das demais
+"""
+
+import re
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lexicos import padrao_trie
+from analise_sentimento import NIVEIS_URGENCIA, obter_motor_urgencia
+from estatisticas_incrementais import AcumuladorEstatisticas
+
+# Termos que indicam pessoas vulneráveis ou em risco direto
+PALAVRAS_VULNERAVEIS = [
+    'criança', 'crianças', 'bebê', 'bebês', 'recém-nascido', 'idoso', 'idosa',
+    'idosos', 'idosas', 'gestante', 'grávida', 'cadeirante', 'deficiente',
+    'acamado', 'acamada', 'ferido', 'ferida', 'feridos', 'feridas', 'preso',
+    'presa', 'presos', 'presas', 'soterrado', 'soterrada', 'soterrados',
+    'ilhado', 'ilhada', 'ilhados', 'desaparecido', 'desaparecida',
+    'inconsciente', 'sangrando', 'afogando'
+]
+
+# Pontos por termo de vulnerabilidade (até MAX_VULNERAVEIS termos)
+PESO_VULNERAVEIS = 2
+MAX_VULNERAVEIS = 3
+
+# Ajuste por fonte: relatos diretos sobem, notícias e dados simulados descem
+PESOS_FONTE = {
+    'twitter_stream': 1,
+    'twitter': 1,
+    'serper': -1,
+    'noticia': -1,
+    'simulado': -2
+}
+
+# Classes de prioridade (os mesmos nomes dos níveis de urgência) e o score
+# mínimo de cada uma a partir da segunda
+CLASSES_PRIORIDADE = NIVEIS_URGENCIA
+LIMITES_PRIORIDADE = np.array([2, 4, 7])
+
+# Esperas recentes guardadas por classe para os percentis
+JANELA_ESPERAS = 1000
+
+_PADRAO_VULNERAVEIS = re.compile(r'\b(?:' + padrao_trie(PALAVRAS_VULNERAVEIS) + r')\b',
+                                 flags=re.IGNORECASE)
+
+
+def pre_pontuar(textos: List[str], fontes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Calcula a prioridade de um lote sem rodar os modelos de NLP
+
+    Args:
+        textos (List[str]): Textos das mensagens
+        fontes (Iterable[str], optional): Fonte de cada mensagem ('twitter', 'serper'...)
+
+    Returns:
+        Dict: 'score_prioridade' (int), 'classe_prioridade' (categórico ordenado,
+            de 'baixa' a 'crítica') e 'vulneraveis' (termos de vulnerabilidade)
+    """
+    textos = [t if isinstance(t, str) else '' for t in textos]
+    urgencia = obter_motor_urgencia().analisar_lote(textos)['score_urgencia'].astype(int)
+    vulneraveis = np.array([len(_PADRAO_VULNERAVEIS.findall(t)) for t in textos], dtype=int)
+
+    score = urgencia + PESO_VULNERAVEIS * np.minimum(vulneraveis, MAX_VULNERAVEIS)
+    if fontes is not None:
+        score = score + np.array([PESOS_FONTE.get(f, 0) for f in fontes], dtype=int)
+    score = np.maximum(score, 0)
+
+    classes = np.searchsorted(LIMITES_PRIORIDADE, score, side='right')
+    return {
+        'score_prioridade': score,
+        'classe_prioridade': pd.Categorical.from_codes(classes, CLASSES_PRIORIDADE, ordered=True),
+        'vulneraveis': vulneraveis
+    }
+
+
+class EscalonadorNLP:
+    """Fila de prioridade (maior score primeiro, ordem de chegada no empate)"""
+
+    def __init__(self):
+        """Inicializa a fila vazia"""
+        self._fila: List[Tuple] = []
+        self._sequencia = itertools.count()
+        self._lock = threading.Lock()
+        self.estatisticas = AcumuladorEstatisticas()
+        self._esperas = {classe: deque(maxlen=JANELA_ESPERAS) for classe in CLASSES_PRIORIDADE}
+
+    def enfileirar(self, itens: List[Any], textos: List[str],
+                   fontes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Pré-pontua e enfileira um lote
+
+        Args:
+            itens (List[Any]): Itens devolvidos por retirar_lote (ex.: posição da mensagem)
+            textos (List[str]): Texto de cada item
+            fontes (Iterable[str], optional): Fonte de cada item
+
+        Returns:
+            Dict: Resultado de pre_pontuar para o lote
+        """
+        prioridade = pre_pontuar(textos, fontes)
+        agora = time.perf_counter()
+        classes = prioridade['classe_prioridade']
+
+        with self._lock:
+            for item, score, classe in zip(itens, prioridade['score_prioridade'], classes):
+                heapq.heappush(self._fila, (-int(score), next(self._sequencia), agora, classe, item))
+            self.estatisticas.contar('enfileiradas', classes)
+
+        return prioridade
+
+    def retirar_lote(self, tamanho: int) -> List[Tuple[Any, str, float]]:
+        """
+        Retira os itens de maior prioridade
+
+        Args:
+            tamanho (int): Máximo de itens
+
+        Returns:
+            List[Tuple[Any, str, float]]: (item, classe, espera em segundos), do
+                mais prioritário ao menos
+        """
+        agora = time.perf_counter()
+        with self._lock:
+            retirados = [heapq.heappop(self._fila) for _ in range(min(tamanho, len(self._fila)))]
+            lote = [(item, classe, agora - enfileirado_em)
+                    for _, _, enfileirado_em, classe, item in retirados]
+
+            classes = [classe for _, classe, _ in lote]
+            esperas_ms = [espera * 1000 for _, _, espera in lote]
+            self.estatisticas.contar('atendidas', classes)
+            self.estatisticas.somar('espera_fila_ms', esperas_ms, grupos=classes)
+            for classe, espera in zip(classes, esperas_ms):
+                self._esperas[classe].append(espera)
+
+        return lote
+
+    def __len__(self) -> int:
+        """Itens aguardando na fila"""
+        return len(self._fila)
+
+    def atraso(self) -> float:
+        """Espera, em segundos, do item mais antigo ainda na fila (0 se vazia)"""
+        with self._lock:
+            if not self._fila:
+                return 0.0
+            return time.perf_counter() - min(entrada[2] for entrada in self._fila)
+
+    def obter_estatisticas_fila(self) -> Dict[str, Any]:
+        """
+        Retorna a profundidade da fila e a espera por classe de prioridade
+
+        Returns:
+            Dict: 'profundidade', 'atraso_s' e, por classe, enfileiradas,
+                atendidas, espera_media_ms, espera_p95_ms e espera_max_ms
+                (percentis sobre as últimas JANELA_ESPERAS esperas)
+        """
+        with self._lock:
+            medias = self.estatisticas.medias_por_grupo('espera_fila_ms')
+            por_classe = {}
+            for classe in reversed(CLASSES_PRIORIDADE):
+                esperas = np.array(self._esperas[classe])
+                por_classe[classe] = {
+                    'enfileiradas': self.estatisticas.contagem('enfileiradas', classe),
+                    'atendidas': self.estatisticas.contagem('atendidas', classe),
+                    'espera_media_ms': medias.get(classe, 0.0),
+                    'espera_p95_ms': float(np.percentile(esperas, 95)) if len(esperas) else 0.0,
+                    'espera_max_ms': float(esperas.max()) if len(esperas) else 0.0
+                }
+            profundidade = len(self._fila)
+
+        return {'profundidade': profundidade, 'atraso_s': self.atraso(), 'classes': por_classe}
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    mensagens = [
+        "Notícia: prefeitura divulga balanço das chuvas",
+        "Preso na enchente com criança ferida, socorro urgente!",
+        "Chuva forte no bairro",
+        "Idoso ilhado em casa, água subindo, ajuda"
+    ]
+    fontes = ['serper', 'twitter', 'twitter', 'twitter_stream']
+
+    escalonador = EscalonadorNLP()
+    escalonador.enfileirar(list(range(len(mensagens))), mensagens, fontes)
+
+    print("=== Ordem de processamento ===")
+    while len(escalonador):
+        for posicao, classe, espera in escalonador.retirar_lote(2):
+            print(f"[{classe}] {mensagens[posicao]}")
+
+    print(f"\nFila: {escalonador.obter_estatisticas_fila()}")
@@ -0,0 +1,242 @@
+"""
+Estatísticas Incrementais
+Acumuladores mescláveis (contagens, somas e top-k aproximado) atualizados a cada
+lote processado, para que painéis e relatórios leiam estatísticas sem percorrer
+todo o histórico
+"""
+
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class EsbocoTopK:
+    """Esboço Space-Saving: itens mais frequentes com memória limitada à capacidade"""
+
+    def __init__(self, capacidade: int = 100):
+        """
+        Inicializa o esboço
+
+        Args:
+            capacidade (int): Máximo de itens monitorados; as contagens são exatas
+                enquanto o número de itens distintos não passa da capacidade
+        """
+        self.capacidade = capacidade
+        self.contagens: Dict[str, int] = {}
+        self.erros: Dict[str, int] = {}
+
+    def adicionar(self, itens: Iterable[str]):
+        """
+        Conta as ocorrências de um lote de itens
+
+        Args:
+            itens (Iterable[str]): Itens observados (com repetições)
+        """
+        for item, quantidade in Counter(itens).items():
+            self._incrementar(item, quantidade, 0)
+
+    def _incrementar(self, item: str, quantidade: int, erro: int):
+        """Soma ocorrências a um item, substituindo o menos frequente se o esboço estiver cheio"""
+        if item in self.contagens:
+            self.contagens[item] += quantidade
+            self.erros[item] += erro
+        elif len(self.contagens) < self.capacidade:
+            self.contagens[item] = quantidade
+            self.erros[item] = erro
+        else:
+            # O novo item herda a contagem do substituído como margem de erro
+            menor = min(self.contagens, key=self.contagens.get)
+            contagem_menor = self.contagens.pop(menor)
+            self.erros.pop(menor)
+            self.contagens[item] = contagem_menor + quantidade
+            self.erros[item] = contagem_menor + erro
+
+    def mesclar(self, outro: 'EsbocoTopK'):
+        """
+        Incorpora as contagens de outro esboço
+
+        Args:
+            outro (EsbocoTopK): Esboço a mesclar
+        """
+        for item in set(self.contagens) | set(outro.contagens):
+            self.contagens[item] = self.contagens.get(item, 0) + outro.contagens.get(item, 0)
+            self.erros[item] = self.erros.get(item, 0) + outro.erros.get(item, 0)
+
+        if len(self.contagens) > self.capacidade:
+            manter = sorted(self.contagens, key=self.contagens.get, reverse=True)[:self.capacidade]
+            self.contagens = {item: self.contagens[item] for item in manter}
+            self.erros = {item: self.erros[item] for item in manter}
+
+    def mais_comuns(self, n: int = 10) -> List[Tuple[str, int]]:
+        """
+        Retorna os n itens mais frequentes
+
+        Args:
+            n (int): Quantidade de itens
+
+        Returns:
+            List[Tuple[str, int]]: Pares (item, contagem), do mais frequente ao menos
+        """
+        return Counter(self.contagens).most_common(n)
+
+    def para_dict(self) -> Dict:
+        """Representação serializável em JSON"""
+        return {'capacidade': self.capacidade, 'contagens': dict(self.contagens),
+                'erros': dict(self.erros)}
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'EsbocoTopK':
+        """Reconstrói o esboço a partir de para_dict"""
+        esboco = cls(dados.get('capacidade', 100))
+        esboco.contagens = dict(dados.get('contagens', {}))
+        esboco.erros = dict(dados.get('erros', {}))
+        return esboco
+
+
+class AcumuladorEstatisticas:
+    """Contagens, somas por grupo e top-k atualizados em O(lote) e lidos em O(1)"""
+
+    def __init__(self, capacidade_topk: int = 100):
+        """
+        Inicializa o acumulador vazio
+
+        Args:
+            capacidade_topk (int): Capacidade de cada esboço top-k
+        """
+        self.capacidade_topk = capacidade_topk
+        self.total = 0
+        self.contagens: Dict[str, Counter] = {}
+        self.somas: Dict[str, Dict[str, List[float]]] = {}
+        self.topk: Dict[str, EsbocoTopK] = {}
+
+    def adicionar_total(self, quantidade: int):
+        """Soma mensagens ao total"""
+        self.total += quantidade
+
+    def contar(self, campo: str, valores: Iterable):
+        """
+        Acumula a contagem de cada valor de um campo categórico
+
+        Args:
+            campo (str): Nome da estatística
+            valores (Iterable): Valores observados no lote
+        """
+        self.contagens.setdefault(campo, Counter()).update(
+            valor for valor in valores if not _ausente(valor)
+        )
+
+    def somar(self, campo: str, valores: Iterable, grupos: Optional[Iterable] = None):
+        """
+        Acumula soma e quantidade de um campo numérico (valores ausentes são ignorados)
+
+        Args:
+            campo (str): Nome da estatística
+            valores (Iterable): Valores numéricos do lote
+            grupos (Iterable, optional): Grupo de cada valor, para médias por grupo
+        """
+        somas = self.somas.setdefault(campo, {})
+        if grupos is None:
+            pares = (('', valor) for valor in valores)
+        else:
+            pares = zip(map(str, grupos), valores)
+
+        for grupo, valor in pares:
+            if _ausente(valor):
+                continue
+            acumulado = somas.setdefault(grupo, [0.0, 0])
+            acumulado[0] += float(valor)
+            acumulado[1] += 1
+
+    def observar_topk(self, campo: str, itens: Iterable[str]):
+        """
+        Alimenta o esboço top-k de um campo
+
+        Args:
+            campo (str): Nome da estatística
+            itens (Iterable[str]): Itens observados no lote
+        """
+        if campo not in self.topk:
+            self.topk[campo] = EsbocoTopK(self.capacidade_topk)
+        self.topk[campo].adicionar(itens)
+
+    def contagem(self, campo: str, valor: Any) -> int:
+        """Quantas vezes um valor foi contado no campo"""
+        return self.contagens.get(campo, Counter()).get(valor, 0)
+
+    def distribuicao(self, campo: str) -> Dict[Any, int]:
+        """Contagem de cada valor do campo, do mais frequente ao menos"""
+        return dict(self.contagens.get(campo, Counter()).most_common())
+
+    def soma(self, campo: str, grupo: str = '') -> float:
+        """Soma acumulada de um campo"""
+        return self.somas.get(campo, {}).get(grupo, (0.0, 0))[0]
+
+    def media(self, campo: str, grupo: str = '') -> float:
+        """Média de um campo (NaN se nenhum valor foi observado)"""
+        soma, quantidade = self.somas.get(campo, {}).get(grupo, (0.0, 0))
+        return soma / quantidade if quantidade else float('nan')
+
+    def medias_por_grupo(self, campo: str) -> Dict[str, float]:
+        """Média do campo em cada grupo"""
+        return {grupo: soma / quantidade
+                for grupo, (soma, quantidade) in self.somas.get(campo, {}).items() if quantidade}
+
+    def mais_comuns(self, campo: str, n: int = 10) -> Dict[str, int]:
+        """Itens mais frequentes do esboço top-k do campo"""
+        if campo not in self.topk:
+            return {}
+        return dict(self.topk[campo].mais_comuns(n))
+
+    def mesclar(self, outro: 'AcumuladorEstatisticas') -> 'AcumuladorEstatisticas':
+        """
+        Incorpora outro acumulador (ex.: de outra sessão ou de um lote paralelo)
+
+        Args:
+            outro (AcumuladorEstatisticas): Acumulador a mesclar
+
+        Returns:
+            AcumuladorEstatisticas: Este acumulador, atualizado
+        """
+        self.total += outro.total
+        for campo, contagem in outro.contagens.items():
+            self.contagens.setdefault(campo, Counter()).update(contagem)
+        for campo, grupos in outro.somas.items():
+            somas = self.somas.setdefault(campo, {})
+            for grupo, (soma, quantidade) in grupos.items():
+                acumulado = somas.setdefault(grupo, [0.0, 0])
+                acumulado[0] += soma
+                acumulado[1] += quantidade
+        for campo, esboco in outro.topk.items():
+            if campo not in self.topk:
+                self.topk[campo] = EsbocoTopK(esboco.capacidade)
+            self.topk[campo].mesclar(esboco)
+        return self
+
+    def para_dict(self) -> Dict:
+        """Representação serializável em JSON (persistida junto com os dados)"""
+        return {
+            'capacidade_topk': self.capacidade_topk,
+            'total': self.total,
+            'contagens': {campo: dict(contagem) for campo, contagem in self.contagens.items()},
+            'somas': {campo: {grupo: list(valores) for grupo, valores in grupos.items()}
+                      for campo, grupos in self.somas.items()},
+            'topk': {campo: esboco.para_dict() for campo, esboco in self.topk.items()}
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'AcumuladorEstatisticas':
+        """Reconstrói o acumulador a partir de para_dict"""
+        acumulador = cls(dados.get('capacidade_topk', 100))
+        acumulador.total = dados.get('total', 0)
+        acumulador.contagens = {campo: Counter(contagem)
+                                for campo, contagem in dados.get('contagens', {}).items()}
+        acumulador.somas = {campo: {grupo: list(valores) for grupo, valores in grupos.items()}
+                            for campo, grupos in dados.get('somas', {}).items()}
+        acumulador.topk = {campo: EsbocoTopK.de_dict(esboco)
+                           for campo, esboco in dados.get('topk', {}).items()}
+        return acumulador
+
+
+def _ausente(valor: Any) -> bool:
+    """Indica valores ausentes (None ou NaN)"""
+    return valor is None or (isinstance(valor, float) and math.isnan(valor))
@@ -4,32 +4,129 @@ Utiliza spaCy para identificar pessoas, localizações, telefones e informaçõe
 """
 
 import re
+import time
+import json
+import hashlib
+import tracemalloc
 import spacy
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple, Set, Optional, Iterable, Iterator
 import pandas as pd
 from collections import defaultdict
+from spacy.tokens import Doc
+
+from config_manager import carregar_config_nlp
+from estatisticas_incrementais import AcumuladorEstatisticas
+
+
+# Remove formatação de números de telefone
+_PADRAO_NAO_DIGITO = re.compile(r'[^\d+]')
+
+# Perfis de pipeline do spaCy: só doc.ents é usado, então os demais
+# componentes podem ser excluídos para ganhar throughput
+PERFIS_SPACY = {
+    # Todos os componentes do modelo
+    'completo': {'usar_spacy': True, 'excluir': []},
+    # Apenas tokenização + NER (tok2vec mantido, pois o NER pode depender dele)
+    'ner': {
+        'usar_spacy': True,
+        'excluir': ['parser', 'tagger', 'morphologizer', 'lemmatizer',
+                    'attribute_ruler', 'senter', 'trainable_lemmatizer']
+    },
+    # Sem spaCy: somente padrões regex e léxicos
+    'regex': {'usar_spacy': False, 'excluir': []}
+}
+
+
+class VarredorPadroes:
+    """Padrões regex e léxicos de emergência compilados uma única vez"""
+    
+    def __init__(self, padroes: Dict, contextos_emergencia: Dict[str, List[str]]):
+        """
+        Compila os padrões
+        
+        Args:
+            padroes (Dict): Padrões regex por tipo (telefone é uma lista)
+            contextos_emergencia (Dict[str, List[str]]): Categoria -> palavras
+        """
+        self.origem = (padroes, contextos_emergencia)
+        
+        # Padrões estruturais mantidos separados: eles se sobrepõem (um número de
+        # 8 dígitos é telefone e CEP ao mesmo tempo) e uma única alternação
+        # descartaria ocorrências
+        self.telefone = [re.compile(p, re.IGNORECASE) for p in padroes['telefone']]
+        self.cep = re.compile(padroes['cep'])
+        self.coordenadas = re.compile(padroes['coordenadas'])
+        self.endereco_numero = re.compile(padroes['endereco_numero'], re.IGNORECASE)
+        self.horario = re.compile(padroes['horario'])
+        self.data = re.compile(padroes['data'])
+        
+        # Léxicos: uma única alternação com fronteira de palavra; como cada
+        # ocorrência é uma palavra inteira, nenhuma é perdida por sobreposição
+        self.categorias_palavra = defaultdict(list)
+        for ordem_categoria, (categoria, palavras) in enumerate(contextos_emergencia.items()):
+            for ordem_palavra, palavra in enumerate(palavras):
+                self.categorias_palavra[palavra.lower()].append(
+                    (ordem_categoria, ordem_palavra, categoria, palavra)
+                )
+        alternativas = '|'.join(re.escape(p) for p in sorted(self.categorias_palavra, key=len, reverse=True))
+        self.lexico = re.compile(rf'\b(?:{alternativas})\b', re.IGNORECASE) if alternativas else None
+    
+    def varrer(self, texto: str) -> Dict[str, List]:
+        """
+        Varre o texto uma vez com todos os padrões
+        
+        Args:
+            texto (str): Texto para análise
+            
+        Returns:
+            Dict[str, List]: Ocorrências por padrão ('telefone', 'cep', 'coordenadas',
+                'endereco_numero', 'horario', 'data' -> matches) e 'lexico' ->
+                tuplas (categoria, palavra, match) na ordem do léxico
+        """
+        lexico = []
+        if self.lexico is not None:
+            for match in self.lexico.finditer(texto):
+                for ordem_categoria, ordem_palavra, categoria, palavra in \
+                        self.categorias_palavra.get(match.group().lower(), ()):
+                    lexico.append((ordem_categoria, ordem_palavra, match.start(), categoria, palavra, match))
+            lexico.sort(key=lambda item: item[:3])
+        
+        return {
+            'telefone': [m for padrao in self.telefone for m in padrao.finditer(texto)],
+            'cep': list(self.cep.finditer(texto)),
+            'coordenadas': list(self.coordenadas.finditer(texto)),
+            'endereco_numero': list(self.endereco_numero.finditer(texto)),
+            'horario': list(self.horario.finditer(texto)),
+            'data': list(self.data.finditer(texto)),
+            'lexico': [(categoria, palavra, match) for *_, categoria, palavra, match in lexico]
+        }
 
 
 class ExtratorEntidades:
     """Classe para extração de entidades nomeadas e informações críticas"""
     
-    def __init__(self, modelo_spacy='pt_core_news_sm'):
+    def __init__(self, modelo_spacy='pt_core_news_sm', perfil: Optional[str] = None):
         """
         Inicializa o extrator de entidades
         
         Args:
             modelo_spacy (str): Nome do modelo spaCy para português
+            perfil (str, optional): Perfil do pipeline ('completo', 'ner' ou 'regex');
+                se omitido, usa 'perfil_entidades' da configuração de NLP
         """
-        try:
-            self.nlp = spacy.load(modelo_spacy)
-        except OSError:
-            print(f"Modelo {modelo_spacy} não encontrado. Tentando carregar modelo alternativo...")
-            try:
-                # Tenta carregar modelo menor se disponível
-                self.nlp = spacy.load('pt_core_news_md')
-            except OSError:
-                print("Nenhum modelo português encontrado. Usando modelo em inglês como fallback.")
-                self.nlp = spacy.load('en_core_web_sm')
+        if perfil is None:
+            perfil = carregar_config_nlp().get('perfil_entidades', 'completo')
+        if perfil not in PERFIS_SPACY:
+            raise ValueError(f"Perfil {perfil} não suportado. Opções: {list(PERFIS_SPACY)}")
+        
+        self.perfil = perfil
+        config_perfil = PERFIS_SPACY[perfil]
+        
+        inicio = time.perf_counter()
+        self.nlp = None
+        if config_perfil['usar_spacy']:
+            self.nlp = self._carregar_spacy(modelo_spacy, config_perfil['excluir'])
+        self.tempo_carga = time.perf_counter() - inicio
         
         # Padrões regex para diferentes tipos de informação
         self.padroes = {
@@ -68,58 +165,137 @@ class ExtratorEntidades:
             'teresina', 'campo grande', 'joão pessoa', 'jaboatão dos guararapes',
             'osasco', 'santo andré', 'são bernardo do campo', 'contagem', 'uberlândia'
         }
+        
+        # Padrões compilados (construídos sob demanda)
+        self._varredor = None
+    
+    def obter_versao(self) -> str:
+        """
+        Identifica perfil, modelo spaCy e padrões para endereçar resultados em cache
+        
+        Returns:
+            str: Versão do extrator
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps([self.padroes, self.contextos_emergencia,
+                             sorted(self.cidades_brasileiras)]).encode('utf-8'))
+        modelo = 'sem_spacy'
+        if self.nlp is not None:
+            modelo = f"{self.nlp.meta.get('lang')}_{self.nlp.meta.get('name')}-{self.nlp.meta.get('version')}"
+        return f"{self.perfil}:{modelo}:{h.hexdigest()[:16]}"
+    
+    def varrer_padroes(self, texto: str) -> Dict[str, List]:
+        """
+        Varre o texto uma única vez com todos os padrões regex e léxicos
+        
+        Args:
+            texto (str): Texto para análise
+            
+        Returns:
+            Dict[str, List]: Ocorrências por padrão (ver VarredorPadroes.varrer)
+        """
+        origem = (self.padroes, self.contextos_emergencia)
+        if self._varredor is None or any(a is not b for a, b in zip(self._varredor.origem, origem)):
+            self._varredor = VarredorPadroes(self.padroes, self.contextos_emergencia)
+        return self._varredor.varrer(texto)
     
-    def extrair_telefones(self, texto: str) -> List[Dict]:
+    def extrair_telefones(self, texto: str, ocorrencias: Optional[Dict] = None) -> List[Dict]:
         """
         Extrai números de telefone do texto
         
         Args:
             texto (str): Texto para análise
+            ocorrencias (Dict, optional): Resultado de varrer_padroes já calculado
             
         Returns:
             List[Dict]: Lista de telefones encontrados
         """
+        ocorrencias = ocorrencias or self.varrer_padroes(texto)
         telefones = []
         
-        for padrao in self.padroes['telefone']:
-            matches = re.finditer(padrao, texto, re.IGNORECASE)
-            for match in matches:
-                telefone = match.group().strip()
-                # Limpa formatação
-                telefone_limpo = re.sub(r'[^\d+]', '', telefone)
-                
-                # Classifica tipo de telefone
-                if telefone_limpo in ['190', '192', '193', '199', '911']:
-                    tipo = 'emergencia'
-                elif len(telefone_limpo) >= 10:
-                    tipo = 'celular' if '9' in telefone_limpo[2:4] else 'fixo'
-                else:
-                    tipo = 'desconhecido'
-                
-                telefones.append({
-                    'numero': telefone,
-                    'numero_limpo': telefone_limpo,
-                    'tipo': tipo,
-                    'posicao': match.span()
-                })
+        for match in ocorrencias['telefone']:
+            telefone = match.group().strip()
+            # Limpa formatação
+            telefone_limpo = _PADRAO_NAO_DIGITO.sub('', telefone)
+            
+            # Classifica tipo de telefone
+            if telefone_limpo in ['190', '192', '193', '199', '911']:
+                tipo = 'emergencia'
+            elif len(telefone_limpo) >= 10:
+                tipo = 'celular' if '9' in telefone_limpo[2:4] else 'fixo'
+            else:
+                tipo = 'desconhecido'
+            
+            telefones.append({
+                'numero': telefone,
+                'numero_limpo': telefone_limpo,
+                'tipo': tipo,
+                'posicao': match.span()
+            })
         
         return telefones
     
-    def extrair_localizacoes(self, texto: str) -> List[Dict]:
+    def _carregar_spacy(self, modelo_spacy: str, excluir: List[str]):
+        """
+        Carrega o modelo spaCy sem os componentes excluídos pelo perfil
+        
+        Args:
+            modelo_spacy (str): Nome do modelo preferido
+            excluir (List[str]): Componentes que não devem ser carregados
+            
+        Returns:
+            Language: Pipeline do spaCy
+        """
+        try:
+            return spacy.load(modelo_spacy, exclude=excluir)
+        except OSError:
+            print(f"Modelo {modelo_spacy} não encontrado. Tentando carregar modelo alternativo...")
+            try:
+                # Tenta carregar modelo menor se disponível
+                return spacy.load('pt_core_news_md', exclude=excluir)
+            except OSError:
+                print("Nenhum modelo português encontrado. Usando modelo em inglês como fallback.")
+                return spacy.load('en_core_web_sm', exclude=excluir)
+    
+    @staticmethod
+    def _entidades(doc: Optional[Doc]):
+        """Entidades nomeadas do Doc (nenhuma no perfil sem spaCy)"""
+        return doc.ents if doc is not None else ()
+    
+    def analisar_texto(self, texto: str, doc: Optional[Doc] = None) -> Optional[Doc]:
+        """
+        Retorna o Doc spaCy do texto, reutilizando um Doc já processado
+        
+        Args:
+            texto (str): Texto para análise
+            doc (Doc, optional): Doc já processado pelo chamador
+            
+        Returns:
+            Doc: Documento processado pelo spaCy (None no perfil 'regex')
+        """
+        if doc is not None or self.nlp is None:
+            return doc
+        return self.nlp(texto)
+    
+    def extrair_localizacoes(self, texto: str, doc: Optional[Doc] = None,
+                             ocorrencias: Optional[Dict] = None) -> List[Dict]:
         """
         Extrai informações de localização do texto
         
         Args:
             texto (str): Texto para análise
+            doc (Doc, optional): Doc spaCy já processado (evita nova análise)
+            ocorrencias (Dict, optional): Resultado de varrer_padroes já calculado
             
         Returns:
             List[Dict]: Lista de localizações encontradas
         """
-        doc = self.nlp(texto)
+        doc = self.analisar_texto(texto, doc)
+        ocorrencias = ocorrencias or self.varrer_padroes(texto)
         localizacoes = []
         
         # Entidades nomeadas de localização via spaCy
-        for ent in doc.ents:
+        for ent in self._entidades(doc):
             if ent.label_ in ['LOC', 'GPE', 'MISC']:  # Localização, entidade geopolítica
                 localizacoes.append({
                     'texto': ent.text,
@@ -130,8 +306,7 @@ class ExtratorEntidades:
                 })
         
         # CEPs
-        ceps = re.finditer(self.padroes['cep'], texto)
-        for match in ceps:
+        for match in ocorrencias['cep']:
             localizacoes.append({
                 'texto': match.group(),
                 'tipo': 'cep',
@@ -141,8 +316,7 @@ class ExtratorEntidades:
             })
         
         # Coordenadas geográficas
-        coords = re.finditer(self.padroes['coordenadas'], texto)
-        for match in coords:
+        for match in ocorrencias['coordenadas']:
             localizacoes.append({
                 'texto': match.group(),
                 'tipo': 'coordenadas',
@@ -152,8 +326,7 @@ class ExtratorEntidades:
             })
         
         # Endereços com números
-        enderecos = re.finditer(self.padroes['endereco_numero'], texto, re.IGNORECASE)
-        for match in enderecos:
+        for match in ocorrencias['endereco_numero']:
             localizacoes.append({
                 'texto': match.group(),
                 'tipo': 'endereco',
@@ -178,21 +351,25 @@ class ExtratorEntidades:
         
         return localizacoes
     
-    def extrair_pessoas(self, texto: str) -> List[Dict]:
+    def extrair_pessoas(self, texto: str, doc: Optional[Doc] = None,
+                        ocorrencias: Optional[Dict] = None) -> List[Dict]:
         """
         Extrai informações sobre pessoas mencionadas
         
         Args:
             texto (str): Texto para análise
+            doc (Doc, optional): Doc spaCy já processado (evita nova análise)
+            ocorrencias (Dict, optional): Resultado de varrer_padroes já calculado
             
         Returns:
             List[Dict]: Lista de pessoas encontradas
         """
-        doc = self.nlp(texto)
+        doc = self.analisar_texto(texto, doc)
+        ocorrencias = ocorrencias or self.varrer_padroes(texto)
         pessoas = []
         
         # Entidades nomeadas de pessoa via spaCy
-        for ent in doc.ents:
+        for ent in self._entidades(doc):
             if ent.label_ in ['PER', 'PERSON']:
                 pessoas.append({
                     'nome': ent.text,
@@ -202,37 +379,36 @@ class ExtratorEntidades:
                 })
         
         # Pessoas vulneráveis mencionadas
-        for categoria, palavras in self.contextos_emergencia.items():
+        for categoria, palavra, match in ocorrencias['lexico']:
             if categoria == 'pessoas_vulneraveis':
-                for palavra in palavras:
-                    pattern = r'\b' + re.escape(palavra) + r'\b'
-                    matches = re.finditer(pattern, texto, re.IGNORECASE)
-                    for match in matches:
-                        pessoas.append({
-                            'nome': match.group(),
-                            'tipo': 'pessoa_vulneravel',
-                            'categoria': palavra,
-                            'posicao': match.span(),
-                            'contexto': self._extrair_contexto(texto, match.start(), match.end())
-                        })
+                pessoas.append({
+                    'nome': match.group(),
+                    'tipo': 'pessoa_vulneravel',
+                    'categoria': palavra,
+                    'posicao': match.span(),
+                    'contexto': self._extrair_contexto(texto, match.start(), match.end())
+                })
         
         return pessoas
     
-    def extrair_informacoes_temporais(self, texto: str) -> List[Dict]:
+    def extrair_informacoes_temporais(self, texto: str, doc: Optional[Doc] = None,
+                                      ocorrencias: Optional[Dict] = None) -> List[Dict]:
         """
         Extrai informações de data e hora
         
         Args:
             texto (str): Texto para análise
+            doc (Doc, optional): Doc spaCy já processado (evita nova análise)
+            ocorrencias (Dict, optional): Resultado de varrer_padroes já calculado
             
         Returns:
             List[Dict]: Lista de informações temporais
         """
+        ocorrencias = ocorrencias or self.varrer_padroes(texto)
         temporais = []
         
         # Horários
-        horarios = re.finditer(self.padroes['horario'], texto)
-        for match in horarios:
+        for match in ocorrencias['horario']:
             temporais.append({
                 'texto': match.group(),
                 'tipo': 'horario',
@@ -240,8 +416,7 @@ class ExtratorEntidades:
             })
         
         # Datas
-        datas = re.finditer(self.padroes['data'], texto)
-        for match in datas:
+        for match in ocorrencias['data']:
             temporais.append({
                 'texto': match.group(),
                 'tipo': 'data',
@@ -249,8 +424,8 @@ class ExtratorEntidades:
             })
         
         # Expressões temporais via spaCy
-        doc = self.nlp(texto)
-        for ent in doc.ents:
+        doc = self.analisar_texto(texto, doc)
+        for ent in self._entidades(doc):
             if ent.label_ in ['DATE', 'TIME']:
                 temporais.append({
                     'texto': ent.text,
@@ -261,29 +436,27 @@ class ExtratorEntidades:
         
         return temporais
     
-    def extrair_situacoes_criticas(self, texto: str) -> List[Dict]:
+    def extrair_situacoes_criticas(self, texto: str, ocorrencias: Optional[Dict] = None) -> List[Dict]:
         """
         Identifica situações críticas mencionadas
         
         Args:
             texto (str): Texto para análise
+            ocorrencias (Dict, optional): Resultado de varrer_padroes já calculado
             
         Returns:
             List[Dict]: Lista de situações críticas
         """
+        ocorrencias = ocorrencias or self.varrer_padroes(texto)
         situacoes = []
         
-        for categoria, palavras in self.contextos_emergencia.items():
-            for palavra in palavras:
-                pattern = r'\b' + re.escape(palavra) + r'\b'
-                matches = re.finditer(pattern, texto, re.IGNORECASE)
-                for match in matches:
-                    situacoes.append({
-                        'situacao': match.group(),
-                        'categoria': categoria,
-                        'posicao': match.span(),
-                        'contexto': self._extrair_contexto(texto, match.start(), match.end())
-                    })
+        for categoria, palavra, match in ocorrencias['lexico']:
+            situacoes.append({
+                'situacao': match.group(),
+                'categoria': categoria,
+                'posicao': match.span(),
+                'contexto': self._extrair_contexto(texto, match.start(), match.end())
+            })
         
         return situacoes
     
@@ -304,23 +477,34 @@ class ExtratorEntidades:
         fim_contexto = min(len(texto), fim + janela)
         return texto[inicio_contexto:fim_contexto].strip()
     
-    def extrair_todas_entidades(self, texto: str) -> Dict:
+    def extrair_todas_entidades(self, texto: str, doc: Optional[Doc] = None,
+                                extrair_temporais: bool = True) -> Dict:
         """
         Extrai todas as entidades de uma mensagem
         
+        O texto é processado pelo spaCy uma única vez e varrido uma única vez
+        pelos padrões compilados; todos os extratores compartilham o mesmo Doc e
+        as mesmas ocorrências.
+        
         Args:
             texto (str): Texto da mensagem
+            doc (Doc, optional): Doc spaCy já processado pelo chamador
+            extrair_temporais (bool): Se False, pula datas e horários (modo degradado)
             
         Returns:
             Dict: Todas as entidades extraídas
         """
+        doc = self.analisar_texto(texto, doc)
+        ocorrencias = self.varrer_padroes(texto)
+        
         resultado = {
             'texto_original': texto,
-            'telefones': self.extrair_telefones(texto),
-            'localizacoes': self.extrair_localizacoes(texto),
-            'pessoas': self.extrair_pessoas(texto),
-            'informacoes_temporais': self.extrair_informacoes_temporais(texto),
-            'situacoes_criticas': self.extrair_situacoes_criticas(texto)
+            'telefones': self.extrair_telefones(texto, ocorrencias),
+            'localizacoes': self.extrair_localizacoes(texto, doc, ocorrencias),
+            'pessoas': self.extrair_pessoas(texto, doc, ocorrencias),
+            'informacoes_temporais': (self.extrair_informacoes_temporais(texto, doc, ocorrencias)
+                                      if extrair_temporais else []),
+            'situacoes_criticas': self.extrair_situacoes_criticas(texto, ocorrencias)
         }
         
         # Calcula score de completude da informação
@@ -340,72 +524,189 @@ class ExtratorEntidades:
         
         return resultado
     
-    def processar_lote(self, mensagens: List[str]) -> pd.DataFrame:
+    def extrair_em_lote(self, mensagens: Iterable[str], batch_size: int = 64,
+                        n_process: int = 1, extrair_temporais: bool = True,
+                        estatisticas: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Extrai entidades de um fluxo de mensagens usando nlp.pipe
+        
+        As mensagens são consumidas sob demanda e os resultados entregues à medida
+        que cada Doc fica pronto, mantendo a memória limitada mesmo em lotes muito
+        grandes. Os extratores por regex usam o mesmo Doc da passagem do spaCy.
+        Ao final, o throughput é registrado no dicionário estatisticas, se
+        informado (o extrator é compartilhado entre threads e não guarda estado
+        por execução).
+        
+        Args:
+            mensagens (Iterable[str]): Mensagens (lista, gerador, arquivo etc.)
+            batch_size (int): Tamanho dos lotes enviados ao spaCy
+            n_process (int): Número de processos do spaCy (-1 usa todos os núcleos)
+            extrair_temporais (bool): Se False, pula datas e horários (modo degradado)
+            estatisticas (Dict, optional): Recebe documentos, segundos,
+                docs_por_segundo, batch_size, n_process e perfil da execução
+            
+        Yields:
+            Dict: Entidades de cada mensagem, com 'id_mensagem' = posição na entrada
+        """
+        inicio = time.perf_counter()
+        total = 0
+        
+        def textos_validos():
+            for i, mensagem in enumerate(mensagens):
+                if isinstance(mensagem, str):
+                    yield mensagem, (mensagem, i)
+                else:
+                    print(f"Erro ao processar mensagem {i}: texto inválido ({type(mensagem).__name__})")
+        
+        try:
+            if self.nlp is not None:
+                docs = self.nlp.pipe(textos_validos(), as_tuples=True,
+                                     batch_size=batch_size, n_process=n_process)
+            else:
+                docs = ((None, contexto) for _, contexto in textos_validos())
+            for doc, (mensagem, i) in docs:
+                try:
+                    resultado = self.extrair_todas_entidades(mensagem, doc, extrair_temporais)
+                except Exception as e:
+                    print(f"Erro ao processar mensagem {i}: {e}")
+                    continue
+                
+                resultado['id_mensagem'] = i
+                total += 1
+                yield resultado
+        finally:
+            duracao = time.perf_counter() - inicio
+            if estatisticas is not None:
+                estatisticas.update({
+                    'documentos': total,
+                    'segundos': duracao,
+                    'docs_por_segundo': total / duracao if duracao > 0 else 0.0,
+                    'batch_size': batch_size,
+                    'n_process': n_process,
+                    'perfil': self.perfil
+                })
+    
+    def processar_lote(self, mensagens: List[str], batch_size: int = 64,
+                       n_process: int = 1) -> pd.DataFrame:
         """
         Processa um lote de mensagens
         
         Args:
             mensagens (List[str]): Lista de mensagens
+            batch_size (int): Tamanho dos lotes enviados ao spaCy
+            n_process (int): Número de processos do spaCy
             
         Returns:
             pd.DataFrame: DataFrame com entidades extraídas
         """
-        resultados = []
-        
-        for i, mensagem in enumerate(mensagens):
-            try:
-                resultado = self.extrair_todas_entidades(mensagem)
-                resultado['id_mensagem'] = i
-                resultados.append(resultado)
-            except Exception as e:
-                print(f"Erro ao processar mensagem {i}: {e}")
-                continue
+        return pd.DataFrame(list(self.extrair_em_lote(mensagens, batch_size, n_process)))
+    
+    @staticmethod
+    def acumular_estatisticas_entidades(
+            df_entidades: pd.DataFrame,
+            acumulador: Optional[AcumuladorEstatisticas] = None) -> AcumuladorEstatisticas:
+        """
+        Atualiza estatísticas acumuladas com um lote de extrações, em O(tamanho do lote)
         
-        return pd.DataFrame(resultados)
+        Args:
+            df_entidades (pd.DataFrame): Entidades extraídas das mensagens novas
+            acumulador (AcumuladorEstatisticas, optional): Acumulador a atualizar;
+                um novo se omitido
+            
+        Returns:
+            AcumuladorEstatisticas: Acumulador atualizado
+        """
+        if acumulador is None:
+            acumulador = AcumuladorEstatisticas()
+        if df_entidades.empty:
+            return acumulador
+        
+        acumulador.adicionar_total(len(df_entidades))
+        for campo in ('telefones', 'localizacoes', 'pessoas'):
+            quantidades = df_entidades[campo].apply(len)
+            acumulador.contar('mensagens_com', [campo] * int((quantidades > 0).sum()))
+            acumulador.somar(f'quantidade_{campo}', quantidades)
+        acumulador.somar('score_completude', df_entidades['score_completude'])
+        acumulador.observar_topk('situacoes_criticas', (
+            situacao['situacao'] for situacoes in df_entidades['situacoes_criticas']
+            for situacao in situacoes
+        ))
+        
+        return acumulador
     
-    def obter_estatisticas_entidades(self, df_entidades: pd.DataFrame) -> Dict:
+    @staticmethod
+    def obter_estatisticas_entidades(df_entidades: Optional[pd.DataFrame] = None,
+                                     acumulador: Optional[AcumuladorEstatisticas] = None) -> Dict:
         """
         Calcula estatísticas das entidades extraídas
         
+        Com um acumulador (ver acumular_estatisticas_entidades) a leitura é
+        O(1), independente do tamanho do histórico, e não exige o modelo spaCy.
+        
         Args:
-            df_entidades (pd.DataFrame): DataFrame com entidades
+            df_entidades (pd.DataFrame, optional): DataFrame com entidades
+            acumulador (AcumuladorEstatisticas, optional): Estatísticas acumuladas
             
         Returns:
             Dict: Estatísticas
         """
-        if df_entidades.empty:
+        if acumulador is None:
+            if df_entidades is None or df_entidades.empty:
+                return {}
+            acumulador = ExtratorEntidades.acumular_estatisticas_entidades(df_entidades)
+        
+        if not acumulador.total:
             return {}
         
         stats = {
-            'total_mensagens': len(df_entidades),
-            'mensagens_com_telefone': len(df_entidades[df_entidades['telefones'].apply(len) > 0]),
-            'mensagens_com_localizacao': len(df_entidades[df_entidades['localizacoes'].apply(len) > 0]),
-            'mensagens_com_pessoas': len(df_entidades[df_entidades['pessoas'].apply(len) > 0]),
-            'score_completude_medio': df_entidades['score_completude'].mean(),
-            'total_telefones': sum(len(tel) for tel in df_entidades['telefones']),
-            'total_localizacoes': sum(len(loc) for loc in df_entidades['localizacoes']),
-            'situacoes_criticas_mais_comuns': self._contar_situacoes_criticas(df_entidades)
+            'total_mensagens': acumulador.total,
+            'mensagens_com_telefone': acumulador.contagem('mensagens_com', 'telefones'),
+            'mensagens_com_localizacao': acumulador.contagem('mensagens_com', 'localizacoes'),
+            'mensagens_com_pessoas': acumulador.contagem('mensagens_com', 'pessoas'),
+            'score_completude_medio': acumulador.media('score_completude'),
+            'total_telefones': int(acumulador.soma('quantidade_telefones')),
+            'total_localizacoes': int(acumulador.soma('quantidade_localizacoes')),
+            'situacoes_criticas_mais_comuns': acumulador.mais_comuns('situacoes_criticas', 10)
         }
         
         return stats
+
+
+def medir_perfis(textos: List[str], perfis: Optional[List[str]] = None,
+                 modelo_spacy: str = 'pt_core_news_sm') -> pd.DataFrame:
+    """
+    Mede tempo de carga, memória e throughput de cada perfil de pipeline
     
-    def _contar_situacoes_criticas(self, df: pd.DataFrame) -> Dict:
-        """
-        Conta situações críticas mais comuns
-        
-        Args:
-            df (pd.DataFrame): DataFrame com dados
-            
-        Returns:
-            Dict: Contagem de situações
-        """
-        contagem = defaultdict(int)
-        
-        for situacoes in df['situacoes_criticas']:
-            for situacao in situacoes:
-                contagem[situacao['situacao']] += 1
+    Args:
+        textos (List[str]): Mensagens de amostra para medir o throughput
+        perfis (List[str], optional): Perfis a medir (todos se omitido)
+        modelo_spacy (str): Modelo spaCy usado pelos perfis com spaCy
         
-        return dict(sorted(contagem.items(), key=lambda x: x[1], reverse=True)[:10])
+    Returns:
+        pd.DataFrame: Uma linha por perfil com tempo_carga_s, memoria_mb e docs_por_segundo
+    """
+    medicoes = []
+    
+    for perfil in perfis or list(PERFIS_SPACY):
+        tracemalloc.start()
+        try:
+            extrator = ExtratorEntidades(modelo_spacy, perfil=perfil)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        estatisticas = {}
+        for _ in extrator.extrair_em_lote(textos, estatisticas=estatisticas):
+            pass
+        
+        medicoes.append({
+            'perfil': perfil,
+            'tempo_carga_s': extrator.tempo_carga,
+            'memoria_mb': pico / (1024 * 1024),
+            'docs_por_segundo': estatisticas['docs_por_segundo']
+        })
+    
+    return pd.DataFrame(medicoes)
 
 
 # Função de conveniência
@@ -468,4 +769,8 @@ if __name__ == "__main__":
     print(f"Score médio de completude: {stats['score_completude_medio']:.2f}")
     print(f"Total de telefones: {stats['total_telefones']}")
     print(f"Total de localizações: {stats['total_localizacoes']}")
+    
+    # Comparação dos perfis de pipeline
+    print("\n--- Perfis de pipeline ---")
+    print(medir_perfis(mensagens_teste * 50).to_string(index=False))
 
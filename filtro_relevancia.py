@@ -0,0 +1,382 @@
+"""
+Filtro de Idioma e Relevância
+Etapa rápida entre a coleta e o NLP: descarta itens fora do português e itens
+sem relação com emergências (ex.: "explosão de gols"), registrando o motivo de
+cada rejeição, para que os estágios caros só vejam conteúdo plausível
+"""
+
+import re
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lexicos import padrao_trie
+from normalizacao import normalizar
+
+logger = logging.getLogger("monitor_emergencias.filtro_relevancia")
+
+# Textos de referência dos idiomas mais confundidos com o português nas buscas;
+# os trigramas de caracteres mais frequentes de cada um formam o perfil do idioma
+TEXTOS_REFERENCIA_IDIOMA = {
+    'pt': (
+        "a chuva forte causou alagamentos em vários bairros da cidade e a defesa civil "
+        "pede que os moradores não saiam de casa. não consigo sair, a água está subindo "
+        "muito rápido e tem uma criança aqui com a gente. o rio transbordou durante a "
+        "noite e as famílias foram levadas para abrigos. precisamos de ajuda urgente, "
+        "por favor mandem os bombeiros. segundo a prefeitura, ninguém ficou ferido, mas "
+        "as pessoas estão sem energia elétrica desde ontem. também houve deslizamento de "
+        "terra no morro e uma casa foi atingida. quem puder ajudar com doações de roupas "
+        "e alimentos deve procurar a escola do bairro. estamos ilhados, não há como "
+        "chegar ao hospital, então vamos esperar o resgate."
+    ),
+    'es': (
+        "la lluvia fuerte causó inundaciones en varios barrios de la ciudad y la defensa "
+        "civil pide que los vecinos no salgan de sus casas. no puedo salir, el agua está "
+        "subiendo muy rápido y hay un niño aquí con nosotros. el río se desbordó durante "
+        "la noche y las familias fueron llevadas a los refugios. necesitamos ayuda "
+        "urgente, por favor envíen a los bomberos. según la alcaldía, nadie resultó "
+        "herido, pero las personas están sin electricidad desde ayer. también hubo un "
+        "deslizamiento de tierra en el cerro y una casa fue alcanzada. quienes puedan "
+        "ayudar con donaciones de ropa y alimentos deben ir a la escuela del barrio."
+    ),
+    'en': (
+        "the heavy rain caused flooding in several neighborhoods of the city and the "
+        "civil defense is asking residents not to leave their homes. i can't get out, "
+        "the water is rising very fast and there is a child here with us. the river "
+        "overflowed during the night and the families were taken to shelters. we need "
+        "urgent help, please send the firefighters. according to the city hall, nobody "
+        "was injured, but people have been without power since yesterday. there was also "
+        "a landslide on the hill and a house was hit. anyone who can help with donations "
+        "of clothes and food should go to the neighborhood school."
+    )
+}
+
+TAMANHO_PERFIL_IDIOMA = 300
+
+# Códigos de idioma do Twitter que não identificam um idioma
+IDIOMAS_INDETERMINADOS = {'und', 'qme', 'qht', 'zxx', 'art', 'qam', 'qct', ''}
+
+# Contextos em que o vocabulário de desastre é usado em sentido figurado
+# (esporte, entretenimento, mercado). Só termos sem uso comum em notícias de
+# desastre: 'ações' (da Defesa Civil), 'série' (de tremores), 'show', 'partida',
+# 'técnico' e 'rodada' aparecem em manchetes legítimas
+TERMOS_IRRELEVANTES = [
+    'gol', 'gols', 'golaço', 'campeonato', 'placar', 'torcida', 'torcedores',
+    'artilheiro', 'goleada', 'brasileirão', 'libertadores', 'copa do mundo', 'escalação',
+    'novela', 'filme', 'álbum', 'cantor', 'cantora', 'bilheteria', 'reality', 'bbb',
+    'ibovespa', 'bolsa de valores', 'dólar', 'criptomoeda', 'promoção', 'desconto',
+    'black friday'
+]
+
+# Subconjunto sem nenhum uso em desastres: ao lado deles, as palavras-chave
+# de PALAVRAS_FIGURADAS não bastam como sinal positivo ("explosão de gols")
+TERMOS_CONTEXTO_EXCLUSIVO = [
+    'gol', 'gols', 'golaço', 'goleada', 'placar', 'artilheiro', 'brasileirão',
+    'libertadores', 'bilheteria', 'ibovespa', 'bolsa de valores', 'criptomoeda'
+]
+
+# Palavras de desastre frequentes em sentido figurado ("tragédia no clássico",
+# "desastre na bolsa"); as que são palavras-chave do classificador só contam
+# como sinal positivo sem contexto exclusivo
+PALAVRAS_FIGURADAS = [
+    'explosão', 'tragédia', 'desastre', 'catástrofe', 'furacão', 'terremoto',
+    'tsunami', 'avalanche', 'bomba', 'choque'
+]
+
+# Termos de desastre ausentes das palavras-chave do classificador (tempestades
+# e seus efeitos), somados ao sinal positivo
+TERMOS_DESASTRE_COMPLEMENTARES = [
+    'temporal', 'temporais', 'sem luz', 'sem energia', 'falta de energia',
+    'queda de árvore', 'queda de árvores', 'árvores caídas', 'derruba árvore',
+    'derruba árvores', 'derrubou árvores'
+]
+
+# Pontos perdidos por termo de contexto irrelevante (só em itens sem sinal
+# positivo literal)
+PESO_IRRELEVANTES = 2
+
+_PADRAO_NAO_LETRA = re.compile(r'[^a-zà-ÿ]+')
+_PADRAO_IRRELEVANTES = re.compile(r'\b(?:' + padrao_trie(TERMOS_IRRELEVANTES) + r')\b',
+                                  flags=re.IGNORECASE)
+_PADRAO_CONTEXTO_EXCLUSIVO = re.compile(r'\b(?:' + padrao_trie(TERMOS_CONTEXTO_EXCLUSIVO) + r')\b',
+                                        flags=re.IGNORECASE)
+_PADRAO_COMPLEMENTARES = re.compile(r'\b(?:' + padrao_trie(TERMOS_DESASTRE_COMPLEMENTARES) + r')\b',
+                                    flags=re.IGNORECASE)
+
+
+def _trigramas(texto: str) -> Counter:
+    """Trigramas de caracteres das palavras do texto (com bordas marcadas por espaço)"""
+    trigramas = Counter()
+    for palavra in _PADRAO_NAO_LETRA.split(texto.lower()):
+        if palavra:
+            palavra = f' {palavra} '
+            trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas
+
+
+PERFIS_IDIOMA = {
+    idioma: frozenset(t for t, _ in _trigramas(texto).most_common(TAMANHO_PERFIL_IDIOMA))
+    for idioma, texto in TEXTOS_REFERENCIA_IDIOMA.items()
+}
+
+
+def cobertura_idiomas(texto: str) -> Dict[str, float]:
+    """
+    Fração dos trigramas do texto presentes no perfil de cada idioma
+
+    Args:
+        texto (str): Texto para análise
+
+    Returns:
+        Dict[str, float]: Idioma -> cobertura (vazio se o texto não tem letras)
+    """
+    trigramas = _trigramas(texto)
+    total = sum(trigramas.values())
+    if not total:
+        return {}
+    return {idioma: sum(n for t, n in trigramas.items() if t in perfil) / total
+            for idioma, perfil in PERFIS_IDIOMA.items()}
+
+
+def detectar_idioma(texto: str) -> Tuple[str, float]:
+    """
+    Identifica o idioma pelos trigramas de caracteres
+
+    Args:
+        texto (str): Texto para análise
+
+    Returns:
+        Tuple[str, float]: Idioma mais provável e sua cobertura ('' e 0.0 se o
+            texto não tem letras)
+    """
+    cobertura = cobertura_idiomas(texto)
+    if not cobertura:
+        return '', 0.0
+    idioma = max(cobertura, key=cobertura.get)
+    return idioma, cobertura[idioma]
+
+
+class FiltroRelevancia:
+    """Pré-filtro de idioma e relevância com contagem dos motivos de rejeição"""
+
+    def __init__(self, idiomas_aceitos: Iterable[str] = ('pt',), score_minimo: int = 1,
+                 min_letras_idioma: int = 20, margem_idioma: float = 0.1):
+        """
+        Inicializa o filtro
+
+        Args:
+            idiomas_aceitos (Iterable[str]): Códigos de idioma aceitos
+            score_minimo (int): Relevância mínima (palavras-chave de desastre e
+                urgência, menos os contextos irrelevantes)
+            min_letras_idioma (int): Tamanho mínimo do texto para a detecção de
+                idioma (textos curtos são aceitos na dúvida)
+            margem_idioma (float): Vantagem mínima de cobertura de outro idioma
+                sobre o melhor idioma aceito para rejeitar o item
+        """
+        self.idiomas_aceitos = set(idiomas_aceitos)
+        self.score_minimo = score_minimo
+        self.min_letras_idioma = min_letras_idioma
+        self.margem_idioma = margem_idioma
+
+        self._lock = threading.Lock()
+        self.avaliados = 0
+        self.rejeicoes = Counter()
+        # Léxico de palavras-chave de desastre (construído sob demanda, sem modelo)
+        self._indice_palavras = None
+
+    def _motivo_idioma(self, texto: str, idioma_declarado: Any) -> str:
+        """Motivo de rejeição por idioma ('' se o idioma é aceito ou indeterminado)"""
+        if isinstance(idioma_declarado, str) and idioma_declarado not in IDIOMAS_INDETERMINADOS:
+            idioma = idioma_declarado.split('-')[0].lower()
+            return '' if idioma in self.idiomas_aceitos else f'idioma_declarado:{idioma}'
+
+        if len(_PADRAO_NAO_LETRA.sub('', texto.lower())) < self.min_letras_idioma:
+            return ''
+
+        cobertura = cobertura_idiomas(texto)
+        melhor = max(cobertura, key=cobertura.get)
+        melhor_aceito = max((cobertura[i] for i in self.idiomas_aceitos if i in cobertura), default=0.0)
+        if melhor not in self.idiomas_aceitos and cobertura[melhor] - melhor_aceito >= self.margem_idioma:
+            return f'idioma_detectado:{melhor}'
+        return ''
+
+    def _obter_indice_palavras(self):
+        """Léxico compilado das palavras-chave de desastre do classificador de tipo"""
+        if self._indice_palavras is None:
+            from classificador_tipo import ClassificadorDesastre, IndicePalavrasChave
+
+            with self._lock:
+                if self._indice_palavras is None:
+                    # Só o dicionário de palavras-chave: nada é treinado nem carregado
+                    palavras_chave = ClassificadorDesastre(diretorio_cache=None).palavras_chave
+                    self._indice_palavras = IndicePalavrasChave(palavras_chave)
+        return self._indice_palavras
+
+    def pontuar_relevancia(self, textos: List[str]) -> np.ndarray:
+        """
+        Calcula a relevância de um lote contra os léxicos de desastre
+
+        O contexto irrelevante só pesa em itens sem sinal positivo literal: uma
+        manchete com palavra-chave de desastre ou urgência nunca é rejeitada por
+        citar, por exemplo, uma torcida. A exceção são as palavras de
+        PALAVRAS_FIGURADAS ao lado de um contexto exclusivo ("explosão de
+        gols"), que não contam como sinal literal.
+
+        Args:
+            textos (List[str]): Textos dos itens
+
+        Returns:
+            np.ndarray: Palavras-chave de desastre + termos complementares +
+                score de urgência, menos PESO_IRRELEVANTES por termo de contexto
+                irrelevante quando não há sinal literal
+        """
+        from analise_sentimento import obter_motor_urgencia
+
+        indice = self._obter_indice_palavras()
+        presenca = indice.matriz_presenca([t.lower() for t in textos])
+        palavras = np.asarray((presenca @ indice.matriz_tipos).sum(axis=1)).ravel().astype(int)
+        complementares = np.array([len(_PADRAO_COMPLEMENTARES.findall(t)) for t in textos], dtype=int)
+        urgencia = obter_motor_urgencia().analisar_lote(textos)['score_urgencia'].astype(int)
+        positivo = palavras + complementares + urgencia
+
+        # Sinal literal: urgência, termos complementares ou alguma palavra-chave
+        # que não seja figurada; as figuradas só valem sem contexto exclusivo
+        figuradas = np.array([p in PALAVRAS_FIGURADAS for p in indice.palavras], dtype=bool)
+        literais = np.asarray(presenca[:, ~figuradas].sum(axis=1)).ravel()
+        exclusivos = np.array([bool(_PADRAO_CONTEXTO_EXCLUSIVO.search(t)) for t in textos])
+        sinal_literal = (literais > 0) | (complementares > 0) | (urgencia > 0)
+        sinal = sinal_literal | ((positivo > 0) & ~exclusivos)
+
+        irrelevantes = np.array([len(_PADRAO_IRRELEVANTES.findall(t)) for t in textos], dtype=int)
+        return np.where(sinal, positivo, positivo - PESO_IRRELEVANTES * irrelevantes)
+
+    def avaliar(self, textos: List[str],
+                idiomas: Optional[Iterable[Any]] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        Avalia um lote, sem alterar as contagens
+
+        Args:
+            textos (List[str]): Textos dos itens
+            idiomas (Iterable, optional): Idioma declarado de cada item (campo 'idioma')
+
+        Returns:
+            Tuple[np.ndarray, List[str]]: Score de relevância e motivo de
+                rejeição de cada item ('' se aceito)
+        """
+        textos = [t if isinstance(t, str) else '' for t in textos]
+        idiomas = list(idiomas) if idiomas is not None else [None] * len(textos)
+
+        motivos = ['texto_vazio' if not normalizar(t, 'chave') else self._motivo_idioma(t, i)
+                   for t, i in zip(textos, idiomas)]
+
+        scores = np.zeros(len(textos), dtype=int)
+        pendentes = [j for j, motivo in enumerate(motivos) if not motivo]
+        if pendentes:
+            scores[pendentes] = self.pontuar_relevancia([textos[j] for j in pendentes])
+            for j in pendentes:
+                if scores[j] < self.score_minimo:
+                    motivos[j] = 'irrelevante'
+
+        return scores, motivos
+
+    def filtrar_df(self, df: pd.DataFrame, campo_texto: str = 'texto') -> pd.DataFrame:
+        """
+        Mantém só os itens aceitos, registrando e contando as rejeições
+
+        Args:
+            df (pd.DataFrame): Itens coletados
+            campo_texto (str): Coluna com o texto
+
+        Returns:
+            pd.DataFrame: Itens aceitos, com a coluna 'score_relevancia'
+        """
+        if df.empty or campo_texto not in df.columns:
+            return df
+
+        idiomas = df['idioma'].tolist() if 'idioma' in df.columns else None
+        scores, motivos = self.avaliar(df[campo_texto].tolist(), idiomas)
+
+        for texto, motivo in zip(df[campo_texto], motivos):
+            if motivo:
+                logger.info(f"Item descartado antes do NLP ({motivo}): {str(texto)[:80]!r}")
+
+        with self._lock:
+            self.avaliados += len(df)
+            self.rejeicoes.update(motivo for motivo in motivos if motivo)
+
+        aceitos = np.array([not motivo for motivo in motivos], dtype=bool)
+        df_aceito = df[aceitos].copy()
+        df_aceito['score_relevancia'] = scores[aceitos]
+        return df_aceito
+
+    def filtrar(self, itens: List[Dict], campo_texto: str = 'texto') -> List[Dict]:
+        """
+        Versão de filtrar_df para listas de itens (formato dos coletores)
+
+        Args:
+            itens (List[Dict]): Itens coletados
+            campo_texto (str): Chave com o texto
+
+        Returns:
+            List[Dict]: Itens aceitos, com 'score_relevancia'
+        """
+        if not itens:
+            return []
+        return self.filtrar_df(pd.DataFrame(itens), campo_texto).to_dict('records')
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna quantos itens foram avaliados, aceitos e rejeitados por motivo
+
+        Returns:
+            Dict: 'avaliados', 'aceitos', 'taxa_rejeicao' e 'rejeicoes' por motivo
+        """
+        with self._lock:
+            rejeitados = sum(self.rejeicoes.values())
+            return {
+                'avaliados': self.avaliados,
+                'aceitos': self.avaliados - rejeitados,
+                'taxa_rejeicao': rejeitados / self.avaliados if self.avaliados else 0.0,
+                'rejeicoes': dict(self.rejeicoes.most_common())
+            }
+
+
+_filtro_global: Optional[FiltroRelevancia] = None
+_lock_global = threading.Lock()
+
+
+def obter_filtro_relevancia() -> FiltroRelevancia:
+    """
+    Retorna o filtro do processo, criando-o na primeira chamada
+
+    Returns:
+        FiltroRelevancia: Filtro compartilhado (as contagens valem para o processo)
+    """
+    global _filtro_global
+    if _filtro_global is None:
+        with _lock_global:
+            if _filtro_global is None:
+                _filtro_global = FiltroRelevancia()
+    return _filtro_global
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    itens = [
+        {'texto': "Enchente no bairro, a água subiu e estamos ilhados, socorro!", 'idioma': 'pt'},
+        {'texto': "Flooding downtown, the water is rising fast, please send help", 'idioma': 'und'},
+        {'texto': "Inundación en el barrio, el agua sube muy rápido, necesitamos ayuda", 'idioma': None},
+        {'texto': "Goleada no Brasileirão: time vence por 5 a 0 diante da torcida", 'idioma': 'pt'},
+        {'texto': "Trânsito lento na marginal", 'idioma': 'pt'},
+        {'texto': "Tweet em inglês declarado", 'idioma': 'en'}
+    ]
+
+    filtro = FiltroRelevancia()
+    aceitos = filtro.filtrar(itens)
+    print(f"\nAceitos: {[item['texto'] for item in aceitos]}")
+    print(f"Estatísticas: {filtro.obter_estatisticas()}")
@@ -0,0 +1,324 @@
+"""
+Ingestão de Stream com Contrapressão
+Fila limitada entre o stream do Twitter e o processamento: o stream só enfileira,
+e um conjunto de workers drena a fila em micro-lotes pelo NLP e pela persistência,
+para que um estágio lento não trave a conexão com a API
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from escalonador_nlp import pre_pontuar
+
+logger = logging.getLogger("monitor_emergencias.ingestao_stream")
+
+# O que fazer com uma mensagem que chega com a fila cheia:
+# - 'bloquear': o stream espera por espaço (até timeout_bloqueio_s; depois descarta)
+# - 'descartar_novas': a mensagem que chegou é descartada
+# - 'descartar_antigas': a mais antiga da fila é descartada para dar lugar à nova
+POLITICAS_FILA_CHEIA = ('bloquear', 'descartar_novas', 'descartar_antigas')
+
+# Estágios medidos: espera na fila, NLP, persistência e total (chegada → persistida)
+ESTAGIOS = ('fila', 'nlp', 'persistencia', 'total')
+
+# Medições recentes usadas nos percentis de atraso
+JANELA_ATRASOS = 2000
+
+
+class IngestaoStream:
+    """Fila limitada drenada por workers em micro-lotes (NLP → persistência)"""
+
+    def __init__(self, persistir: Optional[Callable[[List[Dict]], None]] = None,
+                 processar_lote: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+                 tamanho_fila: int = 5000, tamanho_lote: int = 64,
+                 intervalo_flush_s: float = 1.0, num_workers: int = 2,
+                 politica_fila_cheia: str = 'bloquear', timeout_bloqueio_s: float = 5.0):
+        """
+        Inicializa a ingestão (os workers só começam em iniciar)
+
+        Args:
+            persistir (Callable, optional): Recebe cada micro-lote já analisado
+            processar_lote (Callable, optional): Analisa um micro-lote e devolve um
+                resultado por mensagem; o padrão é o PipelineNLP do registro de modelos
+            tamanho_fila (int): Mensagens pendentes antes de a política de fila cheia agir
+            tamanho_lote (int): Mensagens por micro-lote
+            intervalo_flush_s (float): Espera máxima para completar um micro-lote
+            num_workers (int): Threads que drenam a fila
+            politica_fila_cheia (str): Uma de POLITICAS_FILA_CHEIA
+            timeout_bloqueio_s (float): Espera máxima do stream na política 'bloquear'
+        """
+        if politica_fila_cheia not in POLITICAS_FILA_CHEIA:
+            raise ValueError(f"Política de fila cheia desconhecida: {politica_fila_cheia}. "
+                             f"Use uma de {list(POLITICAS_FILA_CHEIA)}")
+
+        self.persistir = persistir
+        self.processar_lote = processar_lote or self._analisar_nlp
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush_s = intervalo_flush_s
+        self.num_workers = num_workers
+        self.politica_fila_cheia = politica_fila_cheia
+        self.timeout_bloqueio_s = timeout_bloqueio_s
+
+        self.fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+        self._parar = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._contadores = {'recebidas': 0, 'descartadas': 0, 'processadas': 0,
+                            'lotes': 0, 'erros_nlp': 0, 'erros_persistencia': 0}
+        self._atrasos = {estagio: deque(maxlen=JANELA_ATRASOS) for estagio in ESTAGIOS}
+        # Política de degradação desta fila (criada com o pipeline, no estágio padrão)
+        self.politica = None
+
+    def _contar(self, tipo: str, quantidade: int = 1):
+        """Atualiza um contador"""
+        with self._lock:
+            self._contadores[tipo] += quantidade
+
+    def _registrar_atrasos(self, estagio: str, atrasos_s: List[float]):
+        """Guarda atrasos de um estágio, em milissegundos"""
+        with self._lock:
+            self._atrasos[estagio].extend(atraso * 1000 for atraso in atrasos_s)
+
+    def iniciar(self) -> 'IngestaoStream':
+        """
+        Inicia os workers e retorna imediatamente
+
+        Returns:
+            IngestaoStream: A própria ingestão (para encadear com o coletor)
+        """
+        if self.ativa:
+            return self
+
+        self._parar.clear()
+        self._workers = [
+            threading.Thread(target=self._trabalhar, name=f"ingestao-stream-{i}", daemon=True)
+            for i in range(self.num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"Ingestão iniciada com {self.num_workers} workers")
+        return self
+
+    @property
+    def ativa(self) -> bool:
+        """Se há workers em execução"""
+        return any(worker.is_alive() for worker in self._workers)
+
+    def parar(self, aguardar: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Encerra a ingestão; os workers drenam o que já está na fila antes de sair
+
+        Args:
+            aguardar (bool): Se deve esperar os workers terminarem
+            timeout (float, optional): Espera máxima total, em segundos
+
+        Returns:
+            bool: True se os workers terminaram (sempre False sem aguardar)
+        """
+        self._parar.set()
+        if not aguardar:
+            return False
+
+        limite = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(None if limite is None else max(0.0, limite - time.monotonic()))
+        terminou = not self.ativa
+        logger.info(f"Ingestão {'encerrada' if terminou else 'ainda drenando a fila'}: "
+                    f"{self.obter_metricas()['contadores']}")
+        return terminou
+
+    def oferecer(self, mensagem: Dict) -> bool:
+        """
+        Enfileira uma mensagem aplicando a política de fila cheia
+
+        Args:
+            mensagem (Dict): Mensagem coletada (com 'texto')
+
+        Returns:
+            bool: True se a mensagem entrou na fila
+        """
+        self._contar('recebidas')
+        item = (mensagem, time.monotonic())
+
+        if self.politica_fila_cheia == 'bloquear':
+            try:
+                # A espera aqui é a contrapressão: o stream deixa de ler a conexão
+                self.fila.put(item, timeout=self.timeout_bloqueio_s)
+                return True
+            except queue.Full:
+                self._contar('descartadas')
+                return False
+
+        if self.politica_fila_cheia == 'descartar_novas':
+            try:
+                self.fila.put_nowait(item)
+                return True
+            except queue.Full:
+                self._contar('descartadas')
+                return False
+
+        # 'descartar_antigas'
+        while True:
+            try:
+                self.fila.put_nowait(item)
+                return True
+            except queue.Full:
+                try:
+                    self.fila.get_nowait()
+                    self._contar('descartadas')
+                except queue.Empty:
+                    pass
+
+    def __call__(self, mensagem: Dict):
+        """Assinatura de callback do coletor (ver ColetorTwitter.iniciar_stream)"""
+        self.oferecer(mensagem)
+
+    def _retirar_lote(self) -> List[tuple]:
+        """Retira até tamanho_lote itens, esperando no máximo intervalo_flush_s pelo lote"""
+        try:
+            lote = [self.fila.get(timeout=self.intervalo_flush_s)]
+        except queue.Empty:
+            return []
+
+        limite = time.monotonic() + self.intervalo_flush_s
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self.fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _trabalhar(self):
+        """Laço de um worker: micro-lote → NLP → persistência, até parar com a fila vazia"""
+        while not (self._parar.is_set() and self.fila.empty()):
+            lote = self._retirar_lote()
+            if not lote:
+                continue
+
+            mensagens = [mensagem for mensagem, _ in lote]
+            chegadas = [chegada for _, chegada in lote]
+            inicio = time.monotonic()
+            self._registrar_atrasos('fila', [inicio - chegada for chegada in chegadas])
+
+            try:
+                resultados = self.processar_lote(mensagens)
+            except Exception as e:
+                # Sem análise, mas não perdidas: persistidas com a marca 'erro_nlp'
+                # para serem reprocessadas depois
+                logger.error(f"Erro no NLP de um micro-lote de {len(lote)} mensagens "
+                             f"(persistidas sem análise): {e}")
+                self._contar('erros_nlp', len(lote))
+                resultados = [{**mensagem, 'erro_nlp': str(e)} for mensagem in mensagens]
+            fim_nlp = time.monotonic()
+
+            try:
+                if self.persistir is not None:
+                    self.persistir(resultados)
+            except Exception as e:
+                logger.error(f"Erro ao persistir micro-lote de {len(lote)} mensagens: {e}")
+                self._contar('erros_persistencia', len(lote))
+                continue
+            fim = time.monotonic()
+
+            self._registrar_atrasos('nlp', [fim_nlp - inicio])
+            self._registrar_atrasos('persistencia', [fim - fim_nlp])
+            self._registrar_atrasos('total', [fim - chegada for chegada in chegadas])
+            self._contar('processadas', len(lote))
+            self._contar('lotes')
+
+    def _atraso_fila(self) -> float:
+        """Idade, em segundos, da mensagem mais antiga na fila"""
+        with self.fila.mutex:
+            if not self.fila.queue:
+                return 0.0
+            return time.monotonic() - self.fila.queue[0][1]
+
+    def _analisar_nlp(self, mensagens: List[Dict]) -> List[Dict]:
+        """
+        Estágio de NLP padrão: PipelineNLP com a fidelidade escolhida pela fila do stream
+
+        A PoliticaDegradacao desta ingestão recebe a profundidade e o atraso
+        medidos nesta fila, e cada mensagem é analisada na fidelidade da sua
+        classe de prioridade.
+        """
+        from registro_modelos import obter_registro
+
+        pipeline = obter_registro().obter('pipeline')
+        with self._lock:
+            if self.politica is None:
+                self.politica = pipeline.criar_politica_degradacao()
+        textos = [mensagem.get('texto') if isinstance(mensagem.get('texto'), str) else ''
+                  for mensagem in mensagens]
+        classes = pre_pontuar(textos, [mensagem.get('fonte') for mensagem in mensagens])['classe_prioridade']
+        self.politica.atualizar(self.fila.qsize(), self._atraso_fila())
+
+        por_fidelidade: Dict[str, List[int]] = {}
+        for i, classe in enumerate(classes):
+            por_fidelidade.setdefault(self.politica.fidelidade_para(classe), []).append(i)
+
+        resultados: List[Optional[Dict]] = [None] * len(mensagens)
+        for fidelidade, indices in por_fidelidade.items():
+            for i, analise in zip(indices, pipeline.processar([textos[i] for i in indices], fidelidade)):
+                resultados[i] = {**mensagens[i], **analise, 'classe_prioridade': classes[i]}
+        return resultados
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """
+        Retorna profundidade da fila, contadores e atraso por estágio
+
+        Returns:
+            Dict: 'fila' (profundidade, capacidade, atraso_s da mais antiga),
+                'contadores' (recebidas, descartadas, processadas, lotes,
+                erros_nlp, que foram persistidas sem análise, e erros_persistencia) e
+                'atrasos' (por estágio de ESTAGIOS: media_ms, p95_ms e max_ms sobre
+                as últimas JANELA_ATRASOS medições; nlp e persistencia são por lote)
+                e 'degradacao' (fidelidade em vigor e transições, com o estágio padrão)
+        """
+        with self._lock:
+            contadores = dict(self._contadores)
+            atrasos = {}
+            for estagio, medicoes in self._atrasos.items():
+                valores = np.array(medicoes)
+                atrasos[estagio] = {
+                    'media_ms': float(valores.mean()) if len(valores) else 0.0,
+                    'p95_ms': float(np.percentile(valores, 95)) if len(valores) else 0.0,
+                    'max_ms': float(valores.max()) if len(valores) else 0.0
+                }
+
+        return {
+            'fila': {'profundidade': self.fila.qsize(), 'capacidade': self.fila.maxsize,
+                     'atraso_s': self._atraso_fila()},
+            'contadores': contadores,
+            'atrasos': atrasos,
+            'degradacao': {'fidelidade': self.politica.fidelidade,
+                           'transicoes': list(self.politica.transicoes)} if self.politica else None
+        }
+
+
+if __name__ == "__main__":
+    # Teste do módulo: persistência lenta com fila pequena descartando as antigas
+    logging.basicConfig(level=logging.INFO)
+
+    def persistir_lento(lote):
+        time.sleep(0.05)
+
+    ingestao = IngestaoStream(persistir=persistir_lento, processar_lote=lambda lote: lote,
+                              tamanho_fila=100, tamanho_lote=16, intervalo_flush_s=0.2,
+                              politica_fila_cheia='descartar_antigas').iniciar()
+
+    inicio = time.monotonic()
+    for i in range(1000):
+        ingestao({'id': i, 'texto': f"Alagamento na rua {i}", 'fonte': 'twitter_stream'})
+    print(f"Stream enfileirou 1000 mensagens em {time.monotonic() - inicio:.3f}s")
+
+    ingestao.parar()
+    print(ingestao.obter_metricas())
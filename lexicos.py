@@ -0,0 +1,42 @@
+"""
+Utilitários de Léxicos
+Compilação de listas de palavras em padrões regex de varredura única
+"""
+
+import re
+from typing import Dict, Iterable
+
+
+def padrao_trie(palavras: Iterable[str]) -> str:
+    """
+    Monta uma alternação regex fatorada por prefixos comuns
+    
+    Com as alternativas organizadas em trie, o regex testa cada posição do texto
+    em poucos passos, independente do tamanho do léxico. Em cada nó as
+    continuações mais longas vêm antes do fim de palavra, de modo que numa mesma
+    posição o padrão casa a maior palavra.
+    
+    Args:
+        palavras (Iterable[str]): Palavras do léxico
+        
+    Returns:
+        str: Padrão regex sem grupo externo ('' para léxico vazio)
+    """
+    trie = {}
+    for palavra in palavras:
+        no = trie
+        for caractere in palavra:
+            no = no.setdefault(caractere, {})
+        no[''] = {}
+    
+    def montar(no: Dict) -> str:
+        ramos = [re.escape(c) + montar(filho) for c, filho in sorted(no.items()) if c]
+        fim = '' in no
+        if not ramos:
+            return ''
+        if len(ramos) == 1 and not fim:
+            return ramos[0]
+        corpo = '(?:' + '|'.join(ramos) + ')'
+        return corpo + '?' if fim else corpo
+    
+    return montar(trie)
@@ -0,0 +1,270 @@
+"""
+Limitador de Taxa das APIs
+Balde de fichas compartilhado por todas as sessões e processos (estado em SQLite),
+sincronizado com os cabeçalhos x-rate-limit-* das respostas, para que várias
+coletas simultâneas respeitem uma única cota sem erros 429 nem esperas fixas
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger("monitor_emergencias.limitador_taxa")
+
+# Cota padrão da busca recente do Twitter: 450 requisições por janela de 15 minutos
+CAPACIDADE_PADRAO = 450
+JANELA_PADRAO_S = 15 * 60
+
+
+class LimitadorTaxa:
+    """Balde de fichas por recurso (endpoint), com estado entre processos em SQLite"""
+
+    def __init__(self, caminho_banco: str = 'data/cache/limites_api.sqlite',
+                 capacidade: int = CAPACIDADE_PADRAO, janela_s: float = JANELA_PADRAO_S):
+        """
+        Inicializa o limitador
+
+        Args:
+            caminho_banco (str): Arquivo SQLite com o estado dos baldes
+            capacidade (int): Fichas de um balde novo (até a API informar o limite)
+            janela_s (float): Janela em que a capacidade é reposta, em segundos
+        """
+        self.caminho_banco = caminho_banco
+        self.capacidade = capacidade
+        self.janela_s = janela_s
+
+        diretorio = os.path.dirname(self.caminho_banco)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS baldes ("
+                " nome TEXT PRIMARY KEY, fichas REAL, capacidade REAL, janela_s REAL,"
+                " atualizado_em REAL, reset_em REAL)"
+            )
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre uma conexão (uma por operação, segura entre threads e processos)"""
+        conexao = sqlite3.connect(self.caminho_banco, timeout=30, isolation_level=None)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return conexao
+
+    def _ler_balde(self, conexao: sqlite3.Connection, nome: str, agora: float) -> Dict:
+        """Lê o balde (criando-o cheio) e aplica a reposição até agora"""
+        linha = conexao.execute(
+            "SELECT fichas, capacidade, janela_s, atualizado_em, reset_em FROM baldes WHERE nome = ?",
+            (nome,)
+        ).fetchone()
+        if linha is None:
+            return {'fichas': float(self.capacidade), 'capacidade': float(self.capacidade),
+                    'janela_s': float(self.janela_s), 'atualizado_em': agora, 'reset_em': None}
+
+        balde = dict(zip(('fichas', 'capacidade', 'janela_s', 'atualizado_em', 'reset_em'), linha))
+        if balde['reset_em'] is not None:
+            # Cota informada pela API: nada é reposto antes do reset, e no reset
+            # a janela recomeça cheia
+            if agora >= balde['reset_em']:
+                balde['fichas'] = balde['capacidade']
+                balde['reset_em'] = None
+        else:
+            # Sem informação da API: reposição contínua de capacidade por janela
+            taxa = balde['capacidade'] / balde['janela_s']
+            balde['fichas'] = min(balde['capacidade'],
+                                  balde['fichas'] + (agora - balde['atualizado_em']) * taxa)
+        balde['atualizado_em'] = agora
+        return balde
+
+    @staticmethod
+    def _gravar_balde(conexao: sqlite3.Connection, nome: str, balde: Dict):
+        """Grava o estado do balde"""
+        conexao.execute(
+            "INSERT OR REPLACE INTO baldes VALUES (?, ?, ?, ?, ?, ?)",
+            (nome, balde['fichas'], balde['capacidade'], balde['janela_s'],
+             balde['atualizado_em'], balde['reset_em'])
+        )
+
+    def _espera_necessaria(self, balde: Dict, fichas: float, agora: float) -> float:
+        """Tempo até o balde ter as fichas pedidas"""
+        if balde['reset_em'] is not None:
+            return max(0.0, balde['reset_em'] - agora)
+        taxa = balde['capacidade'] / balde['janela_s']
+        return (fichas - balde['fichas']) / taxa
+
+    def tentar_adquirir(self, nome: str, fichas: float = 1) -> float:
+        """
+        Consome fichas se houver saldo, sem esperar
+
+        Args:
+            nome (str): Recurso (ex.: endpoint da API)
+            fichas (float): Fichas a consumir
+
+        Returns:
+            float: 0.0 se as fichas foram consumidas; senão, os segundos até haver saldo
+        """
+        with closing(self._conectar()) as conexao:
+            # BEGIN IMMEDIATE trava a escrita: nenhum outro processo lê o mesmo
+            # saldo entre a leitura e o consumo
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                agora = time.time()
+                balde = self._ler_balde(conexao, nome, agora)
+                if balde['fichas'] >= fichas:
+                    balde['fichas'] -= fichas
+                    espera = 0.0
+                else:
+                    espera = self._espera_necessaria(balde, fichas, agora)
+                self._gravar_balde(conexao, nome, balde)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+        return espera
+
+    def adquirir(self, nome: str, fichas: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Consome fichas, esperando exatamente o necessário até haver saldo
+
+        Args:
+            nome (str): Recurso (ex.: endpoint da API)
+            fichas (float): Fichas a consumir
+            timeout (float, optional): Espera máxima em segundos (None espera o necessário)
+
+        Returns:
+            bool: True se as fichas foram consumidas, False se o timeout venceu antes
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            espera = self.tentar_adquirir(nome, fichas)
+            if espera <= 0:
+                return True
+
+            if limite is not None and time.monotonic() + espera > limite:
+                return False
+            logger.info(f"Cota de '{nome}' esgotada: aguardando {espera:.1f}s")
+            # Reavalia depois da espera: outro processo pode ter consumido ou a
+            # API pode ter informado um novo saldo
+            time.sleep(espera)
+
+    def atualizar_por_cabecalhos(self, nome: str, cabecalhos: Mapping[str, str]) -> bool:
+        """
+        Sincroniza o balde com os cabeçalhos de limite da resposta da API
+
+        Usa x-rate-limit-limit (capacidade), x-rate-limit-remaining (saldo) e
+        x-rate-limit-reset (momento, em segundos Unix, em que a janela recomeça).
+
+        Args:
+            nome (str): Recurso a que a resposta se refere
+            cabecalhos (Mapping[str, str]): Cabeçalhos HTTP da resposta
+
+        Returns:
+            bool: True se os cabeçalhos de limite estavam presentes
+        """
+        cabecalhos = {chave.lower(): valor for chave, valor in cabecalhos.items()}
+        try:
+            restantes = float(cabecalhos['x-rate-limit-remaining'])
+            reset_em = float(cabecalhos['x-rate-limit-reset'])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        with closing(self._conectar()) as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                agora = time.time()
+                balde = self._ler_balde(conexao, nome, agora)
+                if 'x-rate-limit-limit' in cabecalhos:
+                    balde['capacidade'] = float(cabecalhos['x-rate-limit-limit'])
+                # Respostas simultâneas chegam fora de ordem: numa mesma janela,
+                # o menor saldo é o mais recente
+                if balde['reset_em'] == reset_em:
+                    restantes = min(restantes, balde['fichas'])
+                balde['fichas'] = restantes
+                balde['reset_em'] = reset_em if reset_em > agora else None
+                self._gravar_balde(conexao, nome, balde)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+        return True
+
+    def registrar_limite_excedido(self, nome: str, reset_em: Optional[float] = None):
+        """
+        Zera o balde após uma resposta 429
+
+        Args:
+            nome (str): Recurso que respondeu 429
+            reset_em (float, optional): Fim da janela (segundos Unix); uma janela
+                inteira a partir de agora se omitido
+        """
+        with closing(self._conectar()) as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                agora = time.time()
+                balde = self._ler_balde(conexao, nome, agora)
+                balde['fichas'] = 0.0
+                balde['reset_em'] = reset_em or agora + balde['janela_s']
+                self._gravar_balde(conexao, nome, balde)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+
+    def estado(self, nome: str) -> Dict:
+        """
+        Retorna o saldo atual de um balde (sem consumir)
+
+        Args:
+            nome (str): Recurso
+
+        Returns:
+            Dict: 'fichas', 'capacidade', 'reset_em' (None sem informação da API)
+                e 'espera_s' (até haver uma ficha)
+        """
+        with closing(self._conectar()) as conexao:
+            agora = time.time()
+            balde = self._ler_balde(conexao, nome, agora)
+        return {
+            'fichas': balde['fichas'],
+            'capacidade': balde['capacidade'],
+            'reset_em': balde['reset_em'],
+            'espera_s': 0.0 if balde['fichas'] >= 1 else self._espera_necessaria(balde, 1, agora)
+        }
+
+
+_limitador_global: Optional[LimitadorTaxa] = None
+_lock_global = threading.Lock()
+
+
+def obter_limitador_taxa() -> LimitadorTaxa:
+    """
+    Retorna o limitador do processo, criando-o na primeira chamada
+
+    Returns:
+        LimitadorTaxa: Limitador cujo estado é compartilhado com os demais processos
+    """
+    global _limitador_global
+    if _limitador_global is None:
+        with _lock_global:
+            if _limitador_global is None:
+                _limitador_global = LimitadorTaxa()
+    return _limitador_global
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    limitador = LimitadorTaxa('/tmp/limites_api_teste.sqlite', capacidade=3, janela_s=3)
+    inicio = time.time()
+    for i in range(5):
+        limitador.adquirir('teste')
+        print(f"Requisição {i + 1} liberada em {time.time() - inicio:.2f}s")
+
+    limitador.atualizar_por_cabecalhos('teste', {
+        'x-rate-limit-limit': '450', 'x-rate-limit-remaining': '0',
+        'x-rate-limit-reset': str(int(time.time()) + 2)
+    })
+    print(f"Após cabeçalhos: {limitador.estado('teste')}")
+    limitador.adquirir('teste')
+    print(f"Liberada após o reset em {time.time() - inicio:.2f}s: {limitador.estado('teste')}")
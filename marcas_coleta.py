@@ -0,0 +1,138 @@
+"""
+Marcas d'Água de Coleta
+Guarda, por query, o tweet mais recente já coletado (since_id e data), para que
+cada nova busca peça à API só o que é mais novo que a última coleta, e as
+lacunas deixadas por coletas interrompidas (faixas de IDs ainda não buscadas),
+para que sejam completadas nas coletas seguintes
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class MarcasColeta:
+    """Marcas d'água por query persistidas em JSON (sobrevivem a reinícios)"""
+
+    def __init__(self, caminho_arquivo: str = 'data/marcas_coleta.json'):
+        """
+        Inicializa o armazenamento, carregando as marcas existentes
+
+        Args:
+            caminho_arquivo (str): Arquivo JSON das marcas
+        """
+        self.caminho_arquivo = caminho_arquivo
+        self._lock = threading.Lock()
+        self._marcas: Dict[str, Dict] = {}
+
+        if os.path.exists(self.caminho_arquivo):
+            try:
+                with open(self.caminho_arquivo, 'r', encoding='utf-8') as f:
+                    self._marcas = json.load(f)
+            except Exception as e:
+                print(f"Erro ao carregar marcas de coleta: {e}")
+
+    @staticmethod
+    def calcular_chave(query: str) -> str:
+        """Identificador estável de uma query"""
+        return hashlib.sha256(query.encode('utf-8')).hexdigest()[:16]
+
+    def _salvar(self):
+        """Grava as marcas atomicamente (arquivo temporário + substituição)"""
+        diretorio = os.path.dirname(self.caminho_arquivo)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        temporario = f"{self.caminho_arquivo}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._marcas, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho_arquivo)
+
+    def obter(self, query: str) -> Optional[Dict]:
+        """
+        Retorna a marca d'água de uma query
+
+        Args:
+            query (str): Query de busca
+
+        Returns:
+            Optional[Dict]: 'since_id', 'data_tweet', 'lacunas', 'atualizado_em' e
+                os totais 'requisicoes' e 'novos'; None se a query nunca foi coletada
+        """
+        with self._lock:
+            marca = self._marcas.get(self.calcular_chave(query))
+            if not marca:
+                return None
+            return {**marca, 'lacunas': [dict(lacuna) for lacuna in marca.get('lacunas', [])]}
+
+    def registrar_coleta(self, query: str, novos: int, requisicoes: int,
+                         since_id: Optional[str] = None, data_tweet: Optional[str] = None,
+                         lacunas: Optional[List[Dict]] = None):
+        """
+        Registra uma coleta, avançando a marca se houver tweet mais novo
+
+        Args:
+            query (str): Query de busca
+            novos (int): Tweets novos recebidos
+            requisicoes (int): Requisições feitas à API
+            since_id (str, optional): ID do tweet mais novo recebido
+            data_tweet (str, optional): Data (ISO) desse tweet
+            lacunas (List[Dict], optional): Faixas ainda não buscadas, cada uma com
+                'since_id' e 'data_since' (limite inferior; None para o início da
+                janela) e 'until_id' e 'data_until' (tweet mais antigo já recebido
+                acima da faixa); substituem as registradas
+        """
+        with self._lock:
+            marca = self._marcas.setdefault(self.calcular_chave(query), {
+                'query': query, 'since_id': None, 'data_tweet': None,
+                'requisicoes': 0, 'novos': 0
+            })
+            if since_id and (marca['since_id'] is None or int(since_id) > int(marca['since_id'])):
+                marca['since_id'] = str(since_id)
+                marca['data_tweet'] = data_tweet
+            if lacunas is not None:
+                marca['lacunas'] = [dict(lacuna) for lacuna in lacunas]
+            marca['requisicoes'] += requisicoes
+            marca['novos'] += novos
+            marca['atualizado_em'] = datetime.now().isoformat()
+
+            try:
+                self._salvar()
+            except Exception as e:
+                print(f"Erro ao salvar marcas de coleta: {e}")
+
+    def resetar(self, query: Optional[str] = None):
+        """
+        Descarta marcas d'água para refazer a coleta completa (backfill)
+
+        Args:
+            query (str, optional): Query a resetar; todas se omitida
+        """
+        with self._lock:
+            if query is None:
+                self._marcas.clear()
+            else:
+                self._marcas.pop(self.calcular_chave(query), None)
+
+            try:
+                self._salvar()
+            except Exception as e:
+                print(f"Erro ao salvar marcas de coleta: {e}")
+
+    def listar(self) -> Dict[str, Dict]:
+        """Retorna todas as marcas, por query"""
+        with self._lock:
+            return {marca['query']: dict(marca) for marca in self._marcas.values()}
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    marcas = MarcasColeta('/tmp/marcas_coleta_teste.json')
+    marcas.registrar_coleta('"enchente" lang:pt', novos=12, requisicoes=2,
+                            since_id='1790000000000000000', data_tweet=datetime.now().isoformat())
+    print(MarcasColeta('/tmp/marcas_coleta_teste.json').obter('"enchente" lang:pt'))
+    marcas.resetar()
+    print(marcas.listar())
@@ -0,0 +1,150 @@
+"""
+Normalização de Texto
+Padrões pré-compilados e perfis de normalização compartilhados por sentimento,
+classificação e nuvem de palavras, com cache por conteúdo da mensagem
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+# Padrões compilados uma única vez por processo
+_PADRAO_URLS = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+_PADRAO_MENCOES = re.compile(r'@\w+|#\w+')
+_PADRAO_TELEFONES = re.compile(r'\b\d{2,5}[-\s]?\d{4,5}[-\s]?\d{4}\b')
+# Letras acentuadas já são \w em Python 3, então o padrão também as mantém
+_PADRAO_ESPECIAIS = re.compile(r'[^\w\s]')
+_PADRAO_ESPACOS = re.compile(r'\s+')
+_PADRAO_RETWEET = re.compile(r'^\s*rt\s+@\w+:?\s*', flags=re.IGNORECASE)
+
+# Passos de normalização, aplicados na ordem definida por cada perfil
+PASSOS_NORMALIZACAO: Dict[str, Callable[[str], str]] = {
+    'minusculas': str.lower,
+    'retweet': lambda texto: _PADRAO_RETWEET.sub('', texto),
+    'urls': lambda texto: _PADRAO_URLS.sub('', texto),
+    'mencoes': lambda texto: _PADRAO_MENCOES.sub('', texto),
+    'telefones': lambda texto: _PADRAO_TELEFONES.sub('', texto),
+    'especiais': lambda texto: _PADRAO_ESPECIAIS.sub(' ', texto),
+    'espacos': lambda texto: _PADRAO_ESPACOS.sub(' ', texto).strip()
+}
+
+# Perfis nomeados (a ordem dos passos reproduz o preprocessamento original de cada módulo)
+PERFIS_NORMALIZACAO: Dict[str, Tuple[str, ...]] = {
+    'sentimento': ('urls', 'mencoes', 'especiais', 'espacos', 'minusculas'),
+    'classificacao': ('minusculas', 'urls', 'mencoes', 'telefones', 'especiais', 'espacos'),
+    'tokens': ('urls', 'mencoes', 'telefones', 'especiais', 'minusculas', 'espacos'),
+    # Identidade de conteúdo: cópias e retweets da mesma mensagem (que diferem
+    # só no prefixo "RT @usuario:", nos links encurtados, em caixa ou espaços)
+    # normalizam para o mesmo texto
+    'chave': ('retweet', 'urls', 'minusculas', 'espacos')
+}
+
+# Versão dos padrões, passos e perfis acima: incrementar a cada mudança que
+# altere o texto normalizado, para invalidar os resultados já persistidos
+# (entra na chave do cache de resultados e na versão dos modelos)
+VERSAO_NORMALIZACAO = 1
+
+# Máximo de textos distintos memorizados por perfil
+TAMANHO_CACHE = 100000
+
+
+@lru_cache(maxsize=TAMANHO_CACHE * len(PERFIS_NORMALIZACAO))
+def _normalizar_em_cache(texto: str, perfil: str) -> str:
+    """Aplica os passos do perfil (memorizado por conteúdo do texto e perfil)"""
+    for passo in PERFIS_NORMALIZACAO[perfil]:
+        texto = PASSOS_NORMALIZACAO[passo](texto)
+    return texto
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _tokenizar_em_cache(texto: str) -> Tuple[str, ...]:
+    """Divide o texto normalizado pelo perfil 'tokens' (memorizado por conteúdo)"""
+    return tuple(_normalizar_em_cache(texto, 'tokens').split())
+
+
+def normalizar(texto: str, perfil: str = 'sentimento') -> str:
+    """
+    Normaliza um texto segundo um perfil nomeado
+
+    O resultado é memorizado pelo conteúdo do texto: a mesma mensagem que passa
+    pelo sentimento, pelo classificador e pelos relatórios é normalizada uma
+    única vez por perfil.
+
+    Args:
+        texto (str): Texto original
+        perfil (str): 'sentimento', 'classificacao', 'tokens' ou 'chave'
+
+    Returns:
+        str: Texto normalizado
+    """
+    if perfil not in PERFIS_NORMALIZACAO:
+        raise ValueError(f"Perfil de normalização desconhecido: {perfil}. "
+                         f"Use um de {list(PERFIS_NORMALIZACAO)}")
+    return _normalizar_em_cache(texto, perfil)
+
+
+def normalizar_lote(textos: List[str], perfil: str = 'sentimento') -> List[str]:
+    """
+    Normaliza uma lista de textos segundo um perfil nomeado
+
+    Args:
+        textos (List[str]): Textos originais
+        perfil (str): 'sentimento', 'classificacao', 'tokens' ou 'chave'
+
+    Returns:
+        List[str]: Textos normalizados, na mesma ordem
+    """
+    return [normalizar(texto, perfil) for texto in textos]
+
+
+def tokenizar(texto: str) -> Tuple[str, ...]:
+    """
+    Retorna os tokens do texto normalizado pelo perfil 'tokens'
+
+    Args:
+        texto (str): Texto original
+
+    Returns:
+        Tuple[str, ...]: Tokens (tupla compartilhada entre chamadas; não modificar)
+    """
+    return _tokenizar_em_cache(texto)
+
+
+def estatisticas_cache() -> Dict[str, Dict[str, int]]:
+    """
+    Retorna acertos, falhas e ocupação dos caches de normalização
+
+    Returns:
+        Dict[str, Dict[str, int]]: Estatísticas por cache ('textos' e 'tokens')
+    """
+    estatisticas = {}
+    for nome, funcao in (('textos', _normalizar_em_cache), ('tokens', _tokenizar_em_cache)):
+        info = funcao.cache_info()
+        estatisticas[nome] = {
+            'acertos': info.hits,
+            'falhas': info.misses,
+            'tamanho': info.currsize,
+            'capacidade': info.maxsize
+        }
+    return estatisticas
+
+
+def limpar_cache():
+    """Descarta os textos e tokens memorizados"""
+    _normalizar_em_cache.cache_clear()
+    _tokenizar_em_cache.cache_clear()
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    mensagem = "SOCORRO!!! Enchente na Rua 7, ligue 11 99999-9999 @defesacivil #enchente http://t.co/x"
+
+    print("=== Teste da Normalização ===")
+    for perfil in PERFIS_NORMALIZACAO:
+        print(f"{perfil}: {normalizar(mensagem, perfil)}")
+    print(f"tokens: {tokenizar(mensagem)}")
+
+    # Segunda passada vem do cache
+    for perfil in PERFIS_NORMALIZACAO:
+        normalizar(mensagem, perfil)
+    print(f"\nCache: {estatisticas_cache()}")
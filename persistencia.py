@@ -10,6 +10,8 @@ import pandas as pd
 from datetime import datetime
 import logging
 
+from estatisticas_incrementais import AcumuladorEstatisticas
+
 logger = logging.getLogger("monitor_emergencias.persistencia")
 
 class GerenciadorPersistencia:
@@ -31,13 +33,15 @@ class GerenciadorPersistencia:
         if not os.path.exists(self.diretorio_cache):
             os.makedirs(self.diretorio_cache, exist_ok=True)
 
-    def salvar_dados(self, df, metadata=None):
+    def salvar_dados(self, df, metadata=None, estatisticas=None):
         """
         Salva os dados em cache (JSON e Pickle)
 
         Args:
             df (pd.DataFrame): DataFrame com os dados a serem salvos
             metadata (dict, optional): Metadados adicionais
+            estatisticas (dict, optional): Nome -> AcumuladorEstatisticas, gravados
+                nos metadados (chave 'estatisticas') junto com os dados
 
         Returns:
             bool: True se salvou com sucesso, False caso contrário
@@ -46,6 +50,12 @@ class GerenciadorPersistencia:
             logger.warning("Tentativa de salvar DataFrame vazio ou None")
             return False
 
+        if estatisticas:
+            metadata = {
+                **(metadata or {}),
+                'estatisticas': {nome: acumulador.para_dict() for nome, acumulador in estatisticas.items()}
+            }
+
         try:
             # Salva em formato JSON (para interoperabilidade)
             self._salvar_json(df, metadata)
@@ -162,6 +172,20 @@ class GerenciadorPersistencia:
 
         return pd.DataFrame(), {}
 
+    @staticmethod
+    def extrair_estatisticas(metadata):
+        """
+        Reconstrói os acumuladores de estatísticas gravados por salvar_dados
+
+        Args:
+            metadata (dict): Metadados retornados por carregar_dados
+
+        Returns:
+            dict: Nome -> AcumuladorEstatisticas (vazio se não houver estatísticas)
+        """
+        estatisticas = (metadata or {}).get('estatisticas', {})
+        return {nome: AcumuladorEstatisticas.de_dict(dados) for nome, dados in estatisticas.items()}
+
     def verificar_atualizacao(self):
         """
         Verifica quando foi a última atualização
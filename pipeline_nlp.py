@@ -0,0 +1,595 @@
+"""
+Pipeline de NLP
+Executa sentimento, urgência, classificação e entidades sobre lotes de mensagens
+com os modelos compartilhados do registro e o cache de resultados. No modo cascata,
+uma triagem barata (léxicos e palavras-chave) resolve as mensagens claras e só as
+ambíguas ou urgentes seguem para os modelos completos; em processar_priorizado
+as mensagens críticas são analisadas antes das demais e, com uma PoliticaDegradacao
+alimentada por uma fila real (ver ingestao_stream), as demais descem de nível de
+fidelidade até o atraso ser recuperado
+"""
+
+import time
+import logging
+import importlib
+import threading
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from registro_modelos import obter_registro
+from cache_resultados import obter_cache_resultados
+from config_manager import carregar_config_nlp, CONFIG_NLP_PADRAO
+from escalonador_nlp import EscalonadorNLP, CLASSES_PRIORIDADE, JANELA_ESPERAS
+from estatisticas_incrementais import AcumuladorEstatisticas
+
+logger = logging.getLogger("monitor_emergencias.pipeline_nlp")
+
+# Parâmetros padrão da cascata (sobrescritos pela chave 'cascata' de config/nlp.json)
+CONFIG_CASCATA_PADRAO = CONFIG_NLP_PADRAO['cascata']
+
+ESTAGIOS_CASCATA = ('triagem', 'completo')
+
+# Níveis de fidelidade, do mais completo ao mais barato: sem datas e horários,
+# spaCy só com NER, entidades só por regex e, por fim, classificação e
+# sentimento só por palavras-chave e léxico
+NIVEIS_FIDELIDADE = ('completo', 'sem_temporal', 'ner', 'regex', 'palavras_chave')
+
+# Perfis do extrator de entidades, do mais caro ao mais barato
+_PERFIS_EXTRATOR = ('completo', 'ner', 'regex')
+
+# Estatísticas acumuladas dos resultados: por nome, o módulo e a classe do
+# modelo que as calcula, os métodos estáticos de acumulação e de leitura e as
+# colunas do resultado que ele lê (coluna do resultado -> coluna esperada pelo
+# método; as listas ausentes viram listas vazias). Nenhum modelo é carregado
+ESTATISTICAS_RESULTADOS = {
+    'sentimento': ('analise_sentimento', 'AnalisadorSentimento',
+                   'acumular_estatisticas', 'obter_estatisticas',
+                   {'sentimento': 'sentimento', 'nivel_urgencia': 'nivel_urgencia',
+                    'score_sentimento': 'score_composto', 'score_urgencia': 'score_urgencia'},
+                   ('palavras_urgencia',)),
+    'classificacao': ('classificador_tipo', 'ClassificadorDesastre',
+                      'acumular_estatisticas_classificacao', 'obter_estatisticas_classificacao',
+                      {'tipo_desastre': 'tipo_predito', 'confianca_classificacao': 'confianca'},
+                      ()),
+    'entidades': ('extrator_entidades', 'ExtratorEntidades',
+                  'acumular_estatisticas_entidades', 'obter_estatisticas_entidades',
+                  {'score_completude': 'score_completude'},
+                  ('telefones', 'localizacoes', 'pessoas', 'situacoes_criticas'))
+}
+
+
+def _metodo_estatisticas(modulo: str, classe: str, metodo: str) -> Callable:
+    """Método estático de estatísticas de uma classe de modelo (importada sob demanda)"""
+    return getattr(getattr(importlib.import_module(modulo), classe), metodo)
+
+
+def acumular_estatisticas(df_resultados: pd.DataFrame,
+                          acumuladores: Optional[Dict[str, AcumuladorEstatisticas]] = None
+                          ) -> Dict[str, AcumuladorEstatisticas]:
+    """
+    Atualiza as estatísticas acumuladas (ver ESTATISTICAS_RESULTADOS) com resultados novos
+
+    Cada acumulador só recebe os resultados que têm as colunas que ele lê
+    (dados antigos ou simulados podem não ter todas).
+
+    Args:
+        df_resultados (pd.DataFrame): Mensagens novas já analisadas (ver PipelineNLP.processar)
+        acumuladores (Dict, optional): Nome -> AcumuladorEstatisticas a atualizar;
+            os que faltarem são criados
+
+    Returns:
+        Dict[str, AcumuladorEstatisticas]: Acumuladores atualizados
+    """
+    acumuladores = {} if acumuladores is None else acumuladores
+    for nome, (modulo, classe, metodo, _, colunas, colunas_lista) in ESTATISTICAS_RESULTADOS.items():
+        acumulador = acumuladores.setdefault(nome, AcumuladorEstatisticas())
+        if df_resultados.empty or not set(colunas) <= set(df_resultados.columns):
+            continue
+
+        df = df_resultados[list(colunas)].rename(columns=colunas).dropna()
+        for coluna in colunas_lista:
+            valores = (df_resultados[coluna].loc[df.index] if coluna in df_resultados.columns
+                       else pd.Series([None] * len(df), index=df.index))
+            df[coluna] = [valor if isinstance(valor, list) else [] for valor in valores]
+        _metodo_estatisticas(modulo, classe, metodo)(df, acumulador)
+
+    return acumuladores
+
+
+def ler_estatisticas(acumuladores: Dict[str, AcumuladorEstatisticas]) -> Dict[str, Dict]:
+    """
+    Lê as estatísticas acumuladas em O(1), no formato dos métodos de cada modelo
+
+    Args:
+        acumuladores (Dict): Nome -> AcumuladorEstatisticas (ver acumular_estatisticas)
+
+    Returns:
+        Dict[str, Dict]: Por nome de ESTATISTICAS_RESULTADOS, as estatísticas
+            (vazias se ainda não houver mensagens)
+    """
+    return {nome: _metodo_estatisticas(modulo, classe, metodo)(acumulador=acumuladores[nome])
+            if nome in acumuladores else {}
+            for nome, (modulo, classe, _, metodo, _, _) in ESTATISTICAS_RESULTADOS.items()}
+
+
+class PoliticaDegradacao:
+    """
+    Escolhe o nível de fidelidade pela profundidade da fila e pelo atraso
+
+    Cada fila contínua (ex.: IngestaoStream) tem a sua política, atualizada com
+    a profundidade e o atraso medidos nela; chamadas síncronas não degradam.
+    """
+
+    def __init__(self, ativa: bool = False, limites_profundidade: Iterable[int] = (500, 1000, 2000, 4000),
+                 limites_atraso_s: Iterable[float] = (10, 30, 60, 120), histerese: float = 0.5,
+                 classes_protegidas: Iterable[str] = ('crítica',)):
+        """
+        Inicializa a política no nível completo
+
+        Args:
+            ativa (bool): Se False, mantém sempre a fidelidade completa
+            limites_profundidade (Iterable[int]): Mensagens na fila a partir das
+                quais se desce para cada nível seguinte
+            limites_atraso_s (Iterable[float]): Espera da mensagem mais antiga
+                (em segundos) a partir da qual se desce para cada nível seguinte
+            histerese (float): Fração dos limites abaixo da qual se volta a um
+                nível melhor
+            classes_protegidas (Iterable[str]): Classes de prioridade analisadas
+                sempre com fidelidade completa
+        """
+        self.ativa = ativa
+        self.limites_profundidade = np.array(limites_profundidade, dtype=float)
+        self.limites_atraso_s = np.array(limites_atraso_s, dtype=float)
+        self.histerese = histerese
+        self.classes_protegidas = set(classes_protegidas)
+
+        self.nivel = 0
+        self.transicoes = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    @property
+    def fidelidade(self) -> str:
+        """Nível de fidelidade em vigor"""
+        return NIVEIS_FIDELIDADE[self.nivel]
+
+    def _nivel_para(self, profundidade: int, atraso_s: float, fator: float = 1.0) -> int:
+        """Nível indicado pelos limites (multiplicados por fator)"""
+        nivel = max(np.searchsorted(self.limites_profundidade * fator, profundidade, side='right'),
+                    np.searchsorted(self.limites_atraso_s * fator, atraso_s, side='right'))
+        return int(min(nivel, len(NIVEIS_FIDELIDADE) - 1))
+
+    def atualizar(self, profundidade: int, atraso_s: float) -> str:
+        """
+        Reavalia o nível a partir do estado atual da fila
+
+        A descida é imediata; a volta a um nível melhor só acontece quando a fila
+        fica abaixo da fração 'histerese' dos limites, até a fidelidade completa.
+
+        Args:
+            profundidade (int): Mensagens aguardando análise
+            atraso_s (float): Espera da mensagem mais antiga na fila
+
+        Returns:
+            str: Nível de fidelidade a usar no próximo lote
+        """
+        if not self.ativa:
+            return self.fidelidade
+
+        with self._lock:
+            alvo = self._nivel_para(profundidade, atraso_s)
+            if alvo < self.nivel:
+                alvo = min(self.nivel, self._nivel_para(profundidade, atraso_s, self.histerese))
+
+            if alvo != self.nivel:
+                anterior = self.fidelidade
+                self.nivel = alvo
+                self.transicoes.append({
+                    'momento': time.time(), 'de': anterior, 'para': self.fidelidade,
+                    'profundidade': profundidade, 'atraso_s': atraso_s
+                })
+                registrar = logger.warning if alvo else logger.info
+                registrar(f"Fidelidade do NLP: {anterior} -> {self.fidelidade} "
+                          f"(fila: {profundidade}, atraso: {atraso_s:.1f}s)")
+
+            return self.fidelidade
+
+    def fidelidade_para(self, classe_prioridade: str) -> str:
+        """Nível de fidelidade para uma mensagem da classe de prioridade dada"""
+        if classe_prioridade in self.classes_protegidas:
+            return NIVEIS_FIDELIDADE[0]
+        return self.fidelidade
+
+
+class PipelineNLP:
+    """Análise completa de lotes de mensagens, com triagem em cascata opcional"""
+
+    def __init__(self, config: Optional[Dict] = None, registro=None, cache=None):
+        """
+        Inicializa o pipeline
+
+        Args:
+            config (Dict, optional): Configuração de NLP; a de config/nlp.json se omitida
+            registro (RegistroModelos, optional): Registro de modelos; o do processo se omitido
+            cache (CacheResultadosNLP, optional): Cache de resultados; o do processo se omitido
+        """
+        self.registro = registro or obter_registro()
+        self.cache = cache or obter_cache_resultados()
+        self._lock = threading.Lock()
+        config = config or carregar_config_nlp()
+        self.configurar_cascata(**config.get('cascata', {}))
+        self.zerar_estatisticas_cascata()
+        self.estatisticas_fila = AcumuladorEstatisticas()
+        self._esperas_fila = {classe: deque(maxlen=JANELA_ESPERAS) for classe in CLASSES_PRIORIDADE}
+        self.config_degradacao = {**CONFIG_NLP_PADRAO['degradacao'], **config.get('degradacao', {})}
+        self._mensagens_por_fidelidade = Counter()
+
+    def configurar_cascata(self, **parametros):
+        """
+        Ajusta os limiares da cascata (ex.: mais agressivos durante um pico de volume)
+
+        Args:
+            **parametros: Chaves de CONFIG_CASCATA_PADRAO a alterar
+        """
+        desconhecidos = set(parametros) - set(CONFIG_CASCATA_PADRAO)
+        if desconhecidos:
+            raise ValueError(f"Parâmetros de cascata desconhecidos: {sorted(desconhecidos)}")
+
+        with self._lock:
+            atual = getattr(self, 'config_cascata', CONFIG_CASCATA_PADRAO)
+            self.config_cascata = {**atual, **parametros}
+
+    def criar_politica_degradacao(self) -> PoliticaDegradacao:
+        """
+        Cria uma política de degradação com a configuração de NLP, para uma fila
+
+        Returns:
+            PoliticaDegradacao: Política nova, no nível completo
+        """
+        return PoliticaDegradacao(**self.config_degradacao)
+
+    def zerar_estatisticas_cascata(self):
+        """Descarta as estatísticas acumuladas da cascata"""
+        with self._lock:
+            self._estatisticas = {estagio: {'mensagens': 0, 'segundos': 0.0}
+                                  for estagio in ESTAGIOS_CASCATA}
+            self._estatisticas['triagem']['resolvidas'] = 0
+            self._motivos = Counter()
+
+    def processar(self, textos: List[str], fidelidade: str = 'completo') -> List[Dict[str, Any]]:
+        """
+        Analisa um lote de mensagens
+
+        Args:
+            textos (List[str]): Textos das mensagens (valores que não são texto
+                são tratados como texto vazio)
+            fidelidade (str): Nível de NIVEIS_FIDELIDADE usado no estágio completo
+
+        Returns:
+            List[Dict]: Por mensagem, sentimento, score_sentimento, nivel_urgencia,
+                score_urgencia, tipo_desastre, confianca_classificacao, telefones,
+                localizacoes, pessoas, score_completude, estagio_nlp ('triagem'
+                ou 'completo') e fidelidade_nlp
+        """
+        if fidelidade not in NIVEIS_FIDELIDADE:
+            raise ValueError(f"Nível de fidelidade desconhecido: {fidelidade}. "
+                             f"Use um de {list(NIVEIS_FIDELIDADE)}")
+
+        textos = [t if isinstance(t, str) else '' for t in textos]
+        if not textos:
+            return []
+
+        with self._lock:
+            self._mensagens_por_fidelidade[fidelidade] += len(textos)
+
+        if not self.config_cascata['ativa']:
+            return self._processar_completo(textos, fidelidade)
+
+        inicio = time.perf_counter()
+        resultados, motivos = self._triagem(textos, fidelidade)
+        escalar = [i for i, motivo in enumerate(motivos) if motivo]
+        duracao_triagem = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        if escalar:
+            completos = self._processar_completo([textos[i] for i in escalar], fidelidade)
+            for i, resultado in zip(escalar, completos):
+                resultados[i] = resultado
+        duracao_completo = time.perf_counter() - inicio
+
+        with self._lock:
+            self._estatisticas['triagem']['mensagens'] += len(textos)
+            self._estatisticas['triagem']['resolvidas'] += len(textos) - len(escalar)
+            self._estatisticas['triagem']['segundos'] += duracao_triagem
+            self._estatisticas['completo']['mensagens'] += len(escalar)
+            self._estatisticas['completo']['segundos'] += duracao_completo
+            self._motivos.update(motivo for motivo in motivos if motivo)
+
+        return resultados
+
+    def processar_priorizado(self, textos: List[str], fontes: Optional[Iterable[str]] = None,
+                             tamanho_lote: int = 64,
+                             ao_lote: Optional[Callable[[List[int], List[Dict]], None]] = None,
+                             politica: Optional[PoliticaDegradacao] = None
+                             ) -> List[Dict[str, Any]]:
+        """
+        Analisa um lote em ordem de prioridade, em micro-lotes
+
+        As mensagens passam por EscalonadorNLP: as de maior pré-pontuação
+        (urgência, pessoas vulneráveis, fonte) são analisadas e entregues a
+        ao_lote primeiro, para serem persistidas e exibidas antes das demais.
+
+        O tamanho do lote recebido não é acúmulo: sem politica, tudo é analisado
+        com fidelidade completa. Com politica (atualizada por quem mede uma fila
+        real), cada classe recebe a fidelidade que ela indica; as classes
+        protegidas ficam sempre na completa.
+
+        Args:
+            textos (List[str]): Textos das mensagens
+            fontes (Iterable[str], optional): Fonte de cada mensagem
+            tamanho_lote (int): Mensagens por micro-lote
+            ao_lote (Callable, optional): Recebe as posições (na entrada) e os
+                resultados de cada micro-lote, na ordem de processamento
+            politica (PoliticaDegradacao, optional): Política da fila que originou o lote
+
+        Returns:
+            List[Dict]: Resultados na ordem da entrada (ver processar), com
+                'score_prioridade', 'classe_prioridade' e 'espera_fila_ms'
+        """
+        textos = [t if isinstance(t, str) else '' for t in textos]
+        escalonador = EscalonadorNLP()
+        prioridade = escalonador.enfileirar(list(range(len(textos))), textos, fontes)
+
+        resultados: List[Optional[Dict]] = [None] * len(textos)
+        while len(escalonador):
+            lote = escalonador.retirar_lote(tamanho_lote)
+            posicoes = [posicao for posicao, _, _ in lote]
+
+            # Um processamento por nível de fidelidade presente no micro-lote
+            por_fidelidade: Dict[str, List[int]] = {}
+            for j, (_, classe, _) in enumerate(lote):
+                fidelidade = politica.fidelidade_para(classe) if politica else NIVEIS_FIDELIDADE[0]
+                por_fidelidade.setdefault(fidelidade, []).append(j)
+            analisados: List[Optional[Dict]] = [None] * len(lote)
+            for fidelidade, indices in por_fidelidade.items():
+                for j, resultado in zip(indices, self.processar(
+                        [textos[posicoes[j]] for j in indices], fidelidade)):
+                    analisados[j] = resultado
+
+            for (posicao, classe, espera), resultado in zip(lote, analisados):
+                resultado.update({
+                    'score_prioridade': int(prioridade['score_prioridade'][posicao]),
+                    'classe_prioridade': classe,
+                    'espera_fila_ms': espera * 1000
+                })
+                resultados[posicao] = resultado
+
+            if ao_lote is not None:
+                ao_lote(posicoes, analisados)
+
+        with self._lock:
+            self.estatisticas_fila.mesclar(escalonador.estatisticas)
+            for resultado in resultados:
+                self._esperas_fila[resultado['classe_prioridade']].append(resultado['espera_fila_ms'])
+
+        return resultados
+
+    def obter_estatisticas_fila(self) -> Dict[str, Dict[str, float]]:
+        """
+        Retorna a espera na fila de prioridade acumulada por classe
+
+        Returns:
+            Dict: Por classe de prioridade, atendidas, espera_media_ms,
+                espera_p95_ms e espera_max_ms (percentis sobre as últimas
+                JANELA_ESPERAS esperas da classe)
+        """
+        with self._lock:
+            medias = self.estatisticas_fila.medias_por_grupo('espera_fila_ms')
+            estatisticas = {}
+            for classe in reversed(CLASSES_PRIORIDADE):
+                esperas = np.array(self._esperas_fila[classe])
+                estatisticas[classe] = {
+                    'atendidas': self.estatisticas_fila.contagem('atendidas', classe),
+                    'espera_media_ms': medias.get(classe, 0.0),
+                    'espera_p95_ms': float(np.percentile(esperas, 95)) if len(esperas) else 0.0,
+                    'espera_max_ms': float(esperas.max()) if len(esperas) else 0.0
+                }
+            return estatisticas
+
+    def obter_estatisticas_degradacao(self) -> Dict[str, Any]:
+        """
+        Retorna o volume analisado em cada nível de fidelidade
+
+        O nível em vigor e as transições pertencem à política de cada fila
+        (ver IngestaoStream.obter_metricas).
+
+        Returns:
+            Dict: 'mensagens_por_fidelidade'
+        """
+        with self._lock:
+            mensagens = dict(self._mensagens_por_fidelidade)
+        return {
+            'mensagens_por_fidelidade': {nivel: mensagens.get(nivel, 0) for nivel in NIVEIS_FIDELIDADE}
+        }
+
+    def _triagem(self, textos: List[str], fidelidade: str = 'completo'):
+        """
+        Primeiro estágio da cascata: léxico de sentimento, urgência e palavras-chave
+
+        Returns:
+            Tuple[List[Dict], List[str]]: Resultado de triagem por mensagem e o
+                motivo de escalonamento de cada uma ('' se resolvida na triagem)
+        """
+        config = self.config_cascata
+        sentimento = self.registro.obter('sentimento:lexico').analisar_lote_colunar(
+            textos, dtype_scores=np.float64)
+        palavras = self.registro.obter('classificador').classificar_por_palavras_chave(textos)
+
+        niveis = np.asarray(sentimento['nivel_urgencia'], dtype=object)
+        urgente = np.isin(niveis, list(config['niveis_escalonamento']))
+        # Sem palavras-chave e sem urgência: mensagem irrelevante, resolvida como 'outros'
+        irrelevante = (palavras['total_acertos'] == 0) & (sentimento['score_urgencia'] == 0)
+        clara = ((palavras['acertos'] >= config['min_palavras_chave']) &
+                 (palavras['margem'] >= config['margem_minima']))
+
+        motivos = np.where(urgente, 'urgencia',
+                           np.where(irrelevante | clara, '', 'ambigua')).tolist()
+
+        resolvidas = [i for i, motivo in enumerate(motivos) if not motivo]
+        entidades = {}
+        if resolvidas:
+            # Só regex na triagem: telefones e endereços sem passar pelo spaCy
+            extrator = self.registro.obter('entidades:regex')
+            for resultado in extrator.extrair_em_lote([textos[i] for i in resolvidas]):
+                entidades[resolvidas[resultado['id_mensagem']]] = resultado
+
+        resultados = []
+        for i in range(len(textos)):
+            if motivos[i]:
+                resultados.append(None)
+                continue
+            resultado_entidades = entidades.get(i, {})
+            resultados.append({
+                'sentimento': sentimento['sentimento'][i],
+                'score_sentimento': float(sentimento['score_composto'][i]),
+                'nivel_urgencia': niveis[i],
+                'score_urgencia': int(sentimento['score_urgencia'][i]),
+                'tipo_desastre': str(palavras['tipo_predito'][i]),
+                'confianca_classificacao': float(palavras['confianca'][i]),
+                'telefones': resultado_entidades.get('telefones', []),
+                'localizacoes': resultado_entidades.get('localizacoes', []),
+                'pessoas': resultado_entidades.get('pessoas', []),
+                'score_completude': resultado_entidades.get('score_completude', 0.0),
+                'estagio_nlp': 'triagem',
+                'fidelidade_nlp': fidelidade
+            })
+
+        return resultados, motivos
+
+    def _extrator_para(self, fidelidade: str):
+        """Extrator de entidades do nível de fidelidade (nunca mais caro que o configurado)"""
+        extrator = self.registro.obter('entidades')
+        perfil = {'ner': 'ner', 'regex': 'regex', 'palavras_chave': 'regex'}.get(fidelidade)
+        if perfil and _PERFIS_EXTRATOR.index(perfil) > _PERFIS_EXTRATOR.index(extrator.perfil):
+            extrator = self.registro.obter(f'entidades:{perfil}')
+        return extrator
+
+    def _processar_completo(self, textos: List[str],
+                            fidelidade: str = 'completo') -> List[Dict[str, Any]]:
+        """
+        Estágio completo: VADER, classificador TF-IDF e extrator spaCy, rebaixados
+        conforme o nível de fidelidade
+
+        Resultados endereçados por conteúdo: cópias e retweets de mensagens já
+        analisadas (nesta ou em sessões anteriores) não são reprocessados.
+        """
+        so_palavras_chave = fidelidade == 'palavras_chave'
+        extrair_temporais = fidelidade == 'completo'
+        analisador_sentimento = self.registro.obter(
+            'sentimento:lexico' if so_palavras_chave else 'sentimento')
+        classificador = self.registro.obter('classificador')
+        extrator = self._extrator_para(fidelidade)
+
+        def calcular_sentimento(pendentes):
+            colunas = analisador_sentimento.analisar_lote_colunar(pendentes, dtype_scores=np.float64)
+            return [{
+                'sentimento': colunas['sentimento'][j],
+                'score_composto': float(colunas['score_composto'][j]),
+                'nivel_urgencia': colunas['nivel_urgencia'][j],
+                'score_urgencia': int(colunas['score_urgencia'][j])
+            } for j in range(len(pendentes))]
+
+        def calcular_classificacao(pendentes):
+            # Classificação de tipo em lote (uma única vetorização TF-IDF)
+            colunas = classificador.classificar_lote_colunar(pendentes)
+            return [{
+                'tipo_predito': str(colunas['tipo_predito'][j]),
+                'confianca': float(colunas['confianca'][j])
+            } for j in range(len(pendentes))]
+
+        def calcular_entidades(pendentes):
+            # Extração de entidades em lote via nlp.pipe
+            por_id = {r['id_mensagem']: r for r in extrator.extrair_em_lote(
+                pendentes, extrair_temporais=extrair_temporais)}
+            resultados = []
+            for j, texto in enumerate(pendentes):
+                resultado = por_id.get(j) or extrator.extrair_todas_entidades(
+                    texto, extrair_temporais=extrair_temporais)
+                resultados.append({chave: valor for chave, valor in resultado.items()
+                                   if chave not in ('texto_original', 'id_mensagem')})
+            return resultados
+
+        sentimentos = self.cache.obter_ou_calcular(
+            'sentimento', analisador_sentimento.obter_versao(), textos, calcular_sentimento)
+        if so_palavras_chave:
+            # Sem TF-IDF: contagem de palavras-chave, barata demais para o cache
+            colunas = classificador.classificar_por_palavras_chave(textos)
+            classificacoes = [{'tipo_predito': str(tipo), 'confianca': float(confianca)}
+                              for tipo, confianca in zip(colunas['tipo_predito'], colunas['confianca'])]
+        else:
+            classificacoes = self.cache.obter_ou_calcular(
+                'classificacao', classificador.obter_versao(), textos, calcular_classificacao)
+        versao_entidades = extrator.obter_versao() + ('' if extrair_temporais else ':sem_temporal')
+        entidades = self.cache.obter_ou_calcular(
+            'entidades', versao_entidades, textos, calcular_entidades)
+
+        return [{
+            'sentimento': resultado_sentimento['sentimento'],
+            'score_sentimento': resultado_sentimento['score_composto'],
+            'nivel_urgencia': resultado_sentimento['nivel_urgencia'],
+            'score_urgencia': resultado_sentimento['score_urgencia'],
+            'tipo_desastre': resultado_classificacao['tipo_predito'],
+            'confianca_classificacao': resultado_classificacao['confianca'],
+            'telefones': resultado_entidades['telefones'],
+            'localizacoes': resultado_entidades['localizacoes'],
+            'pessoas': resultado_entidades['pessoas'],
+            'score_completude': resultado_entidades['score_completude'],
+            'estagio_nlp': 'completo',
+            'fidelidade_nlp': fidelidade
+        } for resultado_sentimento, resultado_classificacao, resultado_entidades
+            in zip(sentimentos, classificacoes, entidades)]
+
+    def obter_estatisticas_cascata(self) -> Dict[str, Any]:
+        """
+        Retorna a taxa de passagem e a latência de cada estágio da cascata
+
+        Returns:
+            Dict: Por estágio, mensagens, segundos e us_por_mensagem (mais
+                'resolvidas' na triagem); 'taxa_escalonamento' (fração das
+                mensagens triadas que seguiram para o estágio completo) e
+                'motivos' (contagem por motivo de escalonamento)
+        """
+        with self._lock:
+            estatisticas = {}
+            for estagio, valores in self._estatisticas.items():
+                mensagens = valores['mensagens']
+                estatisticas[estagio] = {
+                    **valores,
+                    'us_por_mensagem': valores['segundos'] / mensagens * 1e6 if mensagens else 0.0
+                }
+            triadas = self._estatisticas['triagem']['mensagens']
+            estatisticas['taxa_escalonamento'] = (
+                self._estatisticas['completo']['mensagens'] / triadas if triadas else 0.0)
+            estatisticas['motivos'] = dict(self._motivos)
+            estatisticas['config'] = dict(self.config_cascata)
+            return estatisticas
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    mensagens = [
+        "Enchente na Rua das Flores, água invadiu as casas, alagamento total",
+        "SOCORRO! Pessoas presas no prédio em chamas, incêndio urgente!",
+        "Bom dia a todos",
+        "Chuva forte e vento no bairro",
+        "Incêndio na mata, fogo e fumaça, queimada perto da estrada"
+    ]
+
+    pipeline = PipelineNLP(config={'cascata': {'ativa': True}})
+    for mensagem, resultado in zip(mensagens, pipeline.processar(mensagens)):
+        print(f"[{resultado['estagio_nlp']}] {resultado['tipo_desastre']} / "
+              f"{resultado['nivel_urgencia']}: {mensagem}")
+
+    print(f"\nCascata: {pipeline.obter_estatisticas_cascata()}")
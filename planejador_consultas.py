@@ -0,0 +1,258 @@
+"""
+Planejador de Consultas do Twitter
+Distribui uma lista longa de termos no menor número de queries que cabem no
+limite de tamanho da busca, e acompanha o rendimento de cada termo (tweets novos
+por coleta) para consultar com menos frequência os termos que não rendem
+"""
+
+import os
+import re
+import json
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Tamanho máximo de uma query da busca recente (v2, acesso básico)
+LIMITE_CARACTERES_QUERY = 512
+
+# Separador entre termos dentro de uma query
+SEPARADOR_TERMOS = " OR "
+
+# Peso da coleta mais recente na média móvel de rendimento
+PESO_RENDIMENTO_RECENTE = 0.3
+
+
+def _sem_acentos(texto: str) -> str:
+    """Texto em minúsculas e sem acentos, para casar termos com tweets"""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class PlanejadorConsultas:
+    """Empacota termos em queries e rebaixa termos de baixo rendimento"""
+
+    def __init__(self, caminho_arquivo: str = 'data/rendimento_termos.json',
+                 limite_caracteres: int = LIMITE_CARACTERES_QUERY,
+                 rendimento_minimo: float = 0.5, min_consultas: int = 3,
+                 intervalo_rebaixados: int = 4):
+        """
+        Inicializa o planejador, carregando o rendimento já registrado
+
+        Args:
+            caminho_arquivo (str): Arquivo JSON do rendimento por termo
+            limite_caracteres (int): Tamanho máximo de cada query
+            rendimento_minimo (float): Tweets novos por coleta abaixo dos quais o
+                termo é rebaixado
+            min_consultas (int): Coletas de um termo antes de poder rebaixá-lo
+            intervalo_rebaixados (int): Os termos rebaixados entram, todos juntos,
+                em uma de cada intervalo_rebaixados coletas (para poderem voltar se
+                voltarem a render)
+        """
+        self.caminho_arquivo = caminho_arquivo
+        self.limite_caracteres = limite_caracteres
+        self.rendimento_minimo = rendimento_minimo
+        self.min_consultas = min_consultas
+        self.intervalo_rebaixados = intervalo_rebaixados
+
+        self._lock = threading.Lock()
+        self._dados: Dict = {'coletas': 0, 'termos': {}}
+
+        if os.path.exists(self.caminho_arquivo):
+            try:
+                with open(self.caminho_arquivo, 'r', encoding='utf-8') as f:
+                    self._dados = json.load(f)
+            except Exception as e:
+                print(f"Erro ao carregar rendimento dos termos: {e}")
+
+    def _salvar(self):
+        """Grava o rendimento atomicamente (arquivo temporário + substituição)"""
+        diretorio = os.path.dirname(self.caminho_arquivo)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        temporario = f"{self.caminho_arquivo}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._dados, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho_arquivo)
+
+    def empacotar(self, termos: List[str], comprimento_fixo: int = 0) -> List[List[str]]:
+        """
+        Distribui termos no menor número de grupos cuja query cabe no limite
+
+        Usa first-fit decreasing: termos do maior para o menor, cada um no
+        primeiro grupo em que ainda cabe. O resultado é determinístico, então o
+        mesmo conjunto de termos gera sempre as mesmas queries (e as mesmas
+        marcas d'água).
+
+        Args:
+            termos (List[str]): Termos de busca (cada um vira "termo" na query)
+            comprimento_fixo (int): Caracteres da query além dos termos
+                (parênteses e filtros)
+
+        Returns:
+            List[List[str]]: Termos de cada query
+
+        Raises:
+            ValueError: Se um termo sozinho não cabe no limite
+        """
+        capacidade = self.limite_caracteres - comprimento_fixo
+        grupos: List[Tuple[int, List[str]]] = []
+
+        for termo in sorted(dict.fromkeys(termos), key=lambda t: (-len(t), t)):
+            tamanho = len(termo) + 2  # aspas
+            if tamanho > capacidade:
+                raise ValueError(f"Termo não cabe em uma query de {self.limite_caracteres} "
+                                 f"caracteres: {termo!r}")
+
+            for i, (ocupado, grupo) in enumerate(grupos):
+                if ocupado + len(SEPARADOR_TERMOS) + tamanho <= capacidade:
+                    grupos[i] = (ocupado + len(SEPARADOR_TERMOS) + tamanho, grupo + [termo])
+                    break
+            else:
+                grupos.append((tamanho, [termo]))
+
+        return [grupo for _, grupo in grupos]
+
+    def planejar(self, termos: List[str], comprimento_fixo: int = 0) -> Dict[str, List]:
+        """
+        Escolhe os termos desta coleta e os empacota em queries
+
+        Termos ativos e rebaixados vão para grupos separados: incluir ou não os
+        rebaixados não muda as queries dos ativos nem suas marcas d'água. Os
+        rebaixados são empacotados sempre juntos e entram ou ficam de fora em
+        bloco, então suas queries (e marcas d'água) só mudam quando um termo é
+        rebaixado ou reativado.
+
+        Args:
+            termos (List[str]): Todos os termos de busca
+            comprimento_fixo (int): Caracteres da query além dos termos
+
+        Returns:
+            Dict: 'grupos' (termos de cada query), 'rebaixados' (termos rebaixados)
+                e 'adiados' (rebaixados que ficam fora desta coleta)
+        """
+        with self._lock:
+            coleta = self._dados['coletas']
+            ativos, rebaixados = [], []
+            for termo in dict.fromkeys(termos):
+                registro = self._dados['termos'].get(termo)
+                if registro and registro.get('rebaixado'):
+                    rebaixados.append(termo)
+                else:
+                    ativos.append(termo)
+
+        grupos = self.empacotar(ativos, comprimento_fixo)
+        incluir_rebaixados = coleta % self.intervalo_rebaixados == 0
+        if incluir_rebaixados:
+            grupos += self.empacotar(rebaixados, comprimento_fixo)
+        return {'grupos': grupos, 'rebaixados': rebaixados,
+                'adiados': [] if incluir_rebaixados else rebaixados}
+
+    @staticmethod
+    def contar_por_termo(termos: List[str], tweets: List[Dict]) -> Dict[str, int]:
+        """
+        Conta os tweets que contêm cada termo (sem diferenciar caixa e acentos)
+
+        Args:
+            termos (List[str]): Termos consultados
+            tweets (List[Dict]): Tweets recebidos (com 'texto')
+
+        Returns:
+            Dict[str, int]: Tweets por termo (um tweet pode contar para vários)
+        """
+        padroes = {termo: re.compile(rf"\b{re.escape(_sem_acentos(termo))}\b") for termo in termos}
+        textos = [_sem_acentos(tweet.get('texto') or '') for tweet in tweets]
+        return {termo: sum(1 for texto in textos if padrao.search(texto))
+                for termo, padrao in padroes.items()}
+
+    def registrar_coleta(self, termos: List[str], tweets: List[Dict]) -> Dict[str, int]:
+        """
+        Registra o rendimento de cada termo consultado e avança o contador de coletas
+
+        Args:
+            termos (List[str]): Termos incluídos nesta coleta
+            tweets (List[Dict]): Tweets novos recebidos (já sem duplicatas)
+
+        Returns:
+            Dict[str, int]: Tweets por termo nesta coleta
+        """
+        contagem = self.contar_por_termo(termos, tweets)
+
+        with self._lock:
+            coleta = self._dados['coletas']
+            for termo, quantidade in contagem.items():
+                registro = self._dados['termos'].setdefault(termo, {
+                    'consultas': 0, 'tweets': 0, 'rendimento_medio': None, 'rebaixado': False
+                })
+                registro['consultas'] += 1
+                registro['tweets'] += quantidade
+                registro['ultima_coleta'] = coleta
+                if registro['rendimento_medio'] is None:
+                    registro['rendimento_medio'] = float(quantidade)
+                else:
+                    registro['rendimento_medio'] = (PESO_RENDIMENTO_RECENTE * quantidade +
+                                                    (1 - PESO_RENDIMENTO_RECENTE) * registro['rendimento_medio'])
+
+                rebaixado = (registro['consultas'] >= self.min_consultas and
+                             registro['rendimento_medio'] < self.rendimento_minimo)
+                if rebaixado != registro['rebaixado']:
+                    print(f"Termo {'rebaixado' if rebaixado else 'reativado'}: {termo} "
+                          f"({registro['rendimento_medio']:.2f} tweets por coleta)")
+                registro['rebaixado'] = rebaixado
+
+            self._dados['coletas'] = coleta + 1
+            self._dados['atualizado_em'] = datetime.now().isoformat()
+
+            try:
+                self._salvar()
+            except Exception as e:
+                print(f"Erro ao salvar rendimento dos termos: {e}")
+
+        return contagem
+
+    def obter_rendimento(self) -> Dict[str, Dict]:
+        """
+        Retorna o rendimento registrado de cada termo
+
+        Returns:
+            Dict[str, Dict]: Por termo, consultas, tweets, rendimento_medio,
+                rebaixado e ultima_coleta
+        """
+        with self._lock:
+            return {termo: dict(registro) for termo, registro in self._dados['termos'].items()}
+
+    def resetar(self, termo: Optional[str] = None):
+        """
+        Descarta o rendimento registrado (reativando os termos rebaixados)
+
+        Args:
+            termo (str, optional): Termo a resetar; todos se omitido
+        """
+        with self._lock:
+            if termo is None:
+                self._dados = {'coletas': 0, 'termos': {}}
+            else:
+                self._dados['termos'].pop(termo, None)
+
+            try:
+                self._salvar()
+            except Exception as e:
+                print(f"Erro ao salvar rendimento dos termos: {e}")
+
+
+if __name__ == "__main__":
+    # Teste do módulo
+    planejador = PlanejadorConsultas('/tmp/rendimento_termos_teste.json', limite_caracteres=80)
+    planejador.resetar()
+    termos = ["enchente", "alagamento", "inundação", "chuva forte", "deslizamento",
+              "desabamento", "furacão", "ciclone", "tornado", "granizo", "soterrados"]
+
+    for coleta in range(6):
+        plano = planejador.planejar(termos, comprimento_fixo=len("() -is:retweet lang:pt"))
+        consultados = [termo for grupo in plano['grupos'] for termo in grupo]
+        tweets = [{'texto': "Inundação e alagamento na avenida"}, {'texto': "Enchente no centro"}]
+        planejador.registrar_coleta(consultados, tweets)
+        print(f"Coleta {coleta}: {len(plano['grupos'])} queries, adiados: {plano['adiados']}")
+
+    print(planejador.obter_rendimento()['enchente'])
@@ -0,0 +1,217 @@
+"""
+Registro de Modelos de NLP
+Mantém uma única instância por processo de cada modelo (sentimento, entidades,
+classificador), compartilhada entre todas as sessões e reexecuções do Streamlit
+"""
+
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("monitor_emergencias.registro_modelos")
+
+
+def _criar_analisador_sentimento(metodo: str = 'vader'):
+    """Fábrica padrão do analisador de sentimento"""
+    from analise_sentimento import AnalisadorSentimento
+    return AnalisadorSentimento(metodo=metodo)
+
+
+def _criar_extrator_entidades(perfil: Optional[str] = None):
+    """Fábrica do extrator de entidades (carrega o modelo spaCy do perfil)"""
+    from extrator_entidades import ExtratorEntidades
+    return ExtratorEntidades(perfil=perfil)
+
+
+def _criar_classificador_desastre():
+    """Fábrica padrão do classificador, já entregue treinado"""
+    from classificador_tipo import ClassificadorDesastre
+    classificador = ClassificadorDesastre()
+    if not classificador.treinado:
+        classificador.treinar_modelo()
+    return classificador
+
+
+def _criar_pipeline():
+    """Fábrica do pipeline de NLP (os modelos são carregados no primeiro lote)"""
+    from pipeline_nlp import PipelineNLP
+    return PipelineNLP()
+
+
+class RegistroModelos:
+    """Registro thread-safe que carrega cada modelo sob demanda, uma única vez"""
+
+    def __init__(self):
+        """Inicializa o registro vazio"""
+        self._fabricas: Dict[str, Callable[[], Any]] = {}
+        self._instancias: Dict[str, Any] = {}
+        self._tempos_carga: Dict[str, float] = {}
+        self._locks_modelo: Dict[str, threading.Lock] = {}
+        self._aquecer: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, fabrica: Callable[[], Any], substituir: bool = False,
+                  aquecer: bool = True):
+        """
+        Registra a fábrica de um modelo
+
+        Args:
+            nome (str): Nome do modelo no registro
+            fabrica (Callable): Função sem argumentos que cria a instância
+            substituir (bool): Se deve substituir uma fábrica já registrada
+            aquecer (bool): Se o modelo entra no warm-up padrão
+        """
+        with self._lock:
+            if nome in self._fabricas and not substituir:
+                return
+            self._fabricas[nome] = fabrica
+            self._aquecer[nome] = aquecer
+            self._locks_modelo.setdefault(nome, threading.Lock())
+            if substituir:
+                self._instancias.pop(nome, None)
+                self._tempos_carga.pop(nome, None)
+
+    def obter(self, nome: str) -> Any:
+        """
+        Retorna a instância do modelo, carregando-a na primeira chamada
+
+        Args:
+            nome (str): Nome do modelo
+
+        Returns:
+            Any: Instância compartilhada do modelo
+        """
+        instancia = self._instancias.get(nome)
+        if instancia is not None:
+            return instancia
+
+        with self._lock:
+            if nome not in self._fabricas:
+                raise KeyError(f"Modelo '{nome}' não registrado")
+            lock_modelo = self._locks_modelo[nome]
+            fabrica = self._fabricas[nome]
+
+        # Lock por modelo: carregar o spaCy não bloqueia quem só quer o analisador
+        with lock_modelo:
+            instancia = self._instancias.get(nome)
+            if instancia is not None:
+                return instancia
+
+            inicio = time.perf_counter()
+            instancia = fabrica()
+            duracao = time.perf_counter() - inicio
+
+            self._instancias[nome] = instancia
+            self._tempos_carga[nome] = duracao
+            logger.info(f"Modelo '{nome}' carregado em {duracao:.3f}s")
+            return instancia
+
+    def aquecer(self, nomes: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Carrega antecipadamente os modelos (etapa de warm-up na inicialização)
+
+        Args:
+            nomes (Iterable[str], optional): Modelos a carregar; se omitido, todos
+                os registrados com aquecer=True
+
+        Returns:
+            Dict[str, float]: Tempo de carga em segundos por modelo
+        """
+        if nomes is None:
+            with self._lock:
+                nomes = [nome for nome in self._fabricas if self._aquecer[nome]]
+
+        for nome in nomes:
+            try:
+                self.obter(nome)
+            except Exception as e:
+                logger.error(f"Erro ao aquecer modelo '{nome}': {str(e)}")
+
+        return self.obter_tempos_carga()
+
+    def esta_carregado(self, nome: str) -> bool:
+        """Indica se o modelo já foi carregado neste processo"""
+        return nome in self._instancias
+
+    def obter_tempos_carga(self) -> Dict[str, float]:
+        """
+        Retorna o tempo de carga de cada modelo já carregado
+
+        Returns:
+            Dict[str, float]: Nome do modelo -> segundos
+        """
+        return dict(self._tempos_carga)
+
+    def descarregar(self, nome: Optional[str] = None):
+        """
+        Descarta instâncias carregadas (a próxima chamada a obter recarrega)
+
+        Args:
+            nome (str, optional): Modelo a descartar; todos se omitido
+        """
+        with self._lock:
+            nomes = [nome] if nome else list(self._instancias)
+            for n in nomes:
+                self._instancias.pop(n, None)
+                self._tempos_carga.pop(n, None)
+
+
+_registro_global: Optional[RegistroModelos] = None
+_lock_global = threading.Lock()
+
+
+def obter_extrator(perfil: Optional[str] = None):
+    """
+    Retorna o extrator de entidades compartilhado para um perfil de pipeline
+
+    Args:
+        perfil (str, optional): 'completo', 'ner' ou 'regex'; o perfil da
+            configuração de NLP se omitido
+
+    Returns:
+        ExtratorEntidades: Extrator carregado uma única vez por perfil
+    """
+    registro = obter_registro()
+    return registro.obter(f'entidades:{perfil}' if perfil else 'entidades')
+
+
+def obter_registro() -> RegistroModelos:
+    """
+    Retorna o registro de modelos do processo, criando-o na primeira chamada
+
+    Returns:
+        RegistroModelos: Registro compartilhado com as fábricas padrão
+    """
+    global _registro_global
+    if _registro_global is None:
+        with _lock_global:
+            if _registro_global is None:
+                registro = RegistroModelos()
+                registro.registrar('sentimento', _criar_analisador_sentimento)
+                registro.registrar('entidades', _criar_extrator_entidades)
+                registro.registrar('classificador', _criar_classificador_desastre)
+                # Um extrator por perfil de pipeline, escolhido por cada ponto de
+                # uso e carregado só quando pedido
+                for perfil in ('completo', 'ner', 'regex'):
+                    registro.registrar(f'entidades:{perfil}',
+                                       lambda perfil=perfil: _criar_extrator_entidades(perfil),
+                                       aquecer=False)
+                # Léxico de sentimento da triagem em cascata
+                registro.registrar('sentimento:lexico',
+                                   lambda: _criar_analisador_sentimento('lexico'),
+                                   aquecer=False)
+                registro.registrar('pipeline', _criar_pipeline, aquecer=False)
+                _registro_global = registro
+    return _registro_global
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    registro = obter_registro()
+    tempos = registro.aquecer()
+
+    print("=== Tempos de carga dos modelos ===")
+    for nome, segundos in tempos.items():
+        print(f"{nome}: {segundos:.3f}s")
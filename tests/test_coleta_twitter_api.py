@@ -0,0 +1,101 @@
+"""
+Testes da coleta planejada do Twitter com o cache de respostas
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+tweepy = pytest.importorskip('tweepy')
+
+from cache_respostas import CacheRespostas
+from coleta_twitter_api import ColetorTwitter, ConfigTwitter
+from limitador_taxa import LimitadorTaxa
+from marcas_coleta import MarcasColeta
+from planejador_consultas import PlanejadorConsultas
+
+TERMOS = ["enchente", "alagamento", "inundação", "deslizamento", "desabamento",
+          "soterrados", "vendaval", "granizo"]
+
+
+@pytest.fixture
+def coletor(tmp_path, monkeypatch):
+    # Sem rede: o teste de conexão da inicialização não consulta a API
+    monkeypatch.setattr(tweepy.Client, 'get_recent_tweets_count', lambda self, *a, **k: None)
+
+    coletor = ColetorTwitter(ConfigTwitter(bearer_token='teste'))
+    coletor.cache = CacheRespostas(str(tmp_path / 'respostas'))
+    coletor.limitador = LimitadorTaxa(str(tmp_path / 'limites.sqlite'))
+    coletor.marcas = MarcasColeta(str(tmp_path / 'marcas.json'))
+    coletor.planejador = PlanejadorConsultas(str(tmp_path / 'rendimento.json'), limite_caracteres=100)
+
+    coletor.chamadas = []
+    coletor.falhar = set()
+
+    def search_recent_tweets(**parametros):
+        coletor.chamadas.append(parametros)
+        if len(coletor.chamadas) in coletor.falhar:
+            resposta = requests.Response()
+            resposta.status_code = 429
+            raise tweepy.TooManyRequests(resposta)
+        tweet = SimpleNamespace(id=len(coletor.chamadas), text="Enchente e alagamento no centro",
+                                created_at=datetime.now(timezone.utc), author_id=1, lang='pt',
+                                public_metrics={}, geo=None, context_annotations=None)
+        return tweepy.Response(data=[tweet], includes={}, errors=[], meta={})
+
+    coletor.client.search_recent_tweets = search_recent_tweets
+    return coletor
+
+
+def test_segunda_coleta_na_validade_nao_consulta_a_api(coletor):
+    primeira = coletor.buscar_planejado(TERMOS, max_paralelas=1)
+    queries = coletor.estatisticas_coleta['queries']
+    assert queries > 1
+    assert len(coletor.chamadas) == queries
+
+    segunda = coletor.buscar_planejado(TERMOS, max_paralelas=1)
+
+    assert len(coletor.chamadas) == queries
+    assert coletor.estatisticas_coleta['queries_do_cache'] == queries
+    assert {t['id'] for t in segunda} == {t['id'] for t in primeira}
+
+
+def test_coleta_depois_da_validade_parte_da_marca_dagua(coletor):
+    coletor.buscar_planejado(TERMOS, max_paralelas=1)
+    queries = coletor.estatisticas_coleta['queries']
+
+    coletor.validade_cache_minutos = 0
+    coletor.buscar_planejado(TERMOS, max_paralelas=1)
+
+    novas = coletor.chamadas[queries:]
+    assert len(novas) == queries
+    assert all(chamada.get('since_id') for chamada in novas)
+
+
+def test_query_com_erro_e_descartada_sem_modo_simulado(coletor, monkeypatch):
+    monkeypatch.setattr(coletor, '_carregar_dados_simulados',
+                        lambda *a, **k: pytest.fail("dados simulados misturados à coleta"))
+    registradas = []
+    registrar_coleta = coletor.planejador.registrar_coleta
+    monkeypatch.setattr(coletor.planejador, 'registrar_coleta',
+                        lambda termos, tweets: registradas.append(termos) or registrar_coleta(termos, tweets))
+    coletor.falhar = {1}
+
+    tweets = coletor.buscar_planejado(TERMOS, max_paralelas=1)
+
+    queries = coletor.estatisticas_coleta['queries']
+    assert not coletor.modo_simulado
+    assert coletor.estatisticas_coleta['queries_com_erro'] == 1
+    assert len(tweets) == queries - 1
+    assert len(registradas) == 1 and 0 < len(registradas[0]) < len(TERMOS)
+
+
+def test_coleta_recorre_aos_dados_simulados_se_todas_as_queries_falham(coletor, monkeypatch):
+    simulados = [{'id': 'simulado', 'texto': "Enchente simulada"}]
+    monkeypatch.setattr(coletor, '_carregar_dados_simulados', lambda *a, **k: simulados)
+    coletor.falhar = set(range(1, 100))
+
+    assert coletor.buscar_planejado(TERMOS, max_paralelas=1) == simulados
+    assert coletor.modo_simulado
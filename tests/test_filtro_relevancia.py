@@ -0,0 +1,63 @@
+"""
+Testes do filtro de idioma e relevância com manchetes reais
+"""
+
+from filtro_relevancia import FiltroRelevancia
+
+# Manchetes de desastre com vocabulário também usado em esporte e entretenimento
+MANCHETES_DESASTRE = [
+    "Defesa Civil intensifica ações de resgate após deslizamento em Petrópolis",
+    "Série de tremores assusta moradores; Defesa Civil monitora encosta",
+    "Show cancelado após enchente atingir estádio; torcida ajuda desabrigados",
+    "Técnico da Defesa Civil alerta para risco de novos alagamentos na rodada de chuvas",
+    "Partida adiada: temporal provoca alagamento e deixa famílias ilhadas em Porto Alegre",
+    "Temporal derruba árvores e deixa 20 mil sem luz em SP",
+]
+
+# Uso figurado, sem sinal literal de desastre ou urgência
+MANCHETES_IRRELEVANTES = [
+    "Explosão de gols no Maracanã",
+    "Goleada no Brasileirão: time vence por 5 a 0 diante da torcida",
+    "Ibovespa sobe e dólar recua com promoção de black friday no varejo",
+]
+
+
+def test_manchetes_de_desastre_sao_aceitas():
+    filtro = FiltroRelevancia()
+    scores, motivos = filtro.avaliar(MANCHETES_DESASTRE, ['pt'] * len(MANCHETES_DESASTRE))
+
+    assert motivos == [''] * len(MANCHETES_DESASTRE)
+    assert (scores >= filtro.score_minimo).all()
+
+
+def test_contexto_irrelevante_sem_sinal_positivo_e_rejeitado():
+    filtro = FiltroRelevancia()
+    scores, motivos = filtro.avaliar(MANCHETES_IRRELEVANTES, ['pt'] * len(MANCHETES_IRRELEVANTES))
+
+    assert motivos == ['irrelevante'] * len(MANCHETES_IRRELEVANTES)
+    assert (scores < 0).all()
+
+
+def test_contexto_irrelevante_nao_penaliza_item_com_palavra_chave():
+    filtro = FiltroRelevancia()
+    sem_contexto, _ = filtro.avaliar(["Enchente atinge estádio"], ['pt'])
+    com_contexto, _ = filtro.avaliar(["Enchente atinge estádio e torcida do campeonato"], ['pt'])
+
+    assert com_contexto[0] == sem_contexto[0]
+
+
+def test_palavra_figurada_conta_fora_do_contexto_exclusivo():
+    filtro = FiltroRelevancia()
+    scores, motivos = filtro.avaliar(["Explosão em fábrica deixa feridos", "Explosão de gols no Maracanã"],
+                                     ['pt', 'pt'])
+
+    assert motivos == ['', 'irrelevante']
+
+
+def test_pontuacao_nao_exige_modelo_treinado():
+    filtro = FiltroRelevancia()
+    filtro.pontuar_relevancia(["Alagamento na avenida"])
+
+    import registro_modelos
+    registro = registro_modelos._registro_global
+    assert registro is None or 'classificador' not in registro._instancias
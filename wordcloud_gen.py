@@ -14,6 +14,8 @@ import base64
 from io import BytesIO
 import os
 
+from normalizacao import tokenizar
+
 
 class GeradorNuvemPalavras:
     """Classe para geração de nuvens de palavras personalizadas"""
@@ -79,27 +81,11 @@ class GeradorNuvemPalavras:
         Returns:
             str: Texto preprocessado concatenado
         """
-        texto_completo = ' '.join(textos)
-        
-        # Remove URLs
-        texto_completo = re.sub(r'http\S+|www\S+|https\S+', '', texto_completo, flags=re.MULTILINE)
-        
-        # Remove menções e hashtags
-        texto_completo = re.sub(r'@\w+|#\w+', '', texto_completo)
-        
-        # Remove números de telefone
-        texto_completo = re.sub(r'\b\d{2,5}[-\s]?\d{4,5}[-\s]?\d{4}\b', '', texto_completo)
-        
-        # Remove caracteres especiais, mantém acentos
-        texto_completo = re.sub(r'[^\w\sáàâãéèêíìîóòôõúùûç]', ' ', texto_completo)
-        
-        # Converte para minúsculas
-        texto_completo = texto_completo.lower()
-        
-        # Remove palavras muito curtas (menos de 3 caracteres)
-        palavras = texto_completo.split()
-        palavras_filtradas = [palavra for palavra in palavras 
-                             if len(palavra) >= 3 and palavra not in self.stop_words]
+        # Cada mensagem é normalizada uma vez (tokens memorizados por conteúdo)
+        palavras_filtradas = [palavra
+                              for texto in textos if isinstance(texto, str)
+                              for palavra in tokenizar(texto)
+                              if len(palavra) >= 3 and palavra not in self.stop_words]
         
         return ' '.join(palavras_filtradas)
     